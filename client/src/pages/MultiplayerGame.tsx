@@ -42,6 +42,16 @@ type TurnHistory = {
   turn_num: number;
 };
 
+// Result of submit_move, acknowledged to the mover and sent to the opponent
+type MoveInfo = {
+  round_id: number;
+  turn: TurnHistory;
+  status: string;
+  turns_used: number;
+  turns_remaining: number;
+  secret_code: null | number[];
+};
+
 type RoundInfoState = {
   status: string;
   turnHistory: TurnHistory[];
@@ -52,6 +62,20 @@ type RoundInfoState = {
   feedback: string;
 };
 
+// The code maker keeps their secret code until the round is over
+const roundInfoAfterMove = (
+  prevRoundInfo: RoundInfoState,
+  moveInfo: MoveInfo
+): RoundInfoState => ({
+  ...prevRoundInfo,
+  feedback: moveInfo.turn.result.message,
+  status: moveInfo.status,
+  turnHistory: [...prevRoundInfo.turnHistory, moveInfo.turn],
+  numTurnsRemaining: moveInfo.turns_remaining,
+  numTurnsUsed: moveInfo.turns_used,
+  secretCode: moveInfo.secret_code ?? prevRoundInfo.secretCode,
+});
+
 type ErrorProps = {
   code: null | number;
   message: null | string;
@@ -181,6 +205,10 @@ const MultiplayerGame = () => {
     }));
   });
 
+  socket.on("move_made", (data: MoveInfo) => {
+    setRoundInfo((prevRoundInfo) => roundInfoAfterMove(prevRoundInfo, data));
+  });
+
   socket.on("new_round_info", (data) => {
     const { game_id, round_id } = data;
     navigate(`/multiplayerGame/${game_id}/rounds/${round_id}`);
@@ -357,45 +385,22 @@ const MultiplayerGame = () => {
     }
   }
 
+  // The server saves the move, acknowledges it and sends it to the opponent
   async function handleMakeMove(e: React.MouseEvent<HTMLButtonElement>) {
     e.preventDefault();
     try {
-      const response = await authAxios.post(
-        `/api/v1.0/rounds/${roundId}/turns`,
-        {
-          guess: currChoice,
-        }
-      );
-      const data = response.data;
-      const numTurnsRemaining = gameSettings.maxTurns - data.turn_num;
-      const { message, won_round } = data.result;
-      let secretCode = null;
-      const isRoundOver = won_round || numTurnsRemaining === 0;
-
-      if (isRoundOver) {
-        const response = await authAxios.get(
-          `/api/v1.0/rounds/${roundId}/secret-code`
-        );
-        const data = response.data;
-        secretCode = data.secret_code;
+      const moveInfo = await socket.timeout(5000).emitWithAck("submit_move", {
+        round_id: Number(roundId),
+        guess: currChoice,
+      });
+      if (moveInfo.error) {
+        console.error(moveInfo.error.message);
+        return;
       }
       setCurrChoice([]);
-      const newRoundInfo = {
-        feedback: `${message}`,
-        status: isRoundOver ? status.COMPLETED : status.IN_PROGRESS,
-        turnHistory: [...roundInfo.turnHistory, data],
-        numTurnsRemaining: numTurnsRemaining,
-        numTurnsUsed: data.turn_num,
-      };
-      setRoundInfo((prevRoundInfo) => ({
-        ...prevRoundInfo,
-        ...newRoundInfo,
-        secretCode: secretCode,
-      }));
-      socket.emit("make_move", {
-        room: socketRoomId,
-        round_info: newRoundInfo,
-      });
+      setRoundInfo((prevRoundInfo) =>
+        roundInfoAfterMove(prevRoundInfo, moveInfo)
+      );
     } catch {
       console.error("Could not make move.");
     }
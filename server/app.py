@@ -9,18 +9,40 @@ from flask_cors import CORS
 from werkzeug.exceptions import HTTPException
 from util.json_errors import ErrorResponse
 from events import socketio
+from util.code_pool import init_entropy_provider
+from util.difficulty_registry import difficulty_registry
+from util.identity_cache import identity_cache
+from util.metrics import metrics
+from util.room_store import room_store
+from util import serving
 
 
-def create_app():
+# config overrides the settings of config.Config (e.g. for load tests)
+def create_app(config=None):
     load_dotenv()
     app = Flask(__name__)
     app.config.from_object("config.Config")
+    if config:
+        app.config.update(config)
     CORS(app, supports_credentials=True)
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS", serving.engine_options(app.config)
+    )
     db.init_app(app)
     bcrypt.init_app(app)
     server_session = Session(app)
     migrate = Migrate(app, db)
-    socketio.init_app(app)
+    socketio.init_app(
+        app,
+        async_mode=serving.async_mode,
+        message_queue=app.config.get("SOCKETIO_MESSAGE_QUEUE"),
+        channel=app.config.get("SOCKETIO_CHANNEL", "flask-socketio"),
+    )
+    init_entropy_provider(app)
+    difficulty_registry.init_app(app)
+    identity_cache.init_app(app)
+    metrics.init_app(app)
+    room_store.init_app(app)
 
     # Generic Error handler so try, except is not needed for every route
     @app.errorhandler(HTTPException)
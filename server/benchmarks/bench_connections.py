@@ -0,0 +1,213 @@
+# Concurrent connection capacity of a worker in each async mode
+# Run from the server directory with
+# "python -m benchmarks.bench_connections --async-mode threading --async-mode eventlet"
+# (eventlet needs to be installed)
+# For each mode, starts a worker and opens idle Socket.IO WebSocket connections
+# in steps of --step up to --connections. After each step it reports the
+# connections still open, the time the step took, p50/p95 of a new Socket.IO
+# handshake made while they are open and the worker's threads and memory. A
+# mode stops at the first step where connections fail or handshakes time out
+# Connections are raw sockets answering the server's pings, so the benchmark
+# process stays small, and the open files limit is raised to the hard limit
+import argparse
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import os
+import resource
+import select
+import socket
+import struct
+import time
+from urllib.parse import urlparse
+import psutil
+import requests
+from benchmarks.socketio_worker import spawn_worker, stop_worker
+
+UPGRADE_REQUEST = (
+    "GET /socket.io/?EIO=4&transport=websocket HTTP/1.1\r\n"
+    "Host: {host}:{port}\r\n"
+    "Upgrade: websocket\r\n"
+    "Connection: Upgrade\r\n"
+    "Sec-WebSocket-Key: {key}\r\n"
+    "Sec-WebSocket-Version: 13\r\n\r\n"
+)
+# Engine.IO packets, "40" connects the client to the default Socket.IO namespace
+PING, PONG, CONNECT = b"2", b"3", b"40"
+CONNECT_TIMEOUT = 10
+NUM_PROBES = 20
+PROBE_TIMEOUT = 5
+
+
+# Client frames are masked text frames, payloads here are a few bytes
+def text_frame(payload):
+    mask = os.urandom(4)
+    masked = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    return struct.pack("!BB", 0x81, 0x80 | len(payload)) + mask + masked
+
+
+class IdleConnection:
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.sock.sendall(
+            UPGRADE_REQUEST.format(host=host, port=port, key=key).encode()
+        )
+        response = b""
+        while b"\r\n\r\n" not in response:
+            data = self.sock.recv(4096)
+            if not data:
+                raise ConnectionError("Connection closed during the upgrade")
+            response += data
+        headers, self.buffer = response.split(b"\r\n\r\n", 1)
+        if not headers.startswith(b"HTTP/1.1 101"):
+            raise ConnectionError(headers.split(b"\r\n", 1)[0].decode())
+        self.sock.sendall(text_frame(CONNECT))
+        self.sock.setblocking(False)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    # Reads what the server sent and answers pings, returns False once the
+    # server closed the connection
+    def handle_input(self):
+        try:
+            data = self.sock.recv(65536)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        if not data:
+            return False
+        self.buffer += data
+        # server frames are unmasked, only short lengths are expected
+        while len(self.buffer) >= 2:
+            opcode, length = self.buffer[0] & 0x0F, self.buffer[1] & 0x7F
+            header_size = 2
+            if length == 126:
+                header_size, length = 4, struct.unpack("!H", self.buffer[2:4])[0]
+            elif length == 127:
+                header_size, length = 10, struct.unpack("!Q", self.buffer[2:10])[0]
+            if len(self.buffer) < header_size + length:
+                break
+            payload = self.buffer[header_size : header_size + length]
+            self.buffer = self.buffer[header_size + length :]
+            if opcode == 0x8:
+                return False
+            if opcode == 0x1 and payload == PING:
+                self.sock.sendall(text_frame(PONG))
+        return True
+
+    def close(self):
+        self.sock.close()
+
+
+# Answers pings of every connection, returns the connections still open
+def service(connections):
+    poller = select.poll()
+    for connection in connections:
+        poller.register(connection, select.POLLIN)
+    readable = {fd for fd, _ in poller.poll(0)}
+    open_connections = []
+    for connection in connections:
+        if connection.fileno() not in readable or connection.handle_input():
+            open_connections.append(connection)
+        else:
+            connection.close()
+    return open_connections
+
+
+def open_connections(host, port, count, executor):
+    def open_one(_):
+        try:
+            return IdleConnection(host, port)
+        except OSError:
+            return None
+
+    results = list(executor.map(open_one, range(count)))
+    return [connection for connection in results if connection], results.count(None)
+
+
+# Seconds of each new polling handshake, None for one that failed
+def probe(url):
+    latencies = []
+    for _ in range(NUM_PROBES):
+        start = time.perf_counter()
+        try:
+            requests.get(
+                f"{url}/socket.io/?EIO=4&transport=polling", timeout=PROBE_TIMEOUT
+            ).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except requests.RequestException:
+            latencies.append(None)
+    return latencies
+
+
+def run_mode(async_mode, max_connections, step, opener_threads):
+    process, url = spawn_worker(async_mode=async_mode)
+    parsed = urlparse(url)
+    worker = psutil.Process(process.pid)
+    connections = []
+    print(f"\n{async_mode}")
+    print(
+        f"{'open':>7} {'failed':>7} {'step s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'threads':>8} {'RSS MB':>8}"
+    )
+    try:
+        with ThreadPoolExecutor(opener_threads) as executor:
+            while len(connections) < max_connections:
+                start = time.perf_counter()
+                count = min(step, max_connections - len(connections))
+                opened, failed = open_connections(
+                    parsed.hostname, parsed.port, count, executor
+                )
+                connections = service(connections + opened)
+                elapsed = time.perf_counter() - start
+                latencies = probe(url)
+                connections = service(connections)
+                succeeded = [latency for latency in latencies if latency is not None]
+                p50, p95 = (
+                    np.percentile(np.array(succeeded) * 1000, [50, 95])
+                    if succeeded
+                    else (float("nan"), float("nan"))
+                )
+                print(
+                    f"{len(connections):>7} {failed:>7} {elapsed:>7.2f} "
+                    f"{p50:>8.2f} {p95:>8.2f} {worker.num_threads():>8} "
+                    f"{worker.memory_info().rss / 2**20:>8.1f}"
+                )
+                if failed or len(succeeded) < len(latencies):
+                    print(f"{async_mode} stopped at {len(connections)} connections")
+                    break
+    finally:
+        for connection in connections:
+            connection.close()
+        stop_worker(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent connection capacity")
+    parser.add_argument(
+        "--async-mode",
+        action="append",
+        choices=["threading", "eventlet"],
+        help="repeat to compare modes, defaults to threading and eventlet",
+    )
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--step", type=int, default=500)
+    parser.add_argument(
+        "--opener-threads", type=int, default=32, help="connections opened at once"
+    )
+    args = parser.parse_args()
+
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+    for async_mode in args.async_mode or ["threading", "eventlet"]:
+        try:
+            run_mode(async_mode, args.connections, args.step, args.opener_threads)
+        except RuntimeError as e:
+            print(f"\n{async_mode} could not be run: {e}")
+
+
+if __name__ == "__main__":
+    main()
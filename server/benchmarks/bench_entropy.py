@@ -0,0 +1,78 @@
+# Latency of generating one secret code with each entropy provider
+# Run from the server directory with "python -m benchmarks.bench_entropy"
+# random.org is simulated by a local fake server unless --live is passed
+import argparse
+import numpy as np
+import time
+from benchmarks.fake_random_org import FakeRandomOrgServer
+from util.code_pool import SecretCodePool
+from util.entropy import LocalEntropyProvider, RandomOrgEntropyProvider
+
+
+def measure(provider, iterations, num_holes, num_colors):
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        provider.secret_code(num_holes, num_colors)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1e6
+
+
+def report(name, latencies):
+    print(
+        f"{name:<24} {latencies.mean():>12,.1f} {np.percentile(latencies, 50):>12,.1f} "
+        f"{np.percentile(latencies, 99):>12,.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entropy provider benchmark")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--num-holes", type=int, default=4)
+    parser.add_argument("--num-colors", type=int, default=8)
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="simulated network delay (seconds)"
+    )
+    parser.add_argument("--live", action="store_true", help="call www.random.org")
+    args = parser.parse_args()
+
+    print(f"{'provider':<24} {'mean us':>12} {'p50 us':>12} {'p99 us':>12}")
+    report(
+        "local",
+        measure(
+            LocalEntropyProvider(), args.iterations, args.num_holes, args.num_colors
+        ),
+    )
+    with FakeRandomOrgServer(delay=args.delay) as server:
+        report(
+            "random.org (fake)",
+            measure(
+                RandomOrgEntropyProvider(server.url),
+                args.iterations,
+                args.num_holes,
+                args.num_colors,
+            ),
+        )
+        pool = SecretCodePool(
+            RandomOrgEntropyProvider(server.url), pool_size=args.iterations
+        )
+        pool.refill(args.num_holes, args.num_colors)
+        report(
+            "random.org (pooled)",
+            measure(pool, args.iterations, args.num_holes, args.num_colors),
+        )
+        pool.join()
+    if args.live:
+        report(
+            "random.org (live)",
+            measure(
+                RandomOrgEntropyProvider(),
+                min(args.iterations, 10),
+                args.num_holes,
+                args.num_colors,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
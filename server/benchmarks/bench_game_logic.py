@@ -0,0 +1,192 @@
+# Cost of the game_logic core (scoring, validation and secret code generation)
+# for every (num_holes, num_colors) seeded by init_db
+# Run from the server directory with "python -m benchmarks.bench_game_logic"
+# Results are written as JSON, pass --compare with an older file to see the
+# change per function
+import argparse
+from datetime import datetime, timezone
+import json
+import numpy as np
+import platform
+import random
+import subprocess
+import timeit
+import tracemalloc
+from init_db import difficulty_keys
+from util.code import Code
+from util.entropy import LocalEntropyProvider, set_entropy_provider
+from util.game_logic import calculate_result, get_random_secret_code, is_code_valid
+
+# Scaling exponents (time ~ holes^a * colors^b) above this are reported
+SUPERLINEAR_EXPONENT = 1.2
+
+
+# Calls per second of fn, best of 3 runs of at least min_time seconds
+def ops_per_second(fn, min_time):
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2
+    return number / min([elapsed] + timer.repeat(repeat=2, number=number))
+
+
+# Average peak bytes allocated while fn runs
+def bytes_allocated_per_call(fn, calls=50):
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            fn()
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / calls
+
+
+# (name, fn) of the benchmarked calls for one difficulty
+def cases(num_holes, num_colors, rng):
+    guess = [rng.randrange(num_colors) for _ in range(num_holes)]
+    secret_code = [rng.randrange(num_colors) for _ in range(num_holes)]
+    packed_guess = Code.from_list(guess, num_holes, num_colors)
+    packed_secret_code = Code.from_list(secret_code, num_holes, num_colors)
+    return [
+        ("calculate_result", lambda: calculate_result(guess, secret_code, num_colors)),
+        (
+            "calculate_result_code",
+            lambda: calculate_result(packed_guess, packed_secret_code, num_colors),
+        ),
+        ("is_code_valid", lambda: is_code_valid(guess, num_holes, num_colors)),
+        ("code_from_list", lambda: Code.from_list(guess, num_holes, num_colors)),
+        ("code_to_list", packed_guess.to_list),
+        (
+            "get_random_secret_code",
+            lambda: get_random_secret_code(num_holes, num_colors),
+        ),
+    ]
+
+
+# Least squares fit of log(time per call) = a log(holes) + b log(colors) + c
+def scaling_exponents(results, function):
+    rows = [row for row in results if row["function"] == function]
+    features = np.array(
+        [[np.log(row["num_holes"]), np.log(row["num_colors"]), 1.0] for row in rows]
+    )
+    times = np.log([1 / row["ops_per_second"] for row in rows])
+    (holes_exponent, colors_exponent, _), *_ = np.linalg.lstsq(
+        features, times, rcond=None
+    )
+    return {"holes": float(holes_exponent), "colors": float(colors_exponent)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Prints the ops/sec ratio (new / old) per function over the shared difficulties
+def compare(results, baseline):
+    old_rates = {
+        (row["function"], row["num_holes"], row["num_colors"]): row["ops_per_second"]
+        for row in baseline["results"]
+    }
+    ratios = {}
+    for row in results:
+        key = (row["function"], row["num_holes"], row["num_colors"])
+        if key in old_rates:
+            ratios.setdefault(row["function"], []).append(
+                row["ops_per_second"] / old_rates[key]
+            )
+    print(f"\ncompared with {baseline['metadata'].get('commit') or 'baseline'}")
+    print(f"{'function':<24} {'geomean':>8} {'worst':>8} {'best':>8}")
+    for function, function_ratios in ratios.items():
+        print(
+            f"{function:<24} {np.exp(np.mean(np.log(function_ratios))):>7.2f}x "
+            f"{min(function_ratios):>7.2f}x {max(function_ratios):>7.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="game_logic micro-benchmarks")
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.02,
+        help="minimum seconds per timing run",
+    )
+    parser.add_argument("--output", default="bench_game_logic.json")
+    parser.add_argument("--compare", help="results file of an earlier run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    set_entropy_provider(LocalEntropyProvider())
+    grid = sorted(
+        {(num_holes, num_colors) for _, _, num_holes, num_colors in difficulty_keys()}
+    )
+
+    results = []
+    print(
+        f"{'function':<24} {'holes':>5} {'colors':>6} {'ops/s':>12} "
+        f"{'ns/call':>9} {'bytes/call':>10}"
+    )
+    for num_holes, num_colors in grid:
+        for function, fn in cases(num_holes, num_colors, rng):
+            rate = ops_per_second(fn, args.min_time)
+            allocated = bytes_allocated_per_call(fn)
+            results.append(
+                {
+                    "function": function,
+                    "num_holes": num_holes,
+                    "num_colors": num_colors,
+                    "ops_per_second": rate,
+                    "bytes_allocated_per_call": allocated,
+                }
+            )
+            print(
+                f"{function:<24} {num_holes:>5} {num_colors:>6} {rate:>12,.0f} "
+                f"{1e9 / rate:>9,.0f} {allocated:>10,.0f}"
+            )
+
+    functions = list(dict.fromkeys(row["function"] for row in results))
+    scaling = {function: scaling_exponents(results, function) for function in functions}
+    print(f"\n{'function':<24} {'holes exp':>9} {'colors exp':>10}")
+    for function, exponents in scaling.items():
+        flag = "  superlinear" if max(exponents.values()) > SUPERLINEAR_EXPONENT else ""
+        print(
+            f"{function:<24} {exponents['holes']:>9.2f} {exponents['colors']:>10.2f}{flag}"
+        )
+
+    output = {
+        "metadata": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "min_time": args.min_time,
+        },
+        "results": results,
+        "scaling": scaling,
+    }
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# Latency of a multiplayer move over the network, HTTP plus relay vs submit_move
+# Run from the server directory with "python -m benchmarks.bench_moves"
+# Starts a worker and plays multiplayer rounds with two players, alternating
+# the two ways of making a move:
+# - http: POST /rounds/<id>/turns, then the make_move event relays the result
+#   to the opponent (the current client flow)
+# - socket: the submit_move event saves the move, acknowledges the mover and
+#   sends move_made to the opponent
+# Reports p50/p95 ms until the mover has the result and until the opponent
+# has it, exits with 1 if a move failed
+import argparse
+from collections import defaultdict
+import numpy as np
+import queue
+import random
+import sys
+import time
+import requests
+from socketio import Client
+from benchmarks.socketio_worker import spawn_worker, stop_worker
+from util.moves import round_room
+
+API_PREFIX = "/v1.0"
+NUM_HOLES, NUM_COLORS, MAX_TURNS = 4, 8, 10
+EVENT_TIMEOUT = 10
+
+
+class MoveFailed(Exception):
+    pass
+
+
+class Player:
+    def __init__(self, url, transports):
+        self.url = url
+        self.http = requests.Session()
+        self.request("POST", "/auth/register")
+        self.id = self.request("GET", "/users/me")["id"]
+        self.events = queue.Queue()
+        # the socket shares the session cookie of the HTTP requests
+        self.socket = Client(http_session=self.http)
+        for name in ("new_round", "new_move_info", "move_made"):
+            self.socket.on(name, self.queue_event(name))
+        self.socket.connect(url, transports=transports)
+
+    def queue_event(self, name):
+        return lambda data=None: self.events.put((name, time.perf_counter(), data))
+
+    def request(self, method, path, **kwargs):
+        response = self.http.request(method, f"{self.url}{API_PREFIX}{path}", **kwargs)
+        if response.status_code >= 400:
+            raise MoveFailed(f"{method} {path} returned {response.status_code}")
+        return response.json()
+
+    # Time the named event arrived, events from earlier moves are skipped
+    def wait_for(self, name):
+        deadline = time.perf_counter() + EVENT_TIMEOUT
+        while True:
+            try:
+                event_name, received_at, _ = self.events.get(
+                    timeout=max(0, deadline - time.perf_counter())
+                )
+            except queue.Empty:
+                raise MoveFailed(f"{name} was not received")
+            if event_name == name:
+                return received_at
+
+
+def random_code(rng):
+    return [rng.randrange(NUM_COLORS) for _ in range(NUM_HOLES)]
+
+
+# Creates a room, a 2 round game and its first round with the secret code set
+# and both players in the round's socket room, returns (code breaker, code
+# maker, round id, socket room)
+def start_round(host, guest, rng):
+    room = host.request("POST", "/rooms/")
+    guest.request("POST", "/rooms/join", json={"code": room["code"]})
+    game = host.request(
+        "POST",
+        "/games/",
+        json={
+            "is_multiplayer": True,
+            "difficulty": "NORMAL",
+            "max_turns": MAX_TURNS,
+            "num_holes": NUM_HOLES,
+            "num_colors": NUM_COLORS,
+            "num_rounds": 2,
+            "room_id": room["id"],
+        },
+    )
+    round_id = host.request("POST", f"/games/{game['id']}/rounds")["id"]
+    round = host.request("GET", f"/rounds/{round_id}")
+    code_breaker, code_maker = (
+        (host, guest) if round["code_breaker_id"] == host.id else (guest, host)
+    )
+    code_maker.request(
+        "PATCH",
+        f"/rounds/{round_id}/secret-code",
+        json={"secret_code": random_code(rng)},
+    )
+    room_name = round_room(game["id"], round_id)
+    for player in (code_breaker, code_maker):
+        player.socket.emit("join_multiplayer_round", {"room": room_name})
+        player.wait_for("new_round")
+    return code_breaker, code_maker, round_id, room_name
+
+
+# Returns (mover seconds, opponent seconds, round over)
+def http_move(code_breaker, code_maker, round_id, room_name, guess):
+    start = time.perf_counter()
+    turn = code_breaker.request(
+        "POST", f"/rounds/{round_id}/turns", json={"guess": guess}
+    )
+    mover_done = time.perf_counter()
+    turns_remaining = MAX_TURNS - turn["turn_num"]
+    code_breaker.socket.emit(
+        "make_move",
+        {
+            "room": room_name,
+            "round_info": {
+                "turnHistory": [turn],
+                "numTurnsRemaining": turns_remaining,
+                "numTurnsUsed": turn["turn_num"],
+            },
+        },
+    )
+    opponent_done = code_maker.wait_for("new_move_info")
+    round_over = turn["result"]["won_round"] or turns_remaining == 0
+    return mover_done - start, opponent_done - start, round_over
+
+
+def socket_move(code_breaker, code_maker, round_id, room_name, guess):
+    start = time.perf_counter()
+    move = code_breaker.socket.call(
+        "submit_move",
+        {"round_id": round_id, "guess": guess},
+        timeout=EVENT_TIMEOUT,
+    )
+    mover_done = time.perf_counter()
+    if "error" in move:
+        raise MoveFailed(move["error"]["message"])
+    opponent_done = code_maker.wait_for("move_made")
+    return mover_done - start, opponent_done - start, move["status"] == "COMPLETED"
+
+
+def run(url, num_moves, transports, seed):
+    rng = random.Random(seed)
+    host, guest = Player(url, transports), Player(url, transports)
+    latencies = defaultdict(list)  # (flow, "mover" or "opponent") => seconds
+    flows = {"http": http_move, "socket": socket_move}
+    try:
+        round_over = True
+        for move_num in range(num_moves * len(flows)):
+            if round_over:
+                code_breaker, code_maker, round_id, room_name = start_round(
+                    host, guest, rng
+                )
+            flow = list(flows)[move_num % len(flows)]
+            mover, opponent, round_over = flows[flow](
+                code_breaker, code_maker, round_id, room_name, random_code(rng)
+            )
+            latencies[(flow, "mover")].append(mover)
+            latencies[(flow, "opponent")].append(opponent)
+    finally:
+        for player in (host, guest):
+            player.socket.disconnect()
+    return latencies
+
+
+def report(latencies):
+    print(f"{'flow':<8} {'until':<9} {'moves':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for (flow, until), values in sorted(latencies.items()):
+        p50, p95 = np.percentile(np.array(values) * 1000, [50, 95])
+        print(f"{flow:<8} {until:<9} {len(values):>6} {p50:>8.2f} {p95:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multiplayer move latency")
+    parser.add_argument("--moves", type=int, default=100, help="moves per flow")
+    parser.add_argument(
+        "--websocket",
+        action="store_true",
+        help="connect with WebSockets (needs websocket-client) instead of polling",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    transports = ["websocket"] if args.websocket else ["polling"]
+    process, url = spawn_worker()
+    try:
+        latencies = run(url, args.moves, transports, args.seed)
+    except MoveFailed as e:
+        print(f"Move failed: {e}")
+        sys.exit(1)
+    finally:
+        stop_worker(process)
+    print(f"{args.moves} moves per flow, transport {transports[0]}")
+    report(latencies)
+
+
+if __name__ == "__main__":
+    main()
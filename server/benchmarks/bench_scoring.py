@@ -0,0 +1,78 @@
+# Compares pairs/second of the batch scorer against the original per-pair loop
+# Run from the server directory with "python -m benchmarks.bench_scoring"
+import argparse
+import numpy as np
+import time
+from util.scoring import score_matrix
+
+# (name, num_holes, num_colors) of the NORMAL, HARD and largest CUSTOM
+# difficulties seeded by init_db.init_difficulties
+DIFFICULTIES = [
+    ("NORMAL", 4, 8),
+    ("HARD", 5, 10),
+    ("CUSTOM", 10, 20),
+]
+
+
+# The per-pair loop calculate_result used before batch scoring
+def loop_score(guess, secret_code):
+    black_pegs = 0
+    white_pegs = 0
+    remaining_pegs_guess = {}
+    remaining_pegs_secret_code = {}
+    for i in range(len(guess)):
+        if guess[i] == secret_code[i]:
+            black_pegs += 1
+        else:
+            remaining_pegs_guess[guess[i]] = remaining_pegs_guess.get(guess[i], 0) + 1
+            remaining_pegs_secret_code[secret_code[i]] = (
+                remaining_pegs_secret_code.get(secret_code[i], 0) + 1
+            )
+    for key in remaining_pegs_guess.keys():
+        if key in remaining_pegs_secret_code:
+            white_pegs += min(
+                remaining_pegs_guess[key], remaining_pegs_secret_code[key]
+            )
+    return black_pegs, white_pegs
+
+
+def bench_loop(guesses, secret_codes):
+    guesses, secret_codes = guesses.tolist(), secret_codes.tolist()
+    start = time.perf_counter()
+    for guess in guesses:
+        for secret_code in secret_codes:
+            loop_score(guess, secret_code)
+    return len(guesses) * len(secret_codes) / (time.perf_counter() - start)
+
+
+def bench_batch(guesses, secret_codes, num_colors):
+    start = time.perf_counter()
+    score_matrix(guesses, secret_codes, num_colors)
+    return len(guesses) * len(secret_codes) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scoring benchmark")
+    parser.add_argument("--guesses", type=int, default=100)
+    parser.add_argument("--secret-codes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(
+        f"{'difficulty':<10} {'holes':>5} {'colors':>6} {'loop pairs/s':>14} "
+        f"{'batch pairs/s':>14} {'speedup':>8}"
+    )
+    for name, num_holes, num_colors in DIFFICULTIES:
+        guesses = rng.integers(0, num_colors, (args.guesses, num_holes))
+        secret_codes = rng.integers(0, num_colors, (args.secret_codes, num_holes))
+        loop_rate = bench_loop(guesses, secret_codes)
+        batch_rate = bench_batch(guesses, secret_codes, num_colors)
+        print(
+            f"{name:<10} {num_holes:>5} {num_colors:>6} {loop_rate:>14,.0f} "
+            f"{batch_rate:>14,.0f} {batch_rate / loop_rate:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
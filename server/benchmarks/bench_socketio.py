@@ -0,0 +1,114 @@
+# Throughput of room broadcasts across Socket.IO workers
+# Run from the server directory with
+# "python -m benchmarks.bench_socketio --workers 2 --message-queue redis://127.0.0.1:6379"
+# Starts --workers worker processes, connects --receivers clients spread over
+# them round robin and one sender on the first worker, all in one room. The
+# sender emits --events make_move events and the benchmark reports how many
+# new_move_info events per second reached the receivers
+# More than one worker needs --message-queue, exits with 1 if events were lost
+import argparse
+import sys
+import threading
+import time
+from socketio import Client
+from benchmarks.socketio_worker import spawn_worker, stop_worker
+
+ROOM = "bench_socketio"
+# Events the sender has in flight, the sender gets its own broadcasts back and
+# waits for them before sending more. A polling client batches queued events
+# into one request and Engine.IO rejects requests of more than 16 packets
+MAX_IN_FLIGHT = 8
+
+
+class Receiver:
+    def __init__(self, url, expected, transports):
+        self.expected = expected
+        self.received = 0
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.client = Client()
+        self.client.on("new_move_info", self.on_move)
+        self.client.connect(url, transports=transports)
+
+    def on_move(self, data):
+        with self.lock:
+            self.received += 1
+            if self.received >= self.expected:
+                self.done.set()
+
+
+# Joins the room and waits for the worker to acknowledge it, a plain emit
+# could be overtaken by the sender's events on another worker
+def join(client):
+    joined = threading.Event()
+    client.on("user_joined", lambda data: joined.set())
+    client.emit("waiting_room", {"room": ROOM, "players": []})
+    if not joined.wait(10):
+        raise RuntimeError("Client did not join the room")
+
+
+def run(num_workers, num_receivers, num_events, message_queue, transports):
+    workers = [spawn_worker(message_queue) for _ in range(num_workers)]
+    urls = [url for _, url in workers]
+    receivers = []
+    sender = Client()
+    try:
+        for i in range(num_receivers):
+            receiver = Receiver(urls[i % num_workers], num_events, transports)
+            receivers.append(receiver)
+            join(receiver.client)
+        in_flight = threading.Semaphore(MAX_IN_FLIGHT)
+        sender.on("new_move_info", lambda data: in_flight.release())
+        sender.connect(urls[0], transports=transports)
+        join(sender)
+
+        start = time.perf_counter()
+        for i in range(num_events):
+            if not in_flight.acquire(timeout=10):
+                break
+            sender.emit("make_move", {"room": ROOM, "round_info": {"turn": i}})
+        deadline = start + max(30, num_events / 100)
+        for receiver in receivers:
+            receiver.done.wait(max(0, deadline - time.perf_counter()))
+        elapsed = time.perf_counter() - start
+        return sum(receiver.received for receiver in receivers), elapsed
+    finally:
+        for client in [sender] + [receiver.client for receiver in receivers]:
+            if client.connected:
+                client.disconnect()
+        for process, _ in workers:
+            stop_worker(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO broadcast benchmark")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--receivers", type=int, default=4)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--message-queue", help="Redis URL, required for 2+ workers")
+    parser.add_argument(
+        "--websocket",
+        action="store_true",
+        help="connect with WebSockets (needs websocket-client) instead of polling",
+    )
+    args = parser.parse_args()
+    if args.workers > 1 and not args.message_queue:
+        parser.error("--message-queue is required with more than one worker")
+
+    transports = ["websocket"] if args.websocket else ["polling"]
+    delivered, elapsed = run(
+        args.workers, args.receivers, args.events, args.message_queue, transports
+    )
+    expected = args.receivers * args.events
+    print(
+        f"{args.workers} worker(s), {args.receivers} receivers, "
+        f"{args.events} events, transport {transports[0]}"
+    )
+    print(f"delivered {delivered}/{expected} in {elapsed:.2f}s")
+    print(f"{delivered / elapsed:,.0f} events/s delivered")
+    if delivered < expected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
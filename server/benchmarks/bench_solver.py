@@ -0,0 +1,73 @@
+# Average turns to solve and time per decision of the computer codebreaker
+# Run from the server directory with "python -m benchmarks.bench_solver"
+import argparse
+import numpy as np
+import time
+from util.scoring import score_matrix
+from util.solver import DEFAULT_TIME_BUDGET, next_guess
+
+# (name, max_turns, num_holes, num_colors) of the NORMAL, HARD and largest
+# CUSTOM difficulties seeded by init_db.init_difficulties
+DIFFICULTIES = [
+    ("NORMAL", 10, 4, 8),
+    ("HARD", 12, 5, 10),
+    ("CUSTOM", 20, 10, 20),
+]
+
+
+# Plays one game, returns (turns needed or None if unsolved, decision times)
+def play_game(secret_code, num_holes, num_colors, max_turns, strategy, budget, rng):
+    history, decision_times = [], []
+    for turn_num in range(1, max_turns + 1):
+        start = time.perf_counter()
+        guess = next_guess(
+            history, num_holes, num_colors, strategy, time_budget=budget, rng=rng
+        )
+        decision_times.append(time.perf_counter() - start)
+        black_pegs, white_pegs = score_matrix([guess], [secret_code], num_colors)
+        if black_pegs[0, 0] == num_holes:
+            return turn_num, decision_times
+        history.append((guess, int(black_pegs[0, 0]), int(white_pegs[0, 0])))
+    return None, decision_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Codebreaker solver benchmark")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--strategy", default="minimax")
+    parser.add_argument("--budget", type=float, default=DEFAULT_TIME_BUDGET)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(
+        f"{'difficulty':<10} {'solved':>7} {'avg turns':>10} {'worst':>6} "
+        f"{'avg ms/decision':>16} {'max ms/decision':>16}"
+    )
+    for name, max_turns, num_holes, num_colors in DIFFICULTIES:
+        turns, decision_times = [], []
+        for _ in range(args.games):
+            secret_code = rng.integers(0, num_colors, num_holes).tolist()
+            turns_needed, times = play_game(
+                secret_code,
+                num_holes,
+                num_colors,
+                max_turns,
+                args.strategy,
+                args.budget,
+                rng,
+            )
+            decision_times.extend(times)
+            if turns_needed:
+                turns.append(turns_needed)
+        print(
+            f"{name:<10} {len(turns):>3}/{args.games:<3} "
+            f"{np.mean(turns) if turns else float('nan'):>10.2f} "
+            f"{max(turns, default=0):>6} "
+            f"{np.mean(decision_times) * 1000:>16.1f} "
+            f"{np.max(decision_times) * 1000:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
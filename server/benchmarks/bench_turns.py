@@ -0,0 +1,97 @@
+# CPU time per move spent scoring the guess and building its Turn, comparing
+# the validating guess/result setters with Turn.from_trusted
+# Run from the server directory with "python -m benchmarks.bench_turns"
+# Objects are transient, so the lazy loads the setters can trigger on a real
+# round (round.game.difficulty) are not included in the validated timings
+import argparse
+import json
+import random
+import timeit
+from models.models import Difficulty, Game, Round, Turn
+from util.code import Code
+from util.enum import DifficultyEnum, StatusEnum
+from util.game_logic import calculate_result
+
+# (name, num_holes, num_colors) of the NORMAL, HARD and largest CUSTOM
+# difficulties seeded by init_db.init_difficulties
+DIFFICULTIES = [
+    ("NORMAL", 4, 8),
+    ("HARD", 5, 10),
+    ("CUSTOM", 10, 20),
+]
+
+
+def setup_round(num_holes, num_colors, secret_code):
+    difficulty = Difficulty(
+        mode=DifficultyEnum.CUSTOM,
+        max_turns=20,
+        num_holes=num_holes,
+        num_colors=num_colors,
+    )
+    game = Game(
+        is_multiplayer=False,
+        difficulty=difficulty,
+        status=StatusEnum.IN_PROGRESS,
+        num_rounds=1,
+    )
+    return Round(
+        id=1,
+        game=game,
+        status=StatusEnum.IN_PROGRESS,
+        round_num=1,
+        secret_code=json.dumps(secret_code),
+    )
+
+
+# How make_move built turns before: score, then serialize and re-validate
+def validated_move(round, guess, secret_code, num_holes, num_colors):
+    result = calculate_result(
+        Code.from_list(guess, num_holes, num_colors), secret_code, num_colors
+    )
+    return Turn(
+        round=round,
+        turn_num=1,
+        guess=json.dumps(guess),
+        result=json.dumps(result),
+    )
+
+
+def trusted_move(round, guess, secret_code, num_holes, num_colors):
+    guess_code = Code.from_list(guess, num_holes, num_colors)
+    result = calculate_result(guess_code, secret_code, num_colors)
+    return Turn.from_trusted(round.id, 1, guess_code, result)
+
+
+# Microseconds per call, best of 5
+def time_move(move, number, *args):
+    timer = timeit.Timer(lambda: move(*args))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn construction benchmark")
+    parser.add_argument("--moves", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(
+        f"{'difficulty':<10} {'validated us':>13} {'trusted us':>11} "
+        f"{'saved us':>9} {'speedup':>8}"
+    )
+    for name, num_holes, num_colors in DIFFICULTIES:
+        secret_code = [rng.randrange(num_colors) for _ in range(num_holes)]
+        guess = [rng.randrange(num_colors) for _ in range(num_holes)]
+        round = setup_round(num_holes, num_colors, secret_code)
+        packed_secret_code = Code.from_list(secret_code, num_holes, num_colors)
+        move_args = (round, guess, packed_secret_code, num_holes, num_colors)
+        validated = time_move(validated_move, args.moves, *move_args)
+        trusted = time_move(trusted_move, args.moves, *move_args)
+        print(
+            f"{name:<10} {validated:>13.1f} {trusted:>11.1f} "
+            f"{validated - trusted:>9.1f} {validated / trusted:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
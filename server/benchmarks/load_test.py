@@ -0,0 +1,268 @@
+# End-to-end load test of the game flow against create_app()
+# Run from the server directory with "python -m benchmarks.load_test"
+# Each single player session registers, creates a game and a round and plays
+# random guesses until the round is won or lost. Each multiplayer session
+# creates and joins a room, starts a 2 round game and plays both rounds with
+# the code maker submitting the secret code
+# Uses a SQLite file by default (--database-url for a local Postgres) and a
+# local secret code source, exits with 1 if any request failed
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import json
+import numpy as np
+import os
+import random
+import tempfile
+import threading
+import time
+from cachelib import SimpleCache
+from app import create_app
+from init_db import difficulty_keys, seed_difficulties
+from models.models import db
+from benchmarks.fake_random_org import FakeRandomOrgServer
+from util.difficulty_registry import difficulty_registry
+
+API_PREFIX = "/v1.0"
+NUM_HOLES, NUM_COLORS, MAX_TURNS = 4, 8, 10
+
+
+class RequestFailed(Exception):
+    pass
+
+
+class LoadTestClient:
+    def __init__(self, app, recorder):
+        self.client = app.test_client(use_cookies=True)
+        self.recorder = recorder
+
+    # Sends one request, name is the endpoint label used in the report
+    def request(self, method, name, path, **kwargs):
+        start = time.perf_counter()
+        response = self.client.open(f"{API_PREFIX}{path}", method=method, **kwargs)
+        self.recorder.record(name, time.perf_counter() - start, response.status_code)
+        if response.status_code >= 400:
+            raise RequestFailed(f"{name} returned {response.status_code}")
+        return response.json
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # endpoint => seconds
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, name, latency, status_code):
+        with self.lock:
+            self.latencies[name].append(latency)
+            if status_code >= 400:
+                self.errors[name] += 1
+
+
+def random_code(rng):
+    return [rng.randrange(NUM_COLORS) for _ in range(NUM_HOLES)]
+
+
+# Guesses until the round is over, polling the round like the client does
+def play_round(client, round_id, rng):
+    for _ in range(MAX_TURNS):
+        turn = client.request(
+            "POST",
+            "POST /rounds/<id>/turns",
+            f"/rounds/{round_id}/turns",
+            json={"guess": random_code(rng)},
+        )
+        client.request("GET", "GET /rounds/<id>", f"/rounds/{round_id}")
+        if turn["result"]["won_round"]:
+            return
+
+
+def single_player_session(app, recorder, rng):
+    client = LoadTestClient(app, recorder)
+    client.request("POST", "POST /auth/register", "/auth/register")
+    client.request("GET", "GET /users/me", "/users/me")
+    game = client.request(
+        "POST",
+        "POST /games",
+        "/games/",
+        json={
+            "is_multiplayer": False,
+            "difficulty": "NORMAL",
+            "max_turns": MAX_TURNS,
+            "num_holes": NUM_HOLES,
+            "num_colors": NUM_COLORS,
+        },
+    )
+    round = client.request(
+        "POST", "POST /games/<id>/rounds", f"/games/{game['id']}/rounds"
+    )
+    play_round(client, round["id"], rng)
+    client.request("GET", "GET /games/<id>", f"/games/{game['id']}")
+
+
+def multiplayer_session(app, recorder, rng, num_rounds=2):
+    host, guest = LoadTestClient(app, recorder), LoadTestClient(app, recorder)
+    host.request("POST", "POST /auth/register", "/auth/register")
+    guest.request("POST", "POST /auth/register", "/auth/register")
+    room = host.request("POST", "POST /rooms", "/rooms/")
+    guest.request(
+        "POST", "POST /rooms/join", "/rooms/join", json={"code": room["code"]}
+    )
+    host.request("GET", "GET /rooms/<id>", f"/rooms/{room['id']}")
+    game = host.request(
+        "POST",
+        "POST /games",
+        "/games/",
+        json={
+            "is_multiplayer": True,
+            "difficulty": "NORMAL",
+            "max_turns": MAX_TURNS,
+            "num_holes": NUM_HOLES,
+            "num_colors": NUM_COLORS,
+            "num_rounds": num_rounds,
+            "room_id": room["id"],
+        },
+    )
+    players = {}
+    for client in (host, guest):
+        user = client.request("GET", "GET /users/me", "/users/me")
+        players[user["id"]] = client
+
+    for _ in range(num_rounds):
+        # the host creates every round, the code breaker alternates
+        round = host.request(
+            "POST", "POST /games/<id>/rounds", f"/games/{game['id']}/rounds"
+        )
+        round = host.request("GET", "GET /rounds/<id>", f"/rounds/{round['id']}")
+        code_breaker = players[round["code_breaker_id"]]
+        code_maker = guest if code_breaker is host else host
+        code_maker.request(
+            "PATCH",
+            "PATCH /rounds/<id>/secret-code",
+            f"/rounds/{round['id']}/secret-code",
+            json={"secret_code": random_code(rng)},
+        )
+        play_round(code_breaker, round["id"], rng)
+    host.request("GET", "GET /games/<id>", f"/games/{game['id']}")
+
+
+def run_session(app, recorder, session_num, multiplayer_ratio, seed):
+    rng = random.Random(seed + session_num)
+    try:
+        if rng.random() < multiplayer_ratio:
+            multiplayer_session(app, recorder, rng)
+        else:
+            single_player_session(app, recorder, rng)
+        return True
+    except RequestFailed:
+        return False
+
+
+def create_load_test_app(database_url, secret_code_url):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": database_url,
+            "SESSION_TYPE": "cachelib",
+            "SESSION_CACHELIB": SimpleCache(threshold=100000),
+            "SESSION_COOKIE_SECURE": False,
+            "SECRET_CODE_PROVIDER": "random_org" if secret_code_url else "local",
+            "RANDOM_ORG_URL": secret_code_url,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        seed_difficulties(difficulty_keys())
+        difficulty_registry.refresh()
+    return app
+
+
+def report(recorder, elapsed, num_sessions, num_failed):
+    total_requests = sum(len(latencies) for latencies in recorder.latencies.values())
+    print(
+        f"{num_sessions} sessions ({num_failed} failed), {total_requests} requests "
+        f"in {elapsed:.2f}s ({total_requests / elapsed:,.1f} req/s)"
+    )
+    print(
+        f"{'endpoint':<32} {'count':>7} {'errors':>7} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    results = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        results[name] = {
+            "count": len(latencies),
+            "errors": recorder.errors[name],
+            "throughput": len(latencies) / elapsed,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        }
+        print(
+            f"{name:<32} {len(latencies):>7} {recorder.errors[name]:>7} "
+            f"{len(latencies) / elapsed:>9,.1f} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game flow load test")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--multiplayer-ratio",
+        type=float,
+        default=0.25,
+        help="fraction of sessions that are multiplayer",
+    )
+    parser.add_argument(
+        "--database-url", help="defaults to a temporary SQLite file, tables are created"
+    )
+    parser.add_argument(
+        "--fake-random-org",
+        action="store_true",
+        help="serve secret codes from a local fake random.org instead of the CSPRNG",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the per-endpoint results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir, FakeRandomOrgServer() as server:
+        database_url = args.database_url or (
+            f"sqlite:///{os.path.join(tmp_dir, 'load_test.db')}"
+        )
+        app = create_load_test_app(
+            database_url, server.url if args.fake_random_org else None
+        )
+        recorder = Recorder()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            succeeded = list(
+                executor.map(
+                    lambda session_num: run_session(
+                        app, recorder, session_num, args.multiplayer_ratio, args.seed
+                    ),
+                    range(args.sessions),
+                )
+            )
+        elapsed = time.perf_counter() - start
+        with app.app_context():
+            db.engine.dispose()
+
+    num_failed = succeeded.count(False)
+    results = report(recorder, elapsed, args.sessions, num_failed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "elapsed": elapsed,
+                    "failed_sessions": num_failed,
+                    "endpoints": results,
+                },
+                f,
+                indent=2,
+            )
+    raise SystemExit(1 if num_failed else 0)
+
+
+if __name__ == "__main__":
+    main()
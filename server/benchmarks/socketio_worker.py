@@ -0,0 +1,130 @@
+# One Socket.IO server process, used by the multi-worker test and the
+# Socket.IO benchmark to run several workers on one machine
+# Run from the server directory with
+# "python -m benchmarks.socketio_worker --port 5001 --message-queue redis://127.0.0.1:6379"
+# Uses a SQLite file of its own by default (--database-url for a database
+# shared by the workers) with the tables created and difficulties seeded, and
+# in-process sessions so a client has to stay on one worker
+# --async-mode eventlet runs it like serve.py does (needs eventlet installed)
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import requests
+from util import serving
+
+
+# The app is imported here rather than at the top so that main can patch the
+# process for its async mode first
+def create_worker_app(database_url, message_queue):
+    from cachelib import SimpleCache
+    from app import create_app
+    from init_db import difficulty_keys, seed_difficulties
+    from models.models import db
+    from util.difficulty_registry import difficulty_registry
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": database_url,
+            "SESSION_TYPE": "cachelib",
+            "SESSION_CACHELIB": SimpleCache(threshold=100000),
+            "SESSION_COOKIE_SECURE": False,
+            "SOCKETIO_MESSAGE_QUEUE": message_queue,
+            "METRICS_ENABLED": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        seed_difficulties(difficulty_keys())
+        difficulty_registry.refresh()
+    return app
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Starts a worker as a subprocess of the server directory and waits until it
+# answers the Socket.IO handshake, returns (process, url)
+def spawn_worker(message_queue=None, timeout=15, async_mode="threading"):
+    port = free_port()
+    command = [sys.executable, "-m", "benchmarks.socketio_worker", "--port", str(port)]
+    command += ["--async-mode", async_mode]
+    if message_queue:
+        command += ["--message-queue", message_queue]
+    server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        command,
+        cwd=server_dir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"Worker on port {port} exited with {process.returncode}"
+            )
+        try:
+            requests.get(f"{url}/socket.io/?EIO=4&transport=polling", timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    stop_worker(process)
+    raise RuntimeError(f"Worker on port {port} did not start")
+
+
+def stop_worker(process):
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--message-queue", help="unset for a single worker")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument(
+        "--async-mode", choices=serving.ASYNC_MODES, default="threading"
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=10000,
+        help="connections served at once with --async-mode eventlet",
+    )
+    args = parser.parse_args()
+    serving.patch_for(args.async_mode)
+    from extensions import socketio
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = args.database_url or (
+            f"sqlite:///{os.path.join(tmp_dir, 'worker.db')}"
+        )
+        app = create_worker_app(database_url, args.message_queue)
+        socketio.run(
+            app,
+            host=args.host,
+            port=args.port,
+            log_output=False,
+            **(
+                serving.run_options(args.max_connections)
+                if args.async_mode == "eventlet"
+                else {"allow_unsafe_werkzeug": True}
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,3 +16,39 @@ class Config:
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "None"
+    # Seconds the session user's identity is cached for, 0 disables the cache
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "30"))
+    # "local" (CSPRNG) or "random_org"
+    SECRET_CODE_PROVIDER = os.getenv("SECRET_CODE_PROVIDER", "local")
+    RANDOM_ORG_URL = os.getenv("RANDOM_ORG_URL", "https://www.random.org/integers")
+    RANDOM_ORG_TIMEOUT = float(os.getenv("RANDOM_ORG_TIMEOUT", "2"))
+    # Prefetched random.org codes per (num_holes, num_colors), 0 disables the pool
+    SECRET_CODE_POOL_SIZE = int(os.getenv("SECRET_CODE_POOL_SIZE", "100"))
+    SECRET_CODE_POOL_LOW_WATER = int(os.getenv("SECRET_CODE_POOL_LOW_WATER", "25"))
+    CIRCUIT_BREAKER_FAILURES = int(os.getenv("CIRCUIT_BREAKER_FAILURES", "3"))
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(
+        os.getenv("CIRCUIT_BREAKER_RESET_TIMEOUT", "30")
+    )
+    # random.org calls slower than this many seconds count as failures
+    CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD = float(
+        os.getenv("CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD", "1")
+    )
+    # Serves request, SQL and Socket.IO metrics at /metrics
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Seconds without activity after which a waiting room expires (its code
+    # is then recycled), rooms are kept in SESSION_REDIS
+    WAITING_ROOM_TTL = int(os.getenv("WAITING_ROOM_TTL", str(60 * 60)))
+    # Redis URL (e.g. REDIS_URL) that Socket.IO broadcasts go through so they
+    # reach clients connected to other workers, unset for a single process
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+    SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "flask-socketio")
+    # Database connections per worker process (serve.py), requests and socket
+    # events beyond pool_size + max_overflow wait up to DB_POOL_TIMEOUT seconds
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    # Address serve.py listens on and, with ASYNC_MODE=eventlet, the most
+    # connections (HTTP and Socket.IO) it serves at once
+    HOST = os.getenv("HOST", "0.0.0.0")
+    PORT = int(os.getenv("PORT", "5000"))
+    MAX_CONNECTIONS = int(os.getenv("MAX_CONNECTIONS", "10000"))
@@ -1,28 +1,32 @@
 from extensions import socketio
 from flask_socketio import join_room, leave_room, emit
-from models.models import WaitingRoom
-from util.decorators import session_required
+from util.decorators import session_required, load_round_context
 from flask import session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from util.json_errors import ErrorResponse
 from flask import request
+from util.metrics import count_socket_event
+from util.moves import MoveError, round_room, save_move
 
 
 # All of the events inside the socket
 # Generic socket connection
 @socketio.on("connect")
-def handle_connect():
+@count_socket_event
+def handle_connect(auth=None):
     print("Client connected")
 
 
 @socketio.on("disconnect")
+@count_socket_event
 def handle_disconnect():
     print("Client disconnected")
 
 
 # Handles all logic related to the waiting room
 @socketio.on("waiting_room")
+@count_socket_event
 def handle_join_waiting_room(data):
     room = data.get("room")
     players = data.get("players")
@@ -31,6 +35,7 @@ def handle_join_waiting_room(data):
 
 
 @socketio.on("change_game_settings")
+@count_socket_event
 def change_settings(data):
     room = data.get("room")
     settings = data.get("settings")
@@ -38,6 +43,7 @@ def change_settings(data):
 
 
 @socketio.on("create_multiplayer_game")
+@count_socket_event
 def create_game(data):
     game_id, round_id, room = (
         data.get("game_id"),
@@ -49,6 +55,7 @@ def create_game(data):
 
 # Handles all logic related to the multiplayer feature
 @socketio.on("join_multiplayer_round")
+@count_socket_event
 def handle_join_new_multiplayer_round(data):
     room = data.get("room")
     join_room(room)
@@ -56,19 +63,63 @@ def handle_join_new_multiplayer_round(data):
 
 
 @socketio.on("add_secret_code")
+@count_socket_event
 def add_secret_code(data):
     status, room = data.get("status"), data.get("room")
     print(status)
     emit("start_round", {"status": status}, room=room)
 
 
+# Relays round_info computed by the client after POST /rounds/<id>/turns,
+# kept for clients that do not use submit_move
 @socketio.on("make_move")
+@count_socket_event
 def make_move(data):
     round_info, room = data.get("round_info"), data.get("room")
     emit("new_move_info", {"round_info": round_info}, room=room)
 
 
+# Validates and saves the move like POST /rounds/<id>/turns, the mover gets the
+# result as the acknowledgement and the rest of the round's room gets it as
+# move_made, errors are acknowledged in the ErrorResponse format
+@socketio.on("submit_move")
+@count_socket_event
+def submit_move(data):
+    round_id, guess = data.get("round_id"), data.get("guess")
+    if not isinstance(round_id, int):
+        return ErrorResponse.error_json("Round id is not valid.", 404)
+    try:
+        context = load_round_context(session.get("user_id"), round_id)
+    except SQLAlchemyError as e:
+        logging.error(f"Error fetching Round: {str(e)}")
+        return ErrorResponse.error_json("Round was not able to be fetched.", 503)
+    user, round = context.user, context.round
+    if not user:
+        return ErrorResponse.error_json("Unauthorized access.", 401)
+    if not round:
+        return ErrorResponse.error_json("Round id is not valid.", 404)
+    if not user.id == round.code_breaker_id:
+        return ErrorResponse.error_json("User is not the codebreaker.", 401)
+
+    game_id = round.game_id
+    try:
+        move = save_move(round, user, context.player_ids, guess)
+    except MoveError as e:
+        return ErrorResponse.error_json(e.message, e.status_code)
+    move_info = {
+        "round_id": round_id,
+        "turn": move.turn,
+        "status": move.round_status,
+        "turns_used": move.turns_used,
+        "turns_remaining": move.turns_remaining,
+        "secret_code": move.secret_code,
+    }
+    emit("move_made", move_info, room=round_room(game_id, round_id), include_self=False)
+    return move_info
+
+
 @socketio.on("create_new_round")
+@count_socket_event
 def create_new_round(data):
     game_id, round_id, room = (
         data.get("game_id"),
@@ -1,43 +1,93 @@
 # Script to populate database with preset fields
-from models.models import db, Difficulty, User, Game, Round, Turn, user_games
+# Run with "python -m init_db", pass --max-turns/--max-holes/--max-colors to
+# seed a wider custom range, rows that already exist are skipped
+# Running servers pick up new rows within difficulty_registry's REFRESH_INTERVAL
+from models.models import db, Difficulty
 from util.enum import DifficultyEnum
 from flask import Flask
 from dotenv import load_dotenv
+from sqlalchemy import insert, select
+import argparse
+import time
 
-load_dotenv()
-app = Flask(__name__)
-app.config.from_object("config.Config")
-db.init_app(app)
+# Constants for custom mode
+MIN_TURNS, MAX_TURNS = 10, 20
+MIN_HOLES, MAX_HOLES = 4, 10
+MIN_COLORS, MAX_COLORS = 8, 20
 
+# (mode, max_turns, num_holes, num_colors) of the preset difficulties
+NORMAL_DIFFICULTY = (DifficultyEnum.NORMAL, 10, 4, 8)
+HARD_DIFFICULTY = (DifficultyEnum.HARD, 12, 5, 10)
 
-def init_difficulties():
-    with app.app_context():
-        # Constants for custom mode
-        MIN_TURNS, MAX_TURNS = 10, 20
-        MIN_HOLES, MAX_HOLES = 4, 10
-        MIN_COLORS, MAX_COLORS = 8, 20
-        normal_difficulty = Difficulty(
-            mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+# Rows sent per INSERT statement
+BATCH_SIZE = 5000
+
+
+def create_seed_app():
+    load_dotenv()
+    app = Flask(__name__)
+    app.config.from_object("config.Config")
+    db.init_app(app)
+    return app
+
+
+# Every seeded (mode, max_turns, num_holes, num_colors), custom difficulties first
+def difficulty_keys(max_turns=MAX_TURNS, max_holes=MAX_HOLES, max_colors=MAX_COLORS):
+    for i in range(MIN_TURNS, max_turns + 1):
+        for j in range(MIN_HOLES, max_holes + 1):
+            for k in range(MIN_COLORS, max_colors + 1):
+                yield (DifficultyEnum.CUSTOM, i, j, k)
+    yield NORMAL_DIFFICULTY
+    yield HARD_DIFFICULTY
+
+
+# Bulk inserts the difficulties that do not exist yet
+# Returns (number of rows inserted, number of rows skipped)
+def seed_difficulties(keys, batch_size=BATCH_SIZE):
+    existing_keys = set(
+        tuple(row)
+        for row in db.session.execute(
+            select(
+                Difficulty.mode,
+                Difficulty.max_turns,
+                Difficulty.num_holes,
+                Difficulty.num_colors,
+            )
         )
-        hard_difficulty = Difficulty(
-            mode=DifficultyEnum.HARD, max_turns=12, num_holes=5, num_colors=10
+    )
+    rows, num_skipped = [], 0
+    for key in keys:
+        if key in existing_keys:
+            num_skipped += 1
+            continue
+        existing_keys.add(key)
+        mode, max_turns, num_holes, num_colors = key
+        rows.append(
+            {
+                "mode": mode,
+                "max_turns": max_turns,
+                "num_holes": num_holes,
+                "num_colors": num_colors,
+            }
         )
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(Difficulty), rows[start : start + batch_size])
+    db.session.commit()
+    return len(rows), num_skipped
 
+
+def init_difficulties(max_turns=MAX_TURNS, max_holes=MAX_HOLES, max_colors=MAX_COLORS):
+    app = create_seed_app()
+    with app.app_context():
         try:
-            for i in range(MIN_TURNS, MAX_TURNS + 1):
-                for j in range(MIN_HOLES, MAX_HOLES + 1):
-                    for k in range(MIN_COLORS, MAX_COLORS + 1):
-                        custom_difficulty = Difficulty(
-                            mode=DifficultyEnum.CUSTOM,
-                            max_turns=i,
-                            num_holes=j,
-                            num_colors=k,
-                        )
-                        db.session.add(custom_difficulty)
-            db.session.add(normal_difficulty)
-            db.session.add(hard_difficulty)
-            db.session.commit()
-            print("Difficulties added successfully.")
+            start = time.perf_counter()
+            num_inserted, num_skipped = seed_difficulties(
+                difficulty_keys(max_turns, max_holes, max_colors)
+            )
+            print(
+                f"Difficulties added successfully ({num_inserted} added, "
+                f"{num_skipped} already existed) in {time.perf_counter() - start:.2f}s."
+            )
         except Exception as e:
             db.session.rollback()
             print(f"Error initializing database: {str(e)}")
@@ -46,4 +96,9 @@ def init_difficulties():
 
 
 if __name__ == "__main__":
-    init_difficulties()
+    parser = argparse.ArgumentParser(description="Seed the difficulty table")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--max-holes", type=int, default=MAX_HOLES)
+    parser.add_argument("--max-colors", type=int, default=MAX_COLORS)
+    args = parser.parse_args()
+    init_difficulties(args.max_turns, args.max_holes, args.max_colors)
@@ -0,0 +1,37 @@
+"""Add round.turns_used and a unique turn number per round
+
+Revision ID: 3b7e9d1c5a24
+Revises: 8d2c41f7a6b3
+Create Date: 2026-10-18 14:03:27.418552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e9d1c5a24'
+down_revision = '8d2c41f7a6b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('round', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('turns_used', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE round SET turns_used = "
+        "(SELECT COUNT(*) FROM turn WHERE turn.round_id = round.id)"
+    )
+
+    with op.batch_alter_table('turn', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_turn_round_id_turn_num', ['round_id', 'turn_num'])
+
+
+def downgrade():
+    with op.batch_alter_table('turn', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_turn_round_id_turn_num', type_='unique')
+
+    with op.batch_alter_table('round', schema=None) as batch_op:
+        batch_op.drop_column('turns_used')
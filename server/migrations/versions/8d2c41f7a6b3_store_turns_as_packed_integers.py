@@ -0,0 +1,134 @@
+"""Store turns as packed integers
+
+Revision ID: 8d2c41f7a6b3
+Revises: c09ceaf6beb9
+Create Date: 2026-10-18 09:12:41.205918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2c41f7a6b3'
+down_revision = 'c09ceaf6beb9'
+branch_labels = None
+depends_on = None
+
+# Turns converted per round trip during the backfill
+BATCH_SIZE = 5000
+
+
+def encode_code(code, num_colors):
+    packed = 0
+    for peg in code:
+        packed = packed * num_colors + peg
+    return packed
+
+
+def decode_code(packed, num_holes, num_colors):
+    code = [0] * num_holes
+    for hole in range(num_holes - 1, -1, -1):
+        packed, code[hole] = divmod(packed, num_colors)
+    return code
+
+
+def get_result_message(black_pegs, white_pegs):
+    correct_numbers = white_pegs + black_pegs
+    is_plural = correct_numbers > 1
+    if not white_pegs and not black_pegs:
+        return "All incorrect."
+    return f"{correct_numbers} correct number{'s' if is_plural else ''} and {black_pegs} correct location"
+
+
+# Yields batches of turn rows (ordered by id) joined with their difficulty
+def turn_batches(connection, columns):
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                f"SELECT turn.id, {columns}, difficulty.num_holes, difficulty.num_colors "
+                "FROM turn "
+                "JOIN round ON round.id = turn.round_id "
+                "JOIN game ON game.id = round.game_id "
+                "JOIN difficulty ON difficulty.id = game.difficulty_id "
+                "WHERE turn.id > :last_id ORDER BY turn.id LIMIT :batch_size"
+            ),
+            {"last_id": last_id, "batch_size": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    with op.batch_alter_table('turn', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('guess_code', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('black_pegs', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('white_pegs', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('won_round', sa.Boolean(), nullable=True))
+
+    connection = op.get_bind()
+    for rows in turn_batches(connection, "turn.guess, turn.result"):
+        updates = []
+        for turn_id, guess, result, num_holes, num_colors in rows:
+            result = json.loads(result)
+            updates.append({
+                "turn_id": turn_id,
+                "guess_code": encode_code(json.loads(guess), num_colors),
+                "black_pegs": result["black_pegs"],
+                "white_pegs": result["white_pegs"],
+                "won_round": result["won_round"],
+            })
+        connection.execute(
+            sa.text(
+                "UPDATE turn SET guess_code = :guess_code, black_pegs = :black_pegs, "
+                "white_pegs = :white_pegs, won_round = :won_round WHERE id = :turn_id"
+            ),
+            updates,
+        )
+
+    with op.batch_alter_table('turn', schema=None) as batch_op:
+        batch_op.alter_column('guess_code', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.alter_column('black_pegs', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.alter_column('white_pegs', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.alter_column('won_round', existing_type=sa.Boolean(), nullable=False)
+        batch_op.drop_column('guess')
+        batch_op.drop_column('result')
+
+
+def downgrade():
+    with op.batch_alter_table('turn', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('guess', sa.VARCHAR(length=255), nullable=True))
+        batch_op.add_column(sa.Column('result', sa.VARCHAR(length=255), nullable=True))
+
+    connection = op.get_bind()
+    for rows in turn_batches(
+        connection, "turn.guess_code, turn.black_pegs, turn.white_pegs, turn.won_round"
+    ):
+        updates = []
+        for turn_id, guess_code, black_pegs, white_pegs, won_round, num_holes, num_colors in rows:
+            updates.append({
+                "turn_id": turn_id,
+                "guess": json.dumps(decode_code(guess_code, num_holes, num_colors)),
+                "result": json.dumps({
+                    "won_round": bool(won_round),
+                    "black_pegs": black_pegs,
+                    "white_pegs": white_pegs,
+                    "message": get_result_message(black_pegs, white_pegs),
+                }),
+            })
+        connection.execute(
+            sa.text("UPDATE turn SET guess = :guess, result = :result WHERE id = :turn_id"),
+            updates,
+        )
+
+    with op.batch_alter_table('turn', schema=None) as batch_op:
+        batch_op.alter_column('guess', existing_type=sa.VARCHAR(length=255), nullable=False)
+        batch_op.alter_column('result', existing_type=sa.VARCHAR(length=255), nullable=False)
+        batch_op.drop_column('won_round')
+        batch_op.drop_column('white_pegs')
+        batch_op.drop_column('black_pegs')
+        batch_op.drop_column('guess_code')
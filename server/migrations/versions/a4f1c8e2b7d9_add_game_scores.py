@@ -0,0 +1,46 @@
+"""Add running per-player game scores
+
+Revision ID: a4f1c8e2b7d9
+Revises: 3b7e9d1c5a24
+Create Date: 2026-10-18 15:21:09.734120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f1c8e2b7d9'
+down_revision = '3b7e9d1c5a24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('game_score',
+    sa.Column('game_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('points', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rounds_completed', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], name='fk_game_score_game_id_game'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_game_score_user_id_user'),
+    sa.PrimaryKeyConstraint('game_id', 'user_id')
+    )
+
+    # One row per player of every game with the points of the rounds they
+    # completed as the code breaker
+    op.execute(
+        'INSERT INTO game_score (game_id, user_id, points, rounds_completed) '
+        'SELECT user_games.game_id, user_games.user_id, '
+        'COALESCE(SUM(round.points), 0), COUNT(round.id) '
+        'FROM user_games '
+        'LEFT JOIN round ON round.game_id = user_games.game_id '
+        'AND round.code_breaker_id = user_games.user_id '
+        'AND round.points IS NOT NULL '
+        'WHERE user_games.game_id IS NOT NULL AND user_games.user_id IS NOT NULL '
+        'GROUP BY user_games.game_id, user_games.user_id'
+    )
+
+
+def downgrade():
+    op.drop_table('game_score')
@@ -0,0 +1,38 @@
+"""Page the game history by game id and make game.created_at required
+
+Revision ID: a7c3e9f1b5d2
+Revises: d3a7f5b8e6c1
+Create Date: 2026-10-18 23:12:45.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f1b5d2'
+down_revision = 'd3a7f5b8e6c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pages are scanned from ix_user_games_user_id_game_id instead
+    op.drop_index('ix_game_created_at_id', table_name='game')
+
+    op.execute("UPDATE game SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               server_default=sa.func.now(),
+               nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               server_default=None,
+               nullable=True)
+
+    op.create_index('ix_game_created_at_id', 'game', ['created_at', 'id'], unique=False)
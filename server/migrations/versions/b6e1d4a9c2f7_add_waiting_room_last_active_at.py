@@ -0,0 +1,29 @@
+"""Track waiting room activity so expired room codes can be recycled
+
+Revision ID: b6e1d4a9c2f7
+Revises: f2d8a6c4e1b3
+Create Date: 2026-10-18 21:10:27.846512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1d4a9c2f7'
+down_revision = 'f2d8a6c4e1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('waiting_room', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_active_at', sa.DateTime(), nullable=True))
+
+    # existing rooms expire ROOM_CODE_TTL seconds after the upgrade
+    op.execute('UPDATE waiting_room SET last_active_at = CURRENT_TIMESTAMP')
+
+
+def downgrade():
+    with op.batch_alter_table('waiting_room', schema=None) as batch_op:
+        batch_op.drop_column('last_active_at')
@@ -0,0 +1,43 @@
+"""Move waiting rooms to Redis
+
+Revision ID: d3a7f5b8e6c1
+Revises: b6e1d4a9c2f7
+Create Date: 2026-10-18 21:48:55.301746
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a7f5b8e6c1'
+down_revision = 'b6e1d4a9c2f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rooms (and who hosts or is in them) live in util.room_store now, open
+    # rooms are dropped and their players have to create a new one
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('waiting_room_id')
+        batch_op.drop_column('is_host')
+
+    op.drop_table('waiting_room')
+
+
+def downgrade():
+    op.create_table('waiting_room',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=6), nullable=True),
+    sa.Column('num_rounds', sa.Integer(), nullable=True),
+    sa.Column('difficulty_id', sa.Integer(), nullable=True),
+    sa.Column('last_active_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['difficulty_id'], ['difficulty.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_host', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('waiting_room_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('user_waiting_room_id_fkey', 'waiting_room', ['waiting_room_id'], ['id'])
@@ -0,0 +1,84 @@
+"""Add incrementally maintained player statistics
+
+Revision ID: e5b9c3d7f1a8
+Revises: a4f1c8e2b7d9
+Create Date: 2026-10-18 20:05:41.218904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9c3d7f1a8'
+down_revision = 'a4f1c8e2b7d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('games_played', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('games_won', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rounds_played', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rounds_solved', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('turns_to_solve', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_user_stats_user_id_user'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_user_stats_leaderboard', 'user_stats', [sa.text('games_won DESC'), 'games_played', 'user_id'], unique=False)
+    op.create_table('user_difficulty_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('difficulty_id', sa.Integer(), nullable=False),
+    sa.Column('games_played', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('games_won', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rounds_played', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rounds_solved', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('turns_to_solve', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['difficulty_id'], ['difficulty.id'], name='fk_user_difficulty_stats_difficulty_id_difficulty'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_user_difficulty_stats_user_id_user'),
+    sa.PrimaryKeyConstraint('user_id', 'difficulty_id')
+    )
+    op.create_index('ix_user_difficulty_stats_leaderboard', 'user_difficulty_stats', ['difficulty_id', sa.text('games_won DESC'), 'games_played', 'user_id'], unique=False)
+
+    # used by the rebuild to aggregate the history of a batch of players
+    op.create_index(op.f('ix_round_code_breaker_id'), 'round', ['code_breaker_id'], unique=False)
+    op.create_index(op.f('ix_user_games_user_id'), 'user_games', ['user_id'], unique=False)
+
+    # Statistics of the existing history, the same totals as util.stats.rebuild_stats
+    op.execute(
+        'INSERT INTO user_difficulty_stats (user_id, difficulty_id, games_played, '
+        'games_won, rounds_played, rounds_solved, turns_to_solve) '
+        'SELECT user_id, difficulty_id, SUM(games_played), SUM(games_won), '
+        'SUM(rounds_played), SUM(rounds_solved), SUM(turns_to_solve) FROM ('
+        'SELECT round.code_breaker_id AS user_id, game.difficulty_id AS difficulty_id, '
+        '0 AS games_played, 0 AS games_won, 1 AS rounds_played, '
+        'CASE WHEN round.points = round.turns_used THEN 1 ELSE 0 END AS rounds_solved, '
+        'CASE WHEN round.points = round.turns_used THEN round.turns_used ELSE 0 END '
+        'AS turns_to_solve '
+        'FROM round JOIN game ON game.id = round.game_id '
+        "WHERE round.status = 'COMPLETED' AND round.points IS NOT NULL "
+        'UNION ALL '
+        'SELECT user_games.user_id, game.difficulty_id, 1, '
+        'CASE WHEN game.winner_id = user_games.user_id THEN 1 ELSE 0 END, 0, 0, 0 '
+        'FROM user_games JOIN game ON game.id = user_games.game_id '
+        "WHERE game.status = 'COMPLETED' AND user_games.user_id IS NOT NULL"
+        ') AS history GROUP BY user_id, difficulty_id'
+    )
+    op.execute(
+        'INSERT INTO user_stats (user_id, games_played, games_won, rounds_played, '
+        'rounds_solved, turns_to_solve) '
+        'SELECT user_id, SUM(games_played), SUM(games_won), SUM(rounds_played), '
+        'SUM(rounds_solved), SUM(turns_to_solve) '
+        'FROM user_difficulty_stats GROUP BY user_id'
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_games_user_id'), table_name='user_games')
+    op.drop_index(op.f('ix_round_code_breaker_id'), table_name='round')
+    op.drop_index('ix_user_difficulty_stats_leaderboard', table_name='user_difficulty_stats')
+    op.drop_table('user_difficulty_stats')
+    op.drop_index('ix_user_stats_leaderboard', table_name='user_stats')
+    op.drop_table('user_stats')
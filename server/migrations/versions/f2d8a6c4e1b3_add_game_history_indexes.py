@@ -0,0 +1,29 @@
+"""Add indexes for the keyset-paginated game history
+
+Revision ID: f2d8a6c4e1b3
+Revises: e5b9c3d7f1a8
+Create Date: 2026-10-18 20:41:12.503387
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2d8a6c4e1b3'
+down_revision = 'e5b9c3d7f1a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (user_id, game_id) also serves the lookups by user_id alone
+    op.create_index('ix_user_games_user_id_game_id', 'user_games', ['user_id', 'game_id'], unique=False)
+    op.drop_index('ix_user_games_user_id', table_name='user_games')
+    op.create_index('ix_game_created_at_id', 'game', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_game_created_at_id', table_name='game')
+    op.create_index('ix_user_games_user_id', 'user_games', ['user_id'], unique=False)
+    op.drop_index('ix_user_games_user_id_game_id', table_name='user_games')
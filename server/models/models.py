@@ -1,8 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import validates
 from uuid import uuid4
 from datetime import datetime
 from util.enum import DifficultyEnum, StatusEnum
+from util.code import Code, CodeFormatError, CodeLengthError, CodeRangeError
+from util.game_logic import get_result_message
 import re
 
 import json
@@ -15,6 +20,7 @@ user_games = db.Table(
     "user_games",
     db.Column("user_id", db.String, db.ForeignKey("user.id")),
     db.Column("game_id", db.Integer, db.ForeignKey("game.id")),
+    db.Index("ix_user_games_user_id_game_id", "user_id", "game_id"),
 )
 
 
@@ -25,15 +31,13 @@ class User(db.Model):
     username = db.Column(db.String(20), nullable=True)
     email = db.Column(db.String(255), unique=True, nullable=True)
     password = db.Column(db.String, nullable=True)
-    games = db.relationship("Game", secondary=user_games, backref="players")
+    games = db.relationship(
+        "Game", secondary=user_games, backref="players"
+    )  # loads every game, pages of the history come from GET /users/me/games
     games_won = db.relationship("Game", backref="winner")
     rounds = db.relationship(
         "Round", backref="code_breaker"
     )  # stores rounds that the user is the code-breaker
-    waiting_room_id = db.Column(
-        db.Integer, db.ForeignKey("waiting_room.id")
-    )  # Users can only be in one waiting room at a time
-    is_host = db.Column(db.Boolean, default=False)
 
     @validates("email")
     def validate_email(self, key, value):
@@ -50,7 +54,6 @@ class Difficulty(db.Model):
     num_holes = db.Column(db.Integer, nullable=False)
     num_colors = db.Column(db.Integer, nullable=False)
     games = db.relationship("Game", backref="difficulty")
-    waitingRooms = db.relationship("WaitingRoom", backref="difficulty")
 
     @validates("max_turns", "num_holes", "num_colors")
     def validate_turns(self, key, value):
@@ -62,7 +65,12 @@ class Difficulty(db.Model):
 # Games have round(s), single player mode is one round
 class Game(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now())
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(),
+        server_default=db.func.now(),
+    )
     is_multiplayer = db.Column(db.Boolean, nullable=False)
     difficulty_id = db.Column(
         db.Integer, db.ForeignKey("difficulty.id"), nullable=False
@@ -70,7 +78,8 @@ class Game(db.Model):
     status = db.Column(db.Enum(StatusEnum), nullable=False)
     num_rounds = db.Column(db.Integer, default=1, nullable=False)
     winner_id = db.Column(db.String, db.ForeignKey("user.id"))
-    rounds = db.relationship("Round", backref="game")
+    rounds = db.relationship("Round", backref="game", order_by="Round.id")
+    scores = db.relationship("GameScore", backref="game", order_by="GameScore.points")
 
     @validates("num_rounds")
     def validate_num_rounds(self, key, value):
@@ -79,14 +88,129 @@ class Game(db.Model):
         return value
 
 
+# Running points of each player in a game (the lowest total wins), updated as
+# each round completes so scoreboards and winners do not walk the rounds
+class GameScore(db.Model):
+    game_id = db.Column(db.Integer, db.ForeignKey("game.id"), primary_key=True)
+    user_id = db.Column(db.String, db.ForeignKey("user.id"), primary_key=True)
+    points = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rounds_completed = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+
+    # Adds the points of a completed round to the code breaker's total
+    @classmethod
+    def add_round_points(cls, game_id, user_id, points):
+        num_updated = db.session.execute(
+            update(cls)
+            .where(cls.game_id == game_id, cls.user_id == user_id)
+            .values(
+                points=cls.points + points,
+                rounds_completed=cls.rounds_completed + 1,
+            )
+        ).rowcount
+        if not num_updated:
+            db.session.add(
+                cls(game_id=game_id, user_id=user_id, points=points, rounds_completed=1)
+            )
+
+    # Player with the lowest total, None if the lowest total is tied
+    @classmethod
+    def winner_id(cls, game_id):
+        scores = db.session.execute(
+            select(cls.user_id, cls.points)
+            .where(cls.game_id == game_id)
+            .order_by(cls.points)
+            .limit(2)
+        ).all()
+        if not scores or (len(scores) == 2 and scores[0].points == scores[1].points):
+            return None
+        return scores[0].user_id
+
+
+# Counters shared by the overall and per difficulty player statistics, kept up
+# to date by util.stats as rounds and games complete
+class StatsMixin:
+    games_played = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    games_won = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rounds_played = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )  # rounds completed as the code breaker
+    rounds_solved = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    turns_to_solve = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )  # total turns of the solved rounds
+
+    # Adds amounts to the counters of the row matching keys (its primary key),
+    # the row is created if it does not exist. One INSERT ... ON CONFLICT DO
+    # UPDATE, so concurrent transactions creating the same row do not conflict
+    @classmethod
+    def increment(cls, keys, **amounts):
+        dialect = db.session.get_bind().dialect.name
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        statement = insert(cls).values(**keys, **amounts)
+        db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={
+                    name: getattr(cls, name) + getattr(statement.excluded, name)
+                    for name in amounts
+                },
+            )
+        )
+
+    @property
+    def win_rate(self):
+        return self.games_won / self.games_played if self.games_played else None
+
+    @property
+    def average_turns_to_solve(self):
+        return self.turns_to_solve / self.rounds_solved if self.rounds_solved else None
+
+
+# Statistics of a player over every difficulty, backs the global leaderboard
+class UserStats(StatsMixin, db.Model):
+    __table_args__ = (
+        db.Index(
+            "ix_user_stats_leaderboard",
+            db.text("games_won DESC"),
+            "games_played",
+            "user_id",
+        ),
+    )
+    user_id = db.Column(db.String, db.ForeignKey("user.id"), primary_key=True)
+
+
+class UserDifficultyStats(StatsMixin, db.Model):
+    __table_args__ = (
+        db.Index(
+            "ix_user_difficulty_stats_leaderboard",
+            "difficulty_id",
+            db.text("games_won DESC"),
+            "games_played",
+            "user_id",
+        ),
+    )
+    user_id = db.Column(db.String, db.ForeignKey("user.id"), primary_key=True)
+    difficulty_id = db.Column(
+        db.Integer, db.ForeignKey("difficulty.id"), primary_key=True
+    )
+    difficulty = db.relationship("Difficulty")
+
+
 class Round(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     game_id = db.Column(db.Integer, db.ForeignKey("game.id"), nullable=False)
     status = db.Column(db.Enum(StatusEnum), nullable=False)
-    code_breaker_id = db.Column(db.String, db.ForeignKey("user.id"), nullable=False)
+    code_breaker_id = db.Column(
+        db.String, db.ForeignKey("user.id"), nullable=False, index=True
+    )
     round_num = db.Column(db.Integer, nullable=False)
     secret_code = db.Column(db.String(255))  # Stored as a json.dumps array of integers
     points = db.Column(db.Integer, default=None)
+    # Number of turns made, incremented with every inserted turn so moves do
+    # not have to count the turns
+    turns_used = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     turns = db.relationship("Turn", backref="round")
 
     @validates("game", "secret_code")
@@ -95,22 +219,16 @@ class Round(db.Model):
             num_holes = self.game.difficulty.num_holes
             num_colors = self.game.difficulty.num_colors
             try:
-                secret_code = json.loads(value)
-            except:
+                Code.from_json(value, num_holes, num_colors)
+            except CodeFormatError:
                 raise ValueError(
                     "Secret code is in incorrect format (should be json encoded list of integers)."
                 )
-            if not isinstance(secret_code, list) or not all(
-                isinstance(k, int) for k in secret_code
-            ):
-                raise ValueError(
-                    "Secret code is in incorrect format (should be json encoded list of integers)."
-                )
-            elif len(secret_code) != num_holes:
+            except CodeLengthError:
                 raise ValueError(
                     "Secret code is invalid (does not match the number of holes)."
                 )
-            elif max(secret_code) >= num_colors or min(secret_code) < 0:
+            except CodeRangeError:
                 raise ValueError(
                     "Secret code is invalid (one or more numbers is not possible)."
                 )
@@ -119,35 +237,79 @@ class Round(db.Model):
 
 # Rounds have multiple turns
 class Turn(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("round_id", "turn_num", name="uq_turn_round_id_turn_num"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     round_id = db.Column(db.Integer, db.ForeignKey("round.id"), nullable=False)
     turn_num = db.Column(db.Integer, nullable=False)  # Starts from 1 index
-    guess = db.Column(db.String(255), nullable=False)
-    result = db.Column(
-        db.String(255), nullable=False
-    )  # Stored as a encoded json (typically in format {won_round, black_pegs: Int, white_pegs: Int, message: Str})
+    guess_code = db.Column(
+        db.BigInteger, nullable=False
+    )  # Guess packed into one integer in base num_colors (see util.code.Code)
+    black_pegs = db.Column(db.SmallInteger, nullable=False)
+    white_pegs = db.Column(db.SmallInteger, nullable=False)
+    won_round = db.Column(db.Boolean, nullable=False)
+
+    # Guess as a list of integers, can be set from a json encoded list of integers
+    @property
+    def guess(self):
+        return self.guess_as_code().to_list()
+
+    @guess.setter
+    def guess(self, value):
+        self.guess_code = self.validate_guess("guess", value).packed
+
+    # Builds a turn from values the server produced itself (a Code that was
+    # already validated against the difficulty and the result of
+    # calculate_result) without re-parsing them or loading the round's
+    # difficulty, guesses from clients must go through the guess setter
+    @classmethod
+    def from_trusted(cls, round_id, turn_num, guess, result):
+        return cls(
+            round_id=round_id,
+            turn_num=turn_num,
+            guess_code=guess.packed,
+            black_pegs=result["black_pegs"],
+            white_pegs=result["white_pegs"],
+            won_round=result["won_round"],
+        )
+
+    def guess_as_code(self):
+        difficulty = self.round.game.difficulty
+        return Code(self.guess_code, difficulty.num_holes, difficulty.num_colors)
+
+    # Result in the API format {won_round, black_pegs, white_pegs, message}
+    # can be set from the json encoded result of calculate_result
+    @property
+    def result(self):
+        return {
+            "won_round": self.won_round,
+            "black_pegs": self.black_pegs,
+            "white_pegs": self.white_pegs,
+            "message": get_result_message(self.black_pegs, self.white_pegs),
+        }
+
+    @result.setter
+    def result(self, value):
+        res_map = self.validate_result("result", value)
+        self.won_round = res_map["won_round"]
+        self.black_pegs = res_map["black_pegs"]
+        self.white_pegs = res_map["white_pegs"]
 
-    @validates("guess")
     def validate_guess(self, key, value):
+        num_holes = self.round.game.difficulty.num_holes
+        num_colors = self.round.game.difficulty.num_colors
         try:
-            guess = json.loads(value)
-        except:
-            raise ValueError(
-                "Guess is in invalid format (should be json encoded list of integers)"
-            )
-        if not isinstance(guess, list) or not all(isinstance(k, int) for k in guess):
+            return Code.from_json(value, num_holes, num_colors)
+        except CodeFormatError:
             raise ValueError(
                 "Guess is in invalid format (should be json encoded list of integers)"
             )
-        num_holes = self.round.game.difficulty.num_holes
-        num_colors = self.round.game.difficulty.num_colors
-        if not len(guess) == num_holes:
+        except CodeLengthError:
             raise ValueError("Guess is invalid (does not match number of holes).")
-        elif max(guess) >= num_colors or min(guess) < 0:
+        except CodeRangeError:
             raise ValueError("Guess is invalid (one or more numbers is not possible).")
-        return value
 
-    @validates("result")
     def validate_result(self, key, value):
         try:
             res_map = json.loads(value)
@@ -155,7 +317,9 @@ class Turn(db.Model):
             raise ValueError("Turn's result is not in the proper format.")
 
         if not (
-            set(res_map.keys()) == {"won_round", "black_pegs", "white_pegs", "message"}
+            isinstance(res_map, dict)
+            and set(res_map.keys())
+            == {"won_round", "black_pegs", "white_pegs", "message"}
             and all(
                 [
                     isinstance(res_map["won_round"], bool),
@@ -175,18 +339,4 @@ class Turn(db.Model):
         num_holes = self.round.game.difficulty.num_holes
         if num_pegs > num_holes:
             raise ValueError("White and black pegs exceed number of holes.")
-        return value
-
-
-# Waiting room for players
-class WaitingRoom(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    code = db.Column(db.String(6), unique=True)
-    num_rounds = db.Column(db.Integer)
-    difficulty_id = db.Column(db.Integer, db.ForeignKey("difficulty.id"))
-    players = db.relationship("User", backref="waiting_room")
-
-    @validates("rounds")
-    def validate_rounds(self, key, value):
-        if value not in [2, 4, 6, 8]:
-            return ValueError("Number of rounds is not valid.")
+        return res_map
@@ -0,0 +1,38 @@
+# Script to recompute the player statistics and leaderboard from game history
+# Run with "python -m rebuild_stats" after a backfill, a bug fix in the stats
+# or a restore. Moves that complete while it runs can be lost, so run it
+# while the servers are stopped
+from init_db import create_seed_app
+from models.models import db
+from util.stats import REBUILD_BATCH_SIZE, rebuild_stats
+import argparse
+import time
+
+
+def rebuild(batch_size=REBUILD_BATCH_SIZE):
+    app = create_seed_app()
+    with app.app_context():
+        try:
+            start = time.perf_counter()
+            num_users = rebuild_stats(batch_size)
+            print(
+                f"Statistics rebuilt successfully ({num_users} players) "
+                f"in {time.perf_counter() - start:.2f}s."
+            )
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding statistics: {str(e)}")
+        finally:
+            db.session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the player statistics")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=REBUILD_BATCH_SIZE,
+        help="players aggregated per query",
+    )
+    args = parser.parse_args()
+    rebuild(args.batch_size)
@@ -5,6 +5,8 @@ from util.json_errors import ErrorResponse
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from util.decorators import session_required
+from util.identity_cache import identity_cache
+from util.serving import run_blocking
 import re
 
 auth_bp = Blueprint("auth_bp", __name__)
@@ -76,11 +78,12 @@ def create_persistent_login():
         return ErrorResponse.handle_error("Account already exists.", 400)
 
     try:
-        hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
+        hashed_password = run_blocking(bcrypt.generate_password_hash, password)
         user.username = username
         user.email = email
-        user.password = hashed_password
+        user.password = hashed_password.decode("utf-8")
         db.session.commit()
+        identity_cache.invalidate(user.id)
         return (
             jsonify({"id": user.id, "username": user.username, "email": user.email}),
             204,
@@ -110,15 +113,17 @@ def login_user():
     if not user or (user and not user.password):
         return ErrorResponse.handle_error("Invalid Credentials.", 401)
 
-    password_matches = bcrypt.check_password_hash(user.password, password)
+    password_matches = run_blocking(bcrypt.check_password_hash, user.password, password)
     if not password_matches:
         return ErrorResponse.handle_error("Invalid Credentials.", 401)
 
     session["user_id"] = user.id
+    identity_cache.invalidate(user.id)
     return jsonify({"id": user.id, "email": user.email, "username": user.username}), 200
 
 
 @auth_bp.route("/logout", methods=["POST"])
 def logout_user():
-    session.pop("user_id")
+    user_id = session.pop("user_id")
+    identity_cache.invalidate(user_id)
     return jsonify({"message": "Successfully logged out user"}), 200
@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
-from models.models import Game, Difficulty, Round, db, WaitingRoom
-from util.decorators import session_required, check_user_in_game
+from models.models import Game, GameScore, Round, User, db
+from util.decorators import session_required, check_user_in_game, load_request_user
+from util.difficulty_registry import difficulty_registry
 from util.enum import DifficultyEnum, StatusEnum
 from util.game_logic import get_random_secret_code
 from util.json_errors import ErrorResponse
+from util.room_store import room_store
 import json
+from redis.exceptions import RedisError
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 import requests
@@ -46,12 +50,9 @@ def create_new_game():
         )
 
     try:
-        curr_difficulty = Difficulty.query.filter(
-            Difficulty.max_turns == max_turns,
-            Difficulty.mode == difficulty,
-            Difficulty.num_holes == num_holes,
-            Difficulty.num_colors == num_colors,
-        ).first()
+        curr_difficulty = difficulty_registry.get(
+            difficulty, max_turns, num_holes, num_colors
+        )
     except SQLAlchemyError as e:
         logging.error(f"Error fetching current difficulty: {str(e)}")
         return ErrorResponse.handle_error("Difficulty was not able to be fetched.", 503)
@@ -63,11 +64,12 @@ def create_new_game():
         try:
             new_game = Game(
                 is_multiplayer=is_multiplayer,
-                difficulty=curr_difficulty,
+                difficulty_id=curr_difficulty.id,
                 status=StatusEnum.NOT_STARTED.name,
                 num_rounds=1,
             )
-            new_game.players.append(user)
+            new_game.players.append(load_request_user())
+            new_game.scores.append(GameScore(user_id=user.id))
             db.session.add(new_game)
             db.session.commit()
             game_data = {
@@ -88,22 +90,22 @@ def create_new_game():
             )
     else:
         try:
-            waiting_room = WaitingRoom.query.get(room_id)
-        except:
+            waiting_room = room_store.get(room_id)
+        except RedisError:
             return ErrorResponse.handle_error("Error fetching waiting room", 503)
 
         if not waiting_room:
             return ErrorResponse.handle_error("Waiting room not found", 404)
 
-        if user.waiting_room_id != room_id:
+        if user.id not in waiting_room.player_ids:
             return ErrorResponse.handle_error("User is not inside waiting room", 400)
 
-        if not user.is_host:
+        if waiting_room.host_id != user.id:
             return ErrorResponse.handle_error(
                 "User is unauthorized to start the game", 401
             )
 
-        if len(waiting_room.players) < 2:
+        if len(waiting_room.player_ids) < 2:
             return ErrorResponse.handle_error(
                 "Not enough players to start the game", 400
             )
@@ -111,12 +113,17 @@ def create_new_game():
         try:
             new_game = Game(
                 is_multiplayer=True,
-                difficulty=curr_difficulty,
+                difficulty_id=curr_difficulty.id,
                 status=StatusEnum.NOT_STARTED.name,
                 num_rounds=num_rounds,
             )
-            for player in waiting_room.players:
+            # the room only reaches Postgres as the players of its game
+            players = db.session.scalars(
+                select(User).where(User.id.in_(waiting_room.player_ids))
+            ).all()
+            for player in players:
                 new_game.players.append(player)
+                new_game.scores.append(GameScore(user_id=player.id))
             db.session.add(new_game)
             db.session.commit()
             game_data = {
@@ -127,7 +134,6 @@ def create_new_game():
                 "created_at": new_game.created_at,
                 "num_rounds": new_game.num_rounds,
             }
-            return jsonify(game_data), 201
         except (ValueError, SQLAlchemyError) as e:
             db.session.rollback()
             logging.error(f"Error creating game: {str(e)}")
@@ -136,6 +142,13 @@ def create_new_game():
                 500,
             )
 
+        # the room is closed once its game starts, which frees its code
+        try:
+            room_store.close(waiting_room)
+        except RedisError as e:
+            logging.warning(f"Error closing waiting room {waiting_room.id}: {str(e)}")
+        return jsonify(game_data), 201
+
 
 @game_bp.route("/<game_id>", methods=["GET"])
 @session_required
@@ -181,6 +194,44 @@ def get_game_details(game_id):
     )
 
 
+# Running points of every player, lowest total first
+@game_bp.route("/<game_id>/scores", methods=["GET"])
+@session_required
+@check_user_in_game
+def get_game_scores(game_id):
+    game = request.game
+    try:
+        scores = db.session.execute(
+            select(GameScore, User.username)
+            .join(User, User.id == GameScore.user_id)
+            .where(GameScore.game_id == game.id)
+            .order_by(GameScore.points, GameScore.user_id)
+        ).all()
+    except SQLAlchemyError as e:
+        logging.error(f"Error fetching game scores: {str(e)}")
+        return ErrorResponse.handle_error("Scores were not able to be fetched.", 503)
+
+    return (
+        jsonify(
+            {
+                "id": game.id,
+                "status": game.status.name,
+                "winner_id": game.winner_id,
+                "scores": [
+                    {
+                        "player_id": score.user_id,
+                        "username": username,
+                        "points": score.points,
+                        "rounds_completed": score.rounds_completed,
+                    }
+                    for score, username in scores
+                ],
+            }
+        ),
+        200,
+    )
+
+
 @game_bp.route("/<game_id>/rounds", methods=["POST"])
 @session_required
 @check_user_in_game
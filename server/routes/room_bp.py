@@ -1,29 +1,33 @@
 from flask import Blueprint, request, jsonify
-from string import ascii_uppercase
-import random
-from models.models import WaitingRoom, Difficulty, db
+from redis.exceptions import RedisError
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from util.json_errors import ErrorResponse
-from util.decorators import session_required, check_user_in_waiting_room
+from util.decorators import (
+    session_required,
+    check_user_in_waiting_room,
+)
 from util.enum import DifficultyEnum
+from util.difficulty_registry import difficulty_registry
+from util.identity_cache import identity_cache
+from util.room_store import RoomCodeError, RoomFullError, room_store
 
 room_bp = Blueprint("room_bp", __name__)
 
 
-# Checks waiting room and generates unique code
-def generate_unique_code(length):
-    while True:
-        code = ""
-        for _ in range(length):
-            code += random.choice(ascii_uppercase)
-        try:
-            waiting_room = WaitingRoom.query.filter_by(code=code).first()
-            if not waiting_room:
-                break
-        except SQLAlchemyError as e:
-            raise SQLAlchemyError("Rooms were not able to be fetched.")
-    return code
+# Players of the room with their usernames, which come from the identity cache
+def players_to_json(room):
+    players = []
+    for player_id in room.player_ids:
+        identity = identity_cache.get(player_id)
+        players.append(
+            {
+                "id": player_id,
+                "username": identity.username if identity else None,
+                "is_host": player_id == room.host_id,
+            }
+        )
+    return players
 
 
 @room_bp.route("/", methods=["POST"])
@@ -31,55 +35,34 @@ def generate_unique_code(length):
 def create_room():
     user = request.user
     try:
-        code = generate_unique_code(6)
-    except SQLAlchemyError as e:
-        logging.error(f"Error fetching all waiting rooms: {str(e)}")
-        return ErrorResponse.handle_error("Waiting rooms not able to be fetched.", 503)
-
-    try:
-        normal_difficulty = Difficulty.query.filter_by(
-            mode=DifficultyEnum.NORMAL
-        ).first()
+        normal_difficulty = difficulty_registry.get_default(DifficultyEnum.NORMAL)
     except SQLAlchemyError as e:
         logging.error(f"Error fetching normal difficulty {str(e)}")
         return ErrorResponse.handle_error(
             "Normal difficulty not able to be fetched.", 503
         )
-
-    try:
-        waiting_room = WaitingRoom(
-            code=code, difficulty=normal_difficulty, num_rounds=2
-        )
-        waiting_room.players.append(user)
-        user.is_host = True
-    except (TypeError, ValueError):
+    if not normal_difficulty:
+        logging.error("Normal difficulty has not been seeded")
         return ErrorResponse.handle_error(
-            "Error creating new waiting room. Does not match format.", 400
+            "Normal difficulty not able to be fetched.", 503
         )
+
     try:
-        db.session.add(waiting_room)
-        db.session.commit()
-        return jsonify(
-            {
-                "id": waiting_room.id,
-                "code": waiting_room.code,
-                "players": [
-                    {
-                        "id": player.id,
-                        "username": player.username,
-                        "is_host": player.is_host,
-                    }
-                    for player in waiting_room.players
-                ],
-            }
-        )
-    except (SQLAlchemyError, ValueError) as e:
-        db.session.rollback()
+        waiting_room = room_store.create(user.id, normal_difficulty.id, 2)
+        players = players_to_json(waiting_room)
+    except (RedisError, SQLAlchemyError, RoomCodeError) as e:
         logging.error(f"Error creating new waiting room: {str(e)}")
         return ErrorResponse.handle_error(
             "Error creating new waiting room.",
             500,
         )
+    return jsonify(
+        {
+            "id": waiting_room.id,
+            "code": waiting_room.code,
+            "players": players,
+        }
+    )
 
 
 @room_bp.route("/join", methods=["POST"])
@@ -91,57 +74,30 @@ def join_room():
     code = request.get_json().get("code")
     if not code:
         return ErrorResponse.handle_error("Code not provided.", 400)
-    waiting_room = WaitingRoom.query.filter_by(code=code).first()
-    if not waiting_room:
-        return ErrorResponse.handle_error("Code is invalid.", 400)
-    if len(waiting_room.players) >= 2:
-        return ErrorResponse.handle_error("Room is full.", 403)
-
-    # User joins a waiting room that they already are in
-    player_ids_in_room = [player.id for player in waiting_room.players]
-    if user.id in player_ids_in_room:
-        return jsonify(
-            {
-                "id": waiting_room.id,
-                "code": waiting_room.code,
-                "players": [
-                    {
-                        "id": player.id,
-                        "username": player.username,
-                        "is_host": player.is_host,
-                    }
-                    for player in waiting_room.players
-                ],
-            }
-        )
 
     try:
-        user.is_host = (
-            False  # the person joining a pre-existing waiting room cannot be a host
-        )
-        waiting_room.players.append(user)
-        db.session.commit()
-        return jsonify(
-            {
-                "id": waiting_room.id,
-                "code": waiting_room.code,
-                "players": [
-                    {
-                        "id": player.id,
-                        "username": player.username,
-                        "is_host": player.is_host,
-                    }
-                    for player in waiting_room.players
-                ],
-            }
-        )
-    except SQLAlchemyError as e:
-        db.session.rollback()
-        logging.error(f"Error creating new waiting room: {str(e)}")
+        waiting_room = room_store.get_by_code(code)
+        if waiting_room:
+            # joining a room the user is already in returns the room
+            waiting_room = room_store.join(waiting_room.id, user.id)
+        if not waiting_room:
+            return ErrorResponse.handle_error("Code is invalid.", 400)
+        players = players_to_json(waiting_room)
+    except RoomFullError:
+        return ErrorResponse.handle_error("Room is full.", 403)
+    except (RedisError, SQLAlchemyError) as e:
+        logging.error(f"Error joining waiting room: {str(e)}")
         return ErrorResponse.handle_error(
-            "Error creating new waiting room.",
+            "Error joining waiting room.",
             500,
         )
+    return jsonify(
+        {
+            "id": waiting_room.id,
+            "code": waiting_room.code,
+            "players": players,
+        }
+    )
 
 
 @room_bp.route("/<room_id>", methods=["GET"])
@@ -149,20 +105,22 @@ def join_room():
 @check_user_in_waiting_room
 def get_room_info(room_id):
     waiting_room = request.waiting_room
-    difficulty = waiting_room.difficulty
+    difficulty = difficulty_registry.get_by_id(waiting_room.difficulty_id)
+    try:
+        # polling the room keeps it alive
+        room_store.refresh(waiting_room.id, waiting_room.code, waiting_room.player_ids)
+        players = players_to_json(waiting_room)
+    except (RedisError, SQLAlchemyError) as e:
+        logging.error(f"Error fetching waiting room: {str(e)}")
+        return ErrorResponse.handle_error(
+            "Waiting room was not able to be fetched.", 503
+        )
     return (
         jsonify(
             {
                 "id": waiting_room.id,
                 "code": waiting_room.code,
-                "players": [
-                    {
-                        "id": player.id,
-                        "username": player.username,
-                        "is_host": player.is_host,
-                    }
-                    for player in waiting_room.players
-                ],
+                "players": players,
                 "difficulty": {
                     "id": difficulty.id,
                     "mode": difficulty.mode.name,
@@ -183,7 +141,7 @@ def get_room_info(room_id):
 def update_game_settings(room_id):
     user = request.user
     waiting_room = request.waiting_room
-    is_host = user.is_host
+    is_host = waiting_room.host_id == user.id
     if request.content_type != "application/json":
         return ErrorResponse.handle_error("Game settings were not provided.", 415)
     if not is_host:
@@ -210,23 +168,19 @@ def update_game_settings(room_id):
 
     # Check if difficulty exists
     try:
-        curr_difficulty = Difficulty.query.filter(
-            Difficulty.max_turns == max_turns,
-            Difficulty.mode == difficulty,
-            Difficulty.num_holes == num_holes,
-            Difficulty.num_colors == num_colors,
-        ).first()
+        curr_difficulty = difficulty_registry.get(
+            difficulty, max_turns, num_holes, num_colors
+        )
         if not curr_difficulty:
             return ErrorResponse.handle_error("Difficulty is not valid.", 400)
     except SQLAlchemyError as e:
         return ErrorResponse.handle_error("Error fetching difficulty", 503)
 
     try:
-        waiting_room.difficulty = curr_difficulty
-        waiting_room.num_rounds = rounds
-        db.session.commit()
-    except SQLAlchemyError as e:
-        db.session.rollback()
+        waiting_room = room_store.update_settings(
+            waiting_room, curr_difficulty.id, rounds
+        )
+    except RedisError as e:
         logging.error(f"Error updating the waiting room settings: {str(e)}")
         return ErrorResponse.handle_error(
             "Error updating the waiting room settings", 503
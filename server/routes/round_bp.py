@@ -7,11 +7,11 @@ from util.decorators import (
     check_user_in_round,
 )
 from util.enum import StatusEnum
-from util.game_logic import (
-    is_code_valid,
-    calculate_result,
-)
+from util.game_logic import is_code_valid
+from util.code import Code
 from util.json_errors import ErrorResponse
+from util.candidate_index import candidate_index
+from util.moves import MoveError, save_move
 import json
 from sqlalchemy.exc import SQLAlchemyError
 import logging
@@ -40,17 +40,30 @@ def get_round_details(round_id):
     except SQLAlchemyError as e:
         logging.error(f"Error fetching all turns in round: {str(e)}")
         return ErrorResponse.handle_error("Turns were not able to be fetched", 503)
-    max_turns = game.difficulty.max_turns
-    num_turns_used = len(all_turns) if all_turns else 0
+    max_turns, num_holes, num_colors = (
+        game.difficulty.max_turns,
+        game.difficulty.num_holes,
+        game.difficulty.num_colors,
+    )
+    num_turns_used = round.turns_used
     turn_history = [
         {
             "id": turn.id,
             "turn_num": turn.turn_num,
-            "guess": json.loads(turn.guess),
-            "result": json.loads(turn.result),
+            "guess": Code(turn.guess_code, num_holes, num_colors).to_list(),
+            "result": turn.result,
         }
         for turn in all_turns
     ]
+    candidate_set = candidate_index.lookup(
+        round.id,
+        num_holes,
+        num_colors,
+        [
+            (turn["guess"], turn["result"]["black_pegs"], turn["result"]["white_pegs"])
+            for turn in turn_history
+        ],
+    )
 
     # Hide the secret code if user is not the code breaker and
     # Round is still in progress
@@ -70,6 +83,8 @@ def get_round_details(round_id):
                 "turns_used": num_turns_used,
                 "turns_remaining": max_turns - num_turns_used,
                 "turns": turn_history,
+                "remaining_possibilities": candidate_set.count,
+                "remaining_possibilities_estimated": candidate_set.estimated,
                 "secret_code": secret_code,
                 "code_breaker_id": round.code_breaker_id,
             }
@@ -85,93 +100,17 @@ def make_move(round_id):
     if request.content_type != "application/json":
         return ErrorResponse.handle_error("Guess was not provided.", 415)
 
-    round, user = request.round, request.user
-    secret_code = json.loads(round.secret_code)
-    game = round.game
     data = request.get_json()
-    guess = data.get("guess")
-    curr_turn_num = len(round.turns) + 1
-    max_turns, num_colors, num_holes = (
-        game.difficulty.max_turns,
-        game.difficulty.num_colors,
-        game.difficulty.num_holes,
-    )
-
-    if not guess:
-        return ErrorResponse.handle_error("Guess was not provided in payload.", 400)
-    elif not is_code_valid(guess, num_holes, num_colors):
-        return ErrorResponse.handle_error(
-            "Guess was not provided in correct format.", 400
-        )
-    elif round.status == StatusEnum.COMPLETED or round.status == StatusEnum.TERMINATED:
-        return ErrorResponse.handle_error(
-            "Move cannot be made in completed/terminated round.", 400
-        )
-    elif curr_turn_num > max_turns:
-        return ErrorResponse.handle_error(
-            "Cannot make move (exceeds number of turns possible).", 400
-        )
-
-    result = calculate_result(guess, secret_code)
-    won_round = result.get("won_round", False)
-
-    try:
-        new_turn = Turn(
-            round=round,
-            turn_num=curr_turn_num,
-            guess=json.dumps(guess),
-            result=json.dumps(result),
-        )
-    except (TypeError, ValueError):
-        return ErrorResponse.handle_error("Error creating new turn", 400)
-
     try:
-        if won_round or curr_turn_num == max_turns:
-            is_last_round = len(game.rounds) == game.num_rounds
-            round.status = StatusEnum.COMPLETED
-            if is_last_round:
-                game.status = StatusEnum.COMPLETED
-            # Point calculation is based on amt of turns taken, and the winner of the game has the LEAST amt of points
-            # If the winner could not guess the code in turns allocated, they get a penalty of 5 points added
-            if won_round:
-                round.points = curr_turn_num
-            else:
-                round.points = curr_turn_num + 5
-            if game.is_multiplayer == False and won_round:
-                game.winner = user
-            elif game.is_multiplayer and is_last_round:
-                player_to_points = {player.id: 0 for player in game.players}
-                player_ids = list(player_to_points.keys())
-                if len(player_ids) != 2:
-                    raise ValueError("Multiplayer was not configured properly.")
-                for round in game.rounds:
-                    player_to_points[round.code_breaker_id] += round.points
-                if player_to_points[player_ids[0]] < player_to_points[player_ids[1]]:
-                    game.winner_id = player_ids[0]
-                elif player_to_points[player_ids[1]] < player_to_points[player_ids[0]]:
-                    game.winner_id = player_ids[1]
-
-        db.session.add(new_turn)
-        db.session.commit()
-    except (SQLAlchemyError, ValueError) as e:
-        db.session.rollback()
-        logging.error(f"Error creating new turn: {str(e)}")
-        return ErrorResponse.handle_error(
-            "Creating new turn failed. Please check the provided data.",
-            500,
+        move = save_move(
+            request.round,
+            request.user,
+            request.round_context.player_ids,
+            data.get("guess"),
         )
-
-    return (
-        jsonify(
-            {
-                "id": new_turn.id,
-                "turn_num": curr_turn_num,
-                "guess": guess,
-                "result": result,
-            }
-        ),
-        201,
-    )
+    except MoveError as e:
+        return ErrorResponse.handle_error(e.message, e.status_code)
+    return jsonify(move.turn), 201
 
 
 # Allows code maker to add secret code and change game status to in progress
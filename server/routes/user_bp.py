@@ -1,22 +1,50 @@
 from flask import Blueprint, request, session, jsonify
-from models.models import User, db
-from util.decorators import session_required
+from models.models import (
+    Difficulty,
+    Game,
+    GameScore,
+    User,
+    UserDifficultyStats,
+    UserStats,
+    db,
+    user_games,
+)
+from util.cursor import CursorError, decode_cursor, encode_cursor
+from util.decorators import session_required, load_request_user
+from util.enum import DifficultyEnum, StatusEnum
+from util.identity_cache import identity_cache
 from util.json_errors import ErrorResponse
+from util.room_store import room_store
+from util.stats import COUNTERS, stats_to_json
+from redis.exceptions import RedisError
+from sqlalchemy import and_, select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
 user_bp = Blueprint("user_bp", __name__)
 
+LEADERBOARD_DEFAULT_PAGE_SIZE = 20
+LEADERBOARD_MAX_PAGE_SIZE = 100
+GAME_HISTORY_DEFAULT_PAGE_SIZE = 20
+GAME_HISTORY_MAX_PAGE_SIZE = 100
+
 
 @user_bp.route("/me", methods=["GET"])
 @session_required
 def get_user_details():
     user = request.user
+    try:
+        room_id = room_store.get_user_room_id(user.id)
+        room = room_store.get(room_id) if room_id is not None else None
+    except RedisError as e:
+        logging.error(f"Error fetching waiting room of user {user.id}: {str(e)}")
+        return ErrorResponse.handle_error("User was not able to be fetched.", 503)
     res_data = {
         "id": user.id,
         "username": user.username if user.username else "",
         "email": user.email if user.email else "",
-        "is_host": user.is_host,
+        "is_host": room is not None and room.host_id == user.id,
     }
     return jsonify(res_data), 200
 
@@ -28,19 +56,20 @@ def change_username():
         return ErrorResponse.handle_error("Username was not provided.", 415)
 
     data = request.get_json()
-    user = request.user
     new_username = data.get("username")
     if not new_username:
         return ErrorResponse.handle_error("Username was not provided.", 400)
     if len(new_username) > 20:
         return ErrorResponse.handle_error("Username cannot exceed 20 characters.", 400)
     try:
+        user = load_request_user()
         user.username = new_username
         db.session.commit()
     except SQLAlchemyError as e:
         db.session.rollback()
-        logging.error(f"Error updating username for user {user.id}: {str(e)}")
+        logging.error(f"Error updating username for user {request.user.id}: {str(e)}")
         return ErrorResponse.handle_error("Could not update username.", 503)
+    identity_cache.invalidate(user.id)
 
     return (
         jsonify(
@@ -52,3 +81,192 @@ def change_username():
         ),
         200,
     )
+
+
+# Games of the user, newest first, filtered with ?status= and ?difficulty=
+# (mode names). Pages hold ?limit= games and the next page is requested with
+# ?cursor=<next_cursor>. Game ids follow creation order, so a page is a
+# backward range scan of the user's (user_id, game_id) index from the cursor
+@user_bp.route("/me/games", methods=["GET"])
+@session_required
+def get_game_history():
+    user = request.user
+    limit = request.args.get("limit", GAME_HISTORY_DEFAULT_PAGE_SIZE, type=int)
+    status = request.args.get("status")
+    difficulty = request.args.get("difficulty")
+    cursor = request.args.get("cursor")
+    if not 1 <= limit <= GAME_HISTORY_MAX_PAGE_SIZE:
+        return ErrorResponse.handle_error(
+            f"limit must be between 1 and {GAME_HISTORY_MAX_PAGE_SIZE}.", 400
+        )
+    if status and status not in StatusEnum.__members__:
+        return ErrorResponse.handle_error("Status is invalid.", 400)
+    if difficulty and difficulty not in DifficultyEnum.__members__:
+        return ErrorResponse.handle_error("Difficulty is invalid.", 400)
+
+    query = (
+        select(
+            Game.id,
+            Game.created_at,
+            Game.status,
+            Game.is_multiplayer,
+            Game.num_rounds,
+            Game.winner_id,
+            Difficulty.mode,
+            GameScore.points,
+            GameScore.rounds_completed,
+        )
+        .join(user_games, user_games.c.game_id == Game.id)
+        .join(Difficulty, Difficulty.id == Game.difficulty_id)
+        .outerjoin(
+            GameScore, and_(GameScore.game_id == Game.id, GameScore.user_id == user.id)
+        )
+        .where(user_games.c.user_id == user.id)
+        .order_by(user_games.c.game_id.desc())
+        .limit(limit + 1)  # the extra row tells if there is a next page
+    )
+    if status:
+        query = query.where(Game.status == StatusEnum[status])
+    if difficulty:
+        query = query.where(Difficulty.mode == DifficultyEnum[difficulty])
+    if cursor:
+        try:
+            game_id = decode_cursor(cursor)
+        except CursorError as e:
+            return ErrorResponse.handle_error(str(e), 400)
+        query = query.where(user_games.c.game_id < game_id)
+
+    try:
+        games = db.session.execute(query).all()
+    except SQLAlchemyError as e:
+        logging.error(f"Error fetching games of user {user.id}: {str(e)}")
+        return ErrorResponse.handle_error("Games were not able to be fetched.", 503)
+
+    next_cursor = None
+    if len(games) > limit:
+        games = games[:limit]
+        next_cursor = encode_cursor(games[-1].id)
+    return (
+        jsonify(
+            {
+                "games": [
+                    {
+                        "id": game.id,
+                        "created_at": game.created_at,
+                        "status": game.status.name,
+                        "difficulty": game.mode.name,
+                        "is_multiplayer": game.is_multiplayer,
+                        "num_rounds": game.num_rounds,
+                        "winner_id": game.winner_id,
+                        "points": game.points,
+                        "rounds_completed": game.rounds_completed,
+                    }
+                    for game in games
+                ],
+                "next_cursor": next_cursor,
+            }
+        ),
+        200,
+    )
+
+
+# Overall and per difficulty statistics of the user, read from the aggregates
+# maintained by util.stats
+@user_bp.route("/me/stats", methods=["GET"])
+@session_required
+def get_user_stats():
+    user = request.user
+    try:
+        overall = db.session.get(UserStats, user.id) or UserStats(
+            user_id=user.id, **dict.fromkeys(COUNTERS, 0)
+        )
+        difficulty_stats = db.session.scalars(
+            select(UserDifficultyStats)
+            .options(joinedload(UserDifficultyStats.difficulty))
+            .where(UserDifficultyStats.user_id == user.id)
+            .order_by(UserDifficultyStats.difficulty_id)
+        ).all()
+    except SQLAlchemyError as e:
+        logging.error(f"Error fetching statistics of user {user.id}: {str(e)}")
+        return ErrorResponse.handle_error(
+            "Statistics were not able to be fetched.", 503
+        )
+    return (
+        jsonify(
+            {
+                "id": user.id,
+                "overall": stats_to_json(overall),
+                "difficulties": [
+                    {
+                        "difficulty_id": stats.difficulty_id,
+                        "mode": stats.difficulty.mode.name,
+                        "max_turns": stats.difficulty.max_turns,
+                        "num_holes": stats.difficulty.num_holes,
+                        "num_colors": stats.difficulty.num_colors,
+                        **stats_to_json(stats),
+                    }
+                    for stats in difficulty_stats
+                ],
+            }
+        ),
+        200,
+    )
+
+
+# Players ranked by games won (fewer games played breaks ties), overall or for
+# one difficulty with ?difficulty_id=, paginated with ?page= and ?per_page=
+@user_bp.route("/leaderboard", methods=["GET"])
+@session_required
+def get_leaderboard():
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", LEADERBOARD_DEFAULT_PAGE_SIZE, type=int)
+    difficulty_id = request.args.get("difficulty_id", type=int)
+    if page < 1 or not 1 <= per_page <= LEADERBOARD_MAX_PAGE_SIZE:
+        return ErrorResponse.handle_error(
+            f"page must be at least 1 and per_page between 1 and {LEADERBOARD_MAX_PAGE_SIZE}.",
+            400,
+        )
+
+    stats_model = UserDifficultyStats if difficulty_id is not None else UserStats
+    query = (
+        select(stats_model, User.username)
+        .join(User, User.id == stats_model.user_id)
+        .where(stats_model.games_played > 0)
+        .order_by(
+            stats_model.games_won.desc(),
+            stats_model.games_played,
+            stats_model.user_id,
+        )
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+    )
+    if difficulty_id is not None:
+        query = query.where(UserDifficultyStats.difficulty_id == difficulty_id)
+    try:
+        rows = db.session.execute(query).all()
+    except SQLAlchemyError as e:
+        logging.error(f"Error fetching leaderboard: {str(e)}")
+        return ErrorResponse.handle_error(
+            "Leaderboard was not able to be fetched.", 503
+        )
+
+    first_rank = (page - 1) * per_page + 1
+    return (
+        jsonify(
+            {
+                "page": page,
+                "per_page": per_page,
+                "difficulty_id": difficulty_id,
+                "players": [
+                    {
+                        "rank": first_rank + i,
+                        "player_id": stats.user_id,
+                        "username": username if username else "",
+                        **stats_to_json(stats),
+                    }
+                    for i, (stats, username) in enumerate(rows)
+                ],
+            }
+        ),
+        200,
+    )
@@ -0,0 +1,35 @@
+# Production entry point, run from the server directory with "python serve.py"
+# (python app.py is the debug server)
+# Serves HTTP and Socket.IO from green threads with eventlet's WSGI server.
+# ASYNC_MODE can only be eventlet, the threading mode would run Werkzeug's
+# development server. Listens on HOST:PORT, see config.py for the database
+# pool (DB_POOL_SIZE, ...) and MAX_CONNECTIONS
+import os
+from util.serving import patch_for, run_options
+
+ASYNC_MODE = os.getenv("ASYNC_MODE", "eventlet")
+if ASYNC_MODE != "eventlet":
+    raise SystemExit(
+        f"serve.py only serves with ASYNC_MODE=eventlet (got {ASYNC_MODE}), "
+        "use python app.py for the threading development server."
+    )
+# before the app imports requests, redis and SQLAlchemy
+patch_for(ASYNC_MODE)
+
+from app import create_app
+from extensions import socketio
+
+
+def main():
+    app = create_app()
+    socketio.run(
+        app,
+        host=app.config["HOST"],
+        port=app.config["PORT"],
+        log_output=False,
+        **run_options(app.config["MAX_CONNECTIONS"]),
+    )
+
+
+if __name__ == "__main__":
+    main()
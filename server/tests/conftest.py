@@ -1,7 +1,14 @@
 import pytest
+from contextlib import contextmanager
 from flask import Flask, abort
+from sqlalchemy import event
 from models.models import db
 from routes.auth_bp import auth_bp
+from routes.game_bp import game_bp
+from routes.round_bp import round_bp
+from routes.room_bp import room_bp
+from routes.user_bp import user_bp
+from util.room_store import room_store
 
 
 @pytest.fixture(scope="function")
@@ -17,6 +24,11 @@ def create_app():
 
     # register routes for app
     app_mock.register_blueprint(auth_bp, url_prefix="/auth")
+    app_mock.register_blueprint(user_bp, url_prefix="/users")
+    app_mock.register_blueprint(game_bp, url_prefix="/games")
+    app_mock.register_blueprint(round_bp, url_prefix="/rounds")
+    app_mock.register_blueprint(room_bp, url_prefix="/rooms")
+    room_store.init_app(app_mock)  # empty in-process rooms for every test
     return app_mock
 
 
@@ -33,3 +45,27 @@ def create_db(create_app):
     with app_mock.app_context():
         db.session.remove()
         db.drop_all()
+
+
+# Counts the SQL statements run inside the block, use it to put a query budget
+# on an endpoint:
+#     with count_queries() as queries:
+#         client.get(...)
+#     assert len(queries) <= 4
+@pytest.fixture(scope="function")
+def count_queries(create_db):
+    @contextmanager
+    def counter():
+        queries = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield queries
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
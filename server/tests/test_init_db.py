@@ -0,0 +1,35 @@
+from init_db import difficulty_keys, seed_difficulties
+from models.models import db, Difficulty
+from util.enum import DifficultyEnum
+
+
+class TestSeedDifficulties:
+    def test_seeds_every_difficulty(self, create_app, create_db):
+        with create_app.app_context():
+            assert seed_difficulties(difficulty_keys()) == (1003, 0)
+            assert Difficulty.query.count() == 1003
+            normal = Difficulty.query.filter_by(mode=DifficultyEnum.NORMAL).one()
+            assert (normal.max_turns, normal.num_holes, normal.num_colors) == (
+                10,
+                4,
+                8,
+            )
+            assert Difficulty.query.filter_by(mode=DifficultyEnum.CUSTOM).count() == (
+                11 * 7 * 13
+            )
+
+    def test_is_idempotent(self, create_app, create_db):
+        with create_app.app_context():
+            seed_difficulties(difficulty_keys())
+            assert seed_difficulties(difficulty_keys()) == (0, 1003)
+            assert Difficulty.query.count() == 1003
+
+    def test_seeds_only_new_rows_of_wider_range(self, create_app, create_db):
+        with create_app.app_context():
+            seed_difficulties(difficulty_keys())
+            num_inserted, num_skipped = seed_difficulties(
+                difficulty_keys(max_turns=20, max_holes=12, max_colors=20),
+                batch_size=100,
+            )
+            assert (num_inserted, num_skipped) == (11 * 2 * 13, 1003)
+            assert Difficulty.query.count() == 1003 + 11 * 2 * 13
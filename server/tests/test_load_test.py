@@ -0,0 +1,16 @@
+from benchmarks.load_test import (
+    Recorder,
+    create_load_test_app,
+    run_session,
+)
+
+
+# Runs one session of each kind so the load test keeps up with the API
+def test_load_test_sessions():
+    app = create_load_test_app("sqlite:///:memory:", None)
+    recorder = Recorder()
+    assert run_session(app, recorder, 0, multiplayer_ratio=0, seed=0)
+    assert run_session(app, recorder, 1, multiplayer_ratio=1, seed=0)
+    assert not recorder.errors
+    assert len(recorder.latencies["PATCH /rounds/<id>/secret-code"]) == 2
+    assert recorder.latencies["POST /rounds/<id>/turns"]
@@ -1,6 +1,8 @@
 import pytest
 from models.models import User, Difficulty, Game, Round, Turn
+from util.code import Code
 from util.enum import DifficultyEnum, StatusEnum
+from util.game_logic import calculate_result
 import json
 
 
@@ -318,3 +320,35 @@ class TestTurnModel:
         new_guess = json.dumps([1, 1, 1, 1])
         new_turn = Turn(round=new_round, turn_num=1, guess=new_guess, result=result)
         assert new_turn
+
+    def test_guess_stored_as_packed_integer(self):
+        new_round = self.setup_round(4, 8)
+        new_turn = Turn(round=new_round, turn_num=1, guess=json.dumps([1, 2, 3, 4]))
+        assert new_turn.guess_code == 1 * 8**3 + 2 * 8**2 + 3 * 8 + 4
+        assert new_turn.guess == [1, 2, 3, 4]
+
+    def test_result_stored_as_columns(self):
+        new_round = self.setup_round(4, 8)
+        result = json.dumps(
+            {
+                "won_round": False,
+                "black_pegs": 1,
+                "white_pegs": 2,
+                "message": "3 correct numbers and 1 correct location",
+            }
+        )
+        new_turn = Turn(round=new_round, turn_num=1, result=result)
+        assert (new_turn.won_round, new_turn.black_pegs, new_turn.white_pegs) == (
+            False,
+            1,
+            2,
+        )
+        assert new_turn.result == json.loads(result)
+
+    def test_from_trusted(self):
+        guess = Code.from_list([1, 2, 3, 4], 4, 8)
+        result = calculate_result(guess, Code.from_list([1, 3, 2, 7], 4, 8), 8)
+        new_turn = Turn.from_trusted(5, 2, guess, result)
+        assert (new_turn.round_id, new_turn.turn_num) == (5, 2)
+        assert new_turn.guess_code == guess.packed
+        assert new_turn.result == result
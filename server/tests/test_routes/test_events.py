@@ -0,0 +1,145 @@
+import json
+import pytest
+from extensions import socketio
+from models.models import db, User, Difficulty, Game, Round, Turn
+from util.enum import DifficultyEnum, StatusEnum
+from util.game_logic import calculate_result
+from util.moves import round_room
+import events  # registers the socket handlers
+
+
+def setup_multiplayer_round(secret_code):
+    difficulty = Difficulty(
+        mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+    )
+    code_breaker, code_maker = User(username="breaker"), User(username="maker")
+    game = Game(
+        is_multiplayer=True,
+        difficulty=difficulty,
+        status=StatusEnum.IN_PROGRESS,
+        num_rounds=2,
+    )
+    game.players.extend([code_breaker, code_maker])
+    round = Round(
+        game=game,
+        status=StatusEnum.IN_PROGRESS,
+        code_breaker=code_breaker,
+        round_num=1,
+        secret_code=json.dumps(secret_code),
+    )
+    db.session.add(round)
+    db.session.commit()
+    return code_breaker.id, code_maker.id, game.id, round.id
+
+
+@pytest.fixture
+def socket_clients(create_app, create_db):
+    mock_app = create_app
+    socketio.init_app(mock_app)
+
+    def connect(user_id):
+        flask_client = mock_app.test_client(use_cookies=True)
+        with flask_client.session_transaction() as sess:
+            sess["user_id"] = user_id
+        return socketio.test_client(mock_app, flask_test_client=flask_client)
+
+    return connect
+
+
+def events_named(client, name):
+    return [
+        event["args"][0] for event in client.get_received() if event["name"] == name
+    ]
+
+
+class TestSubmitMoveEvent:
+    def test_move_is_saved_acknowledged_and_broadcast(self, create_app, socket_clients):
+        secret_code = [1, 2, 3, 4]
+        with create_app.app_context():
+            breaker_id, maker_id, game_id, round_id = setup_multiplayer_round(
+                secret_code
+            )
+            breaker, maker = socket_clients(breaker_id), socket_clients(maker_id)
+            for client in (breaker, maker):
+                client.emit(
+                    "join_multiplayer_round", {"room": round_room(game_id, round_id)}
+                )
+                client.get_received()
+
+            ack = breaker.emit(
+                "submit_move",
+                {"round_id": round_id, "guess": [1, 2, 0, 0]},
+                callback=True,
+            )
+            assert ack["round_id"] == round_id
+            assert ack["turn"]["turn_num"] == 1
+            assert ack["turn"]["guess"] == [1, 2, 0, 0]
+            assert ack["turn"]["result"] == calculate_result(
+                [1, 2, 0, 0], secret_code, 8
+            )
+            assert ack["status"] == "IN_PROGRESS"
+            assert (ack["turns_used"], ack["turns_remaining"]) == (1, 9)
+            assert ack["secret_code"] is None
+            assert events_named(maker, "move_made") == [ack]
+            assert events_named(breaker, "move_made") == []
+
+            turn = db.session.get(Turn, ack["turn"]["id"])
+            assert (turn.round_id, turn.turn_num) == (round_id, 1)
+
+            ack = breaker.emit(
+                "submit_move",
+                {"round_id": round_id, "guess": secret_code},
+                callback=True,
+            )
+            assert ack["turn"]["result"]["won_round"]
+            assert ack["status"] == "COMPLETED"
+            assert ack["secret_code"] == secret_code
+            assert events_named(maker, "move_made") == [ack]
+            db.session.expire_all()
+            round = db.session.get(Round, round_id)
+            assert (round.status, round.points) == (StatusEnum.COMPLETED, 2)
+
+    def test_rejected_moves_are_acknowledged_with_errors(
+        self, create_app, socket_clients
+    ):
+        with create_app.app_context():
+            breaker_id, maker_id, game_id, round_id = setup_multiplayer_round(
+                [1, 2, 3, 4]
+            )
+            breaker, maker = socket_clients(breaker_id), socket_clients(maker_id)
+            maker.emit(
+                "join_multiplayer_round", {"room": round_room(game_id, round_id)}
+            )
+            maker.get_received()
+
+            ack = maker.emit(
+                "submit_move",
+                {"round_id": round_id, "guess": [1, 2, 3, 4]},
+                callback=True,
+            )
+            assert ack["error"] == {
+                "code": "unauthorized",
+                "message": "User is not the codebreaker.",
+            }
+            ack = breaker.emit(
+                "submit_move",
+                {"round_id": round_id, "guess": [1, 2, 3, 9]},
+                callback=True,
+            )
+            assert (
+                ack["error"]["message"] == "Guess was not provided in correct format."
+            )
+            ack = breaker.emit(
+                "submit_move", {"round_id": "1", "guess": [1, 2, 3, 4]}, callback=True
+            )
+            assert ack["error"]["code"] == "notFound"
+            anonymous = socket_clients(None)
+            ack = anonymous.emit(
+                "submit_move",
+                {"round_id": round_id, "guess": [1, 2, 3, 4]},
+                callback=True,
+            )
+            assert ack["error"]["code"] == "unauthorized"
+
+            assert events_named(maker, "move_made") == []
+            assert Turn.query.count() == 0
@@ -0,0 +1,218 @@
+from models.models import db, User, Difficulty, Game, GameScore, Round
+from util.difficulty_registry import difficulty_registry
+from util.enum import DifficultyEnum, StatusEnum
+import json
+
+# Queries allowed for GET /games/<game_id>: user, game with its difficulty,
+# players and rounds
+GAME_DETAILS_QUERY_BUDGET = 4
+
+
+def setup_user_and_difficulties():
+    user = User()
+    db.session.add_all(
+        [
+            user,
+            Difficulty(
+                mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+            ),
+            Difficulty(
+                mode=DifficultyEnum.HARD, max_turns=12, num_holes=5, num_colors=10
+            ),
+        ]
+    )
+    db.session.commit()
+    difficulty_registry.refresh()
+    return user.id
+
+
+def setup_game(num_rounds):
+    user, other_user = User(), User()
+    game = Game(
+        is_multiplayer=True,
+        difficulty=Difficulty(
+            mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+        ),
+        status=StatusEnum.IN_PROGRESS,
+        num_rounds=num_rounds,
+    )
+    game.players.extend([user, other_user])
+    for round_num in range(1, num_rounds + 1):
+        game.rounds.append(
+            Round(
+                status=StatusEnum.COMPLETED,
+                code_breaker=user if round_num % 2 else other_user,
+                round_num=round_num,
+                secret_code=json.dumps([0, 1, 2, round_num % 8]),
+            )
+        )
+    db.session.add(game)
+    db.session.commit()
+    return user.id, game.id
+
+
+class TestGameRoute:
+    def test_create_single_player_game(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user_id = setup_user_and_difficulties()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user_id
+            response = client_mock.post(
+                "/games/",
+                json={
+                    "is_multiplayer": False,
+                    "difficulty": "HARD",
+                    "max_turns": 12,
+                    "num_holes": 5,
+                    "num_colors": 10,
+                },
+            )
+            assert response.status_code == 201
+            assert response.json["difficulty"] == "HARD"
+            assert response.json["players"] == [user_id]
+            game = db.session.get(Game, response.json["id"])
+            assert game.difficulty.num_holes == 5
+            assert [(score.user_id, score.points) for score in game.scores] == [
+                (user_id, 0)
+            ]
+
+    def test_create_game_difficulty_does_not_exist(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user_id = setup_user_and_difficulties()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user_id
+            response = client_mock.post(
+                "/games/",
+                json={
+                    "is_multiplayer": False,
+                    "difficulty": "NORMAL",
+                    "max_turns": 12,
+                    "num_holes": 4,
+                    "num_colors": 8,
+                },
+            )
+            assert response.status_code == 404
+
+    def test_game_details_query_budget(self, create_app, create_db, count_queries):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            query_counts = []
+            for num_rounds in (1, 8):
+                user_id, game_id = setup_game(num_rounds)
+                with client_mock.session_transaction() as sess:
+                    sess["user_id"] = user_id
+                # start from an empty session like a fresh request would
+                db.session.expunge_all()
+                with count_queries() as queries:
+                    response = client_mock.get(f"/games/{game_id}")
+                assert response.status_code == 200
+                assert [round["round_num"] for round in response.json["rounds"]] == [
+                    i + 1 for i in range(num_rounds)
+                ]
+                assert response.json["rounds"][-1]["secret_code"] == [
+                    0,
+                    1,
+                    2,
+                    num_rounds % 8,
+                ]
+                query_counts.append(len(queries))
+
+            assert query_counts[0] == query_counts[1]
+            assert query_counts[1] <= GAME_DETAILS_QUERY_BUDGET
+
+    def test_game_details_user_not_in_game(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            _, game_id = setup_game(2)
+            outsider = User()
+            db.session.add(outsider)
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = outsider.id
+            response = client_mock.get(f"/games/{game_id}")
+            assert response.status_code == 401
+
+    def test_multiplayer_scores_and_winner(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            players = [User(username=f"player {i}") for i in range(3)]
+            game = Game(
+                is_multiplayer=True,
+                difficulty=Difficulty(
+                    mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+                ),
+                status=StatusEnum.IN_PROGRESS,
+                num_rounds=3,
+                players=players,
+            )
+            db.session.add(game)
+            db.session.flush()
+            game.scores = [GameScore(user_id=player.id) for player in players]
+            db.session.commit()
+            player_ids = [player.id for player in players]
+
+            # turns needed by each player, the last one fails the round
+            for round_num, num_turns in enumerate([3, 2, 10], start=1):
+                round = Round(
+                    game_id=game.id,
+                    status=StatusEnum.IN_PROGRESS,
+                    code_breaker_id=player_ids[round_num - 1],
+                    round_num=round_num,
+                    secret_code=json.dumps([1, 2, 3, 4]),
+                )
+                db.session.add(round)
+                db.session.commit()
+                with client_mock.session_transaction() as sess:
+                    sess["user_id"] = player_ids[round_num - 1]
+                for turn_num in range(1, num_turns + 1):
+                    guess = [1, 2, 3, 4] if turn_num == num_turns < 10 else [0] * 4
+                    response = client_mock.post(
+                        f"/rounds/{round.id}/turns", json={"guess": guess}
+                    )
+                    assert response.status_code == 201
+
+                response = client_mock.get(f"/games/{game.id}/scores")
+                assert response.status_code == 200
+                if round_num == 1:
+                    assert response.json["status"] == "IN_PROGRESS"
+                    assert response.json["winner_id"] is None
+                    assert response.json["scores"][-1] == {
+                        "player_id": player_ids[0],
+                        "username": "player 0",
+                        "points": 3,
+                        "rounds_completed": 1,
+                    }
+
+            assert response.json["status"] == "COMPLETED"
+            assert response.json["winner_id"] == player_ids[1]
+            assert [
+                (score["player_id"], score["points"])
+                for score in response.json["scores"]
+            ] == [(player_ids[1], 2), (player_ids[0], 3), (player_ids[2], 15)]
+
+    def test_tied_scores_have_no_winner(self, create_app, create_db):
+        with create_app.app_context():
+            user_id, game_id = setup_game(2)
+            db.session.add_all(
+                [
+                    GameScore(game_id=game_id, user_id=user_id, points=7),
+                    GameScore(game_id=game_id, user_id="other", points=7),
+                ]
+            )
+            db.session.commit()
+            assert GameScore.winner_id(game_id) is None
+            GameScore.add_round_points(game_id, user_id, 1)
+            assert GameScore.winner_id(game_id) == "other"
+            assert db.session.get(GameScore, (game_id, user_id)).rounds_completed == 1
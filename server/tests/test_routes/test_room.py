@@ -0,0 +1,134 @@
+from models.models import db, User, Difficulty, Game
+from util.difficulty_registry import difficulty_registry
+from util.enum import DifficultyEnum
+from util.room_store import room_store
+
+
+def login(client, user_id):
+    with client.session_transaction() as sess:
+        sess["user_id"] = user_id
+
+
+def setup_users_and_difficulty(num_users):
+    users = [User(username=f"player {i}") for i in range(num_users)]
+    db.session.add_all(
+        users
+        + [
+            Difficulty(
+                mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+            )
+        ]
+    )
+    db.session.commit()
+    difficulty_registry.refresh()
+    return [user.id for user in users]
+
+
+class TestRoomRoute:
+    def test_room_flow_does_not_write_postgres(
+        self, create_app, create_db, count_queries
+    ):
+        mock_app = create_app
+        host, guest = mock_app.test_client(), mock_app.test_client()
+
+        with mock_app.app_context():
+            host_id, guest_id = setup_users_and_difficulty(2)
+            login(host, host_id)
+            login(guest, guest_id)
+
+            with count_queries() as queries:
+                room = host.post("/rooms/").json
+                response = guest.post("/rooms/join", json={"code": room["code"]})
+                assert response.status_code == 200
+                response = host.patch(
+                    f"/rooms/{room['id']}",
+                    json={
+                        "difficulty": "NORMAL",
+                        "max_turns": 10,
+                        "num_holes": 4,
+                        "num_colors": 8,
+                        "rounds": 4,
+                    },
+                )
+                assert response.status_code == 200
+                response = guest.get(f"/rooms/{room['id']}")
+            assert response.json["num_rounds"] == 4
+            assert response.json["players"] == sorted(
+                [
+                    {"id": host_id, "username": "player 0", "is_host": True},
+                    {"id": guest_id, "username": "player 1", "is_host": False},
+                ],
+                key=lambda player: player["id"],
+            )
+            assert not [query for query in queries if not query.startswith("SELECT")]
+
+            assert host.get("/users/me").json["is_host"] is True
+            assert guest.get("/users/me").json["is_host"] is False
+
+    def test_create_game_closes_room(self, create_app, create_db):
+        mock_app = create_app
+        host, guest = mock_app.test_client(), mock_app.test_client()
+
+        with mock_app.app_context():
+            host_id, guest_id = setup_users_and_difficulty(2)
+            login(host, host_id)
+            login(guest, guest_id)
+            room = host.post("/rooms/").json
+            guest.post("/rooms/join", json={"code": room["code"]})
+
+            response = guest.post(
+                "/games/",
+                json={
+                    "is_multiplayer": True,
+                    "difficulty": "NORMAL",
+                    "max_turns": 10,
+                    "num_holes": 4,
+                    "num_colors": 8,
+                    "num_rounds": 2,
+                    "room_id": room["id"],
+                },
+            )
+            assert response.status_code == 401
+
+            response = host.post(
+                "/games/",
+                json={
+                    "is_multiplayer": True,
+                    "difficulty": "NORMAL",
+                    "max_turns": 10,
+                    "num_holes": 4,
+                    "num_colors": 8,
+                    "num_rounds": 2,
+                    "room_id": room["id"],
+                },
+            )
+            assert response.status_code == 201
+            game = db.session.get(Game, response.json["id"])
+            assert sorted(player.id for player in game.players) == sorted(
+                [host_id, guest_id]
+            )
+            assert room_store.get(room["id"]) is None
+            assert room_store.get_by_code(room["code"]) is None
+            assert host.get(f"/rooms/{room['id']}").status_code == 404
+
+    def test_join_full_or_unknown_room(self, create_app, create_db):
+        mock_app = create_app
+        clients = [mock_app.test_client() for _ in range(3)]
+
+        with mock_app.app_context():
+            user_ids = setup_users_and_difficulty(3)
+            for client, user_id in zip(clients, user_ids):
+                login(client, user_id)
+            room = clients[0].post("/rooms/").json
+
+            response = clients[1].post("/rooms/join", json={"code": room["code"]})
+            assert response.status_code == 200
+            # joining again returns the room
+            response = clients[1].post("/rooms/join", json={"code": room["code"]})
+            assert len(response.json["players"]) == 2
+            response = clients[2].post("/rooms/join", json={"code": room["code"]})
+            assert response.status_code == 403
+            response = clients[2].post("/rooms/join", json={"code": "abcdef"})
+            assert response.status_code == 400
+            assert response.json["error"]["message"] == "Code is invalid."
+            assert clients[2].get(f"/rooms/{room['id']}").status_code == 401
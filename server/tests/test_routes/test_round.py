@@ -0,0 +1,222 @@
+import json
+import pytest
+from models.models import db, User, Difficulty, Game, Round, Turn
+from sqlalchemy.exc import IntegrityError
+from util.enum import DifficultyEnum, StatusEnum
+from util.game_logic import calculate_result
+from util.scoring import enumerate_codes
+
+# Queries allowed for the session_required + round decorator chain
+ROUND_CONTEXT_QUERY_BUDGET = 1
+
+
+def setup_round(secret_code):
+    difficulty = Difficulty(
+        mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+    )
+    user = User()
+    game = Game(
+        is_multiplayer=False,
+        difficulty=difficulty,
+        status=StatusEnum.IN_PROGRESS,
+        num_rounds=1,
+    )
+    game.players.append(user)
+    round = Round(
+        game=game,
+        status=StatusEnum.IN_PROGRESS,
+        code_breaker=user,
+        round_num=1,
+        secret_code=json.dumps(secret_code),
+    )
+    db.session.add(round)
+    db.session.commit()
+    return user.id, round.id
+
+
+# Counts the codes consistent with the guesses by brute force
+def count_consistent(guesses, secret_code):
+    results = [calculate_result(guess, secret_code, 8) for guess in guesses]
+    return sum(
+        all(
+            calculate_result(guess, code, 8)["black_pegs"] == result["black_pegs"]
+            and calculate_result(guess, code, 8)["white_pegs"] == result["white_pegs"]
+            for guess, result in zip(guesses, results)
+        )
+        for code in enumerate_codes(4, 8).tolist()
+    )
+
+
+class TestRoundRoute:
+    def test_remaining_possibilities(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+        secret_code = [1, 2, 3, 4]
+
+        with mock_app.app_context():
+            user_id, round_id = setup_round(secret_code)
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user_id
+
+            response = client_mock.get(f"/rounds/{round_id}")
+            assert response.status_code == 200
+            assert response.json["remaining_possibilities"] == 8**4
+            assert response.json["remaining_possibilities_estimated"] is False
+
+            guesses = []
+            for guess in ([0, 0, 1, 1], [1, 1, 2, 2]):
+                guesses.append(guess)
+                response = client_mock.post(
+                    f"/rounds/{round_id}/turns", json={"guess": guess}
+                )
+                assert response.status_code == 201
+                response = client_mock.get(f"/rounds/{round_id}")
+                assert response.json["remaining_possibilities"] == count_consistent(
+                    guesses, secret_code
+                )
+
+            assert [
+                (turn["turn_num"], turn["guess"], turn["result"])
+                for turn in response.json["turns"]
+            ] == [
+                (i + 1, guess, calculate_result(guess, secret_code, 8))
+                for i, guess in enumerate(guesses)
+            ]
+
+    def test_round_decorators_share_one_query(
+        self, create_app, create_db, count_queries
+    ):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user_id, round_id = setup_round([1, 2, 3, 4])
+            round = db.session.get(Round, round_id)
+            round.status = StatusEnum.COMPLETED
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user_id
+
+            db.session.expunge_all()
+            with count_queries() as queries:
+                response = client_mock.get(f"/rounds/{round_id}/secret-code")
+            assert response.status_code == 200
+            assert response.json["secret_code"] == [1, 2, 3, 4]
+            assert len(queries) == ROUND_CONTEXT_QUERY_BUDGET
+
+            # only the turns are loaded on top of the round context
+            db.session.expunge_all()
+            with count_queries() as queries:
+                response = client_mock.get(f"/rounds/{round_id}")
+            assert response.status_code == 200
+            assert len(queries) == ROUND_CONTEXT_QUERY_BUDGET + 1
+
+    def test_round_context_errors(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user_id, round_id = setup_round([1, 2, 3, 4])
+            outsider = User()
+            db.session.add(outsider)
+            db.session.commit()
+            outsider_id = outsider.id
+
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user_id
+            response = client_mock.get(f"/rounds/{round_id + 1}")
+            assert response.status_code == 404
+            response = client_mock.post(
+                f"/rounds/{round_id + 1}/turns", json={"guess": [0, 0, 1, 1]}
+            )
+            assert response.status_code == 404
+
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = outsider_id
+            response = client_mock.get(f"/rounds/{round_id}")
+            assert response.status_code == 401
+            assert (
+                response.json["error"]["message"] == "User is not a player in the game."
+            )
+            response = client_mock.post(
+                f"/rounds/{round_id}/turns", json={"guess": [0, 0, 1, 1]}
+            )
+            assert response.json["error"]["message"] == "User is not the codebreaker."
+
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = "does-not-exist"
+            response = client_mock.get(f"/rounds/{round_id}")
+            assert response.status_code == 401
+            assert response.json["error"]["message"] == "Unauthorized access."
+
+    def test_moves_do_not_read_turns(self, create_app, create_db, count_queries):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user_id, round_id = setup_round([1, 2, 3, 4])
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user_id
+
+            for turn_num in range(1, 4):
+                db.session.expunge_all()
+                with count_queries() as queries:
+                    response = client_mock.post(
+                        f"/rounds/{round_id}/turns", json={"guess": [0, 0, 0, 0]}
+                    )
+                assert response.status_code == 201
+                assert response.json["turn_num"] == turn_num
+                assert not [
+                    query
+                    for query in queries
+                    if query.startswith("SELECT") and "FROM turn" in query
+                ]
+            assert db.session.get(Round, round_id).turns_used == 3
+            response = client_mock.get(f"/rounds/{round_id}")
+            assert response.json["turns_used"] == 3
+            assert response.json["turns_remaining"] == 7
+
+    def test_move_past_max_turns(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user_id, round_id = setup_round([1, 2, 3, 4])
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user_id
+
+            for _ in range(10):
+                response = client_mock.post(
+                    f"/rounds/{round_id}/turns", json={"guess": [0, 0, 0, 0]}
+                )
+                assert response.status_code == 201
+            round = db.session.get(Round, round_id)
+            assert round.status == StatusEnum.COMPLETED
+            assert round.points == 15
+
+            # a round left in progress with every turn used still rejects moves
+            round.status = StatusEnum.IN_PROGRESS
+            db.session.commit()
+            response = client_mock.post(
+                f"/rounds/{round_id}/turns", json={"guess": [0, 0, 0, 0]}
+            )
+            assert response.status_code == 400
+            assert db.session.get(Round, round_id).turns_used == 10
+            assert Turn.query.filter_by(round_id=round_id).count() == 10
+
+    def test_turn_numbers_are_unique(self, create_app, create_db):
+        with create_app.app_context():
+            _, round_id = setup_round([1, 2, 3, 4])
+            for _ in range(2):
+                db.session.add(
+                    Turn(
+                        round_id=round_id,
+                        turn_num=1,
+                        guess_code=0,
+                        black_pegs=0,
+                        white_pegs=0,
+                        won_round=False,
+                    )
+                )
+            with pytest.raises(IntegrityError):
+                db.session.commit()
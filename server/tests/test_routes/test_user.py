@@ -0,0 +1,349 @@
+from models.models import db, User, Difficulty, Game, Round
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from util.enum import DifficultyEnum, StatusEnum
+from datetime import datetime
+import json
+
+
+class TestUserRoute:
+    def test_user_details_served_from_identity_cache(
+        self, create_app, create_db, count_queries
+    ):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User(username="john")
+            db.session.add(user)
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+
+            response = client_mock.get("/users/me")
+            assert response.json["username"] == "john"
+            with count_queries() as queries:
+                response = client_mock.get("/users/me")
+            assert response.status_code == 200
+            assert response.json["username"] == "john"
+            assert not queries
+
+    def test_change_username_invalidates_identity(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User(username="john")
+            db.session.add(user)
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+
+            assert client_mock.get("/users/me").json["username"] == "john"
+            response = client_mock.patch(
+                "/users/me/username", json={"username": "jane"}
+            )
+            assert response.status_code == 200
+            assert client_mock.get("/users/me").json["username"] == "jane"
+
+
+# Plays a game of len(num_turns) rounds through POST /rounds/<id>/turns, the
+# code breaker alternates and a round of 10 turns is failed
+def play_game(client, difficulty, players, num_turns):
+    game = Game(
+        is_multiplayer=len(players) > 1,
+        difficulty=difficulty,
+        status=StatusEnum.IN_PROGRESS,
+        num_rounds=len(num_turns),
+        players=players,
+    )
+    db.session.add(game)
+    db.session.commit()
+    for round_num, round_turns in enumerate(num_turns, start=1):
+        code_breaker_id = players[(round_num - 1) % len(players)].id
+        round = Round(
+            game_id=game.id,
+            status=StatusEnum.IN_PROGRESS,
+            code_breaker_id=code_breaker_id,
+            round_num=round_num,
+            secret_code=json.dumps([1, 2, 3, 4]),
+        )
+        db.session.add(round)
+        db.session.commit()
+        with client.session_transaction() as sess:
+            sess["user_id"] = code_breaker_id
+        for turn_num in range(1, round_turns + 1):
+            guess = [1, 2, 3, 4] if turn_num == round_turns < 10 else [0] * 4
+            response = client.post(f"/rounds/{round.id}/turns", json={"guess": guess})
+            assert response.status_code == 201
+    return game.id
+
+
+class TestUserStatsRoute:
+    def test_stats_and_leaderboard(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            normal = Difficulty(
+                mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+            )
+            hard = Difficulty(
+                mode=DifficultyEnum.HARD, max_turns=10, num_holes=4, num_colors=8
+            )
+            alice, bob, carol = (User(username=name) for name in ("a", "b", "c"))
+            db.session.add_all([normal, hard, alice, bob, carol])
+            db.session.commit()
+
+            play_game(client_mock, normal, [alice, bob], [3, 5])  # alice wins
+            play_game(client_mock, normal, [alice, bob], [10, 4])  # bob wins
+            play_game(client_mock, hard, [alice], [2])  # alice wins
+            play_game(client_mock, hard, [carol], [10])  # carol loses
+
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = alice.id
+            response = client_mock.get("/users/me/stats")
+            assert response.status_code == 200
+            assert response.json["overall"] == {
+                "games_played": 3,
+                "games_won": 2,
+                "win_rate": 2 / 3,
+                "rounds_played": 3,
+                "rounds_solved": 2,
+                "average_turns_to_solve": 2.5,
+            }
+            assert [
+                (stats["mode"], stats["games_played"], stats["games_won"])
+                for stats in response.json["difficulties"]
+            ] == [("NORMAL", 2, 1), ("HARD", 1, 1)]
+
+            response = client_mock.get("/users/leaderboard")
+            assert response.status_code == 200
+            assert [
+                (player["rank"], player["username"], player["games_won"])
+                for player in response.json["players"]
+            ] == [(1, "a", 2), (2, "b", 1), (3, "c", 0)]
+
+            response = client_mock.get("/users/leaderboard?page=2&per_page=2")
+            assert [player["rank"] for player in response.json["players"]] == [3]
+
+            response = client_mock.get(f"/users/leaderboard?difficulty_id={hard.id}")
+            assert [
+                (player["username"], player["win_rate"])
+                for player in response.json["players"]
+            ] == [("a", 1.0), ("c", 0.0)]
+
+    def test_stats_of_new_user(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User()
+            db.session.add(user)
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+
+            response = client_mock.get("/users/me/stats")
+            assert response.json["overall"]["games_played"] == 0
+            assert response.json["overall"]["win_rate"] is None
+            assert response.json["difficulties"] == []
+
+    def test_leaderboard_invalid_page(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User()
+            db.session.add(user)
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+
+            for query in ("page=0", "per_page=0", "per_page=101"):
+                response = client_mock.get(f"/users/leaderboard?{query}")
+                assert response.status_code == 400
+
+    def test_database_errors(self, create_app, create_db, monkeypatch):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User()
+            db.session.add(user)
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+            # loads the session user into the identity cache
+            assert client_mock.get("/users/me/stats").status_code == 200
+
+            def fail(*args, **kwargs):
+                raise OperationalError("SELECT", {}, Exception("database is down"))
+
+            monkeypatch.setattr(db.session, "scalars", fail)
+            monkeypatch.setattr(db.session, "execute", fail)
+            assert client_mock.get("/users/me/stats").status_code == 503
+            assert client_mock.get("/users/leaderboard").status_code == 503
+
+
+class TestGameHistoryRoute:
+    def test_pages_newest_first(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user, other_user = User(), User()
+            normal = Difficulty(
+                mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+            )
+            hard = Difficulty(
+                mode=DifficultyEnum.HARD, max_turns=12, num_holes=5, num_colors=10
+            )
+            # pairs of games share a created_at, pages follow the game ids
+            games = [
+                Game(
+                    created_at=datetime(2024, 1, 1 + i // 2),
+                    is_multiplayer=False,
+                    difficulty=hard if i % 3 == 0 else normal,
+                    status=StatusEnum.COMPLETED if i % 2 else StatusEnum.IN_PROGRESS,
+                    players=[user],
+                )
+                for i in range(7)
+            ]
+            games.append(
+                Game(
+                    is_multiplayer=False,
+                    difficulty=normal,
+                    status=StatusEnum.COMPLETED,
+                    players=[other_user],
+                )
+            )
+            db.session.add_all(games)
+            db.session.commit()
+            game_ids = [game.id for game in games[:7]]
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+
+            pages, cursor = [], None
+            while True:
+                response = client_mock.get(
+                    "/users/me/games",
+                    query_string={"limit": 3, **({"cursor": cursor} if cursor else {})},
+                )
+                assert response.status_code == 200
+                pages.append([game["id"] for game in response.json["games"]])
+                cursor = response.json["next_cursor"]
+                if not cursor:
+                    break
+            assert pages == [
+                game_ids[6:3:-1],
+                game_ids[3:0:-1],
+                game_ids[0:1],
+            ]
+
+            response = client_mock.get(
+                "/users/me/games?status=COMPLETED&difficulty=NORMAL"
+            )
+            assert [game["id"] for game in response.json["games"]] == [
+                game_ids[5],
+                game_ids[1],
+            ]
+            assert response.json["games"][0]["difficulty"] == "NORMAL"
+            assert response.json["next_cursor"] is None
+
+    def test_page_queries_do_not_grow_with_history(
+        self, create_app, create_db, count_queries
+    ):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User()
+            difficulty = Difficulty(
+                mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+            )
+            db.session.add_all(
+                Game(
+                    is_multiplayer=False,
+                    difficulty=difficulty,
+                    status=StatusEnum.COMPLETED,
+                    players=[user],
+                )
+                for _ in range(50)
+            )
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+
+            client_mock.get("/users/me")  # caches the identity
+            with count_queries() as queries:
+                response = client_mock.get("/users/me/games?limit=5")
+            assert len(response.json["games"]) == 5
+            assert len(queries) == 1
+
+    def test_pages_scan_the_user_index(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User()
+            difficulty = Difficulty(
+                mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+            )
+            db.session.add_all(
+                Game(
+                    is_multiplayer=False,
+                    difficulty=difficulty,
+                    status=StatusEnum.COMPLETED,
+                    players=[user],
+                )
+                for _ in range(5)
+            )
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+            client_mock.get("/users/me")  # caches the identity
+
+            statements = []
+            listener = lambda *args: statements.append(args[2:4])
+            event.listen(db.engine, "before_cursor_execute", listener)
+            try:
+                response = client_mock.get("/users/me/games?limit=2")
+                cursor = response.json["next_cursor"]
+                client_mock.get("/users/me/games", query_string={"cursor": cursor})
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+
+            assert len(statements) == 2
+            connection = db.session.connection()
+            for statement, parameters in statements:
+                plan = " ".join(
+                    row[-1]
+                    for row in connection.exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                )
+                # no sort of all of the user's games
+                assert "ix_user_games_user_id_game_id" in plan
+                assert "TEMP B-TREE" not in plan
+
+    def test_invalid_parameters(self, create_app, create_db):
+        mock_app = create_app
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User()
+            db.session.add(user)
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+
+            for query in (
+                "limit=0",
+                "limit=101",
+                "status=DONE",
+                "difficulty=EASY",
+                "cursor=not-a-cursor",
+            ):
+                response = client_mock.get(f"/users/me/games?{query}")
+                assert response.status_code == 400
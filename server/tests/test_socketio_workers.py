@@ -0,0 +1,57 @@
+import os
+import threading
+import pytest
+import redis
+from socketio import Client
+from benchmarks.socketio_worker import spawn_worker, stop_worker
+
+MESSAGE_QUEUE = os.getenv(
+    "SOCKETIO_MESSAGE_QUEUE", os.getenv("REDIS_URL", "redis://127.0.0.1:6379")
+)
+
+
+def redis_available():
+    try:
+        return redis.from_url(MESSAGE_QUEUE, socket_connect_timeout=1).ping()
+    except redis.RedisError:
+        return False
+
+
+@pytest.fixture
+def two_workers():
+    if not redis_available():
+        pytest.skip(f"Redis is not reachable at {MESSAGE_QUEUE}")
+    workers = [spawn_worker(MESSAGE_QUEUE) for _ in range(2)]
+    yield [url for _, url in workers]
+    for process, _ in workers:
+        stop_worker(process)
+
+
+def join_room(url, room):
+    client = Client()
+    joined = threading.Event()
+    client.on("user_joined", lambda data: joined.set())
+    client.connect(url, transports=["polling"])
+    client.emit("waiting_room", {"room": room, "players": []})
+    assert joined.wait(10)
+    return client
+
+
+# A move made on one worker reaches a player of the room on the other worker
+def test_room_broadcast_reaches_other_worker(two_workers):
+    first_url, second_url = two_workers
+    received = []
+    moved = threading.Event()
+
+    receiver = join_room(second_url, "cross_worker")
+    receiver.on("new_move_info", lambda data: (received.append(data), moved.set()))
+    sender = join_room(first_url, "cross_worker")
+    try:
+        sender.emit(
+            "make_move", {"room": "cross_worker", "round_info": {"guess": [1, 2]}}
+        )
+        assert moved.wait(10)
+        assert received == [{"round_info": {"guess": [1, 2]}}]
+    finally:
+        sender.disconnect()
+        receiver.disconnect()
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from util.candidate_index import CandidateIndex
+from util.game_logic import calculate_result
+
+
+def make_turns(guesses, secret_code, num_colors=6):
+    turns = []
+    for guess in guesses:
+        result = calculate_result(guess, secret_code, num_colors)
+        turns.append((guess, result["black_pegs"], result["white_pegs"]))
+    return turns
+
+
+def count_consistent(turns, num_holes, num_colors):
+    count = 0
+    for index in range(num_colors**num_holes):
+        code = [int(d) for d in np.base_repr(index, num_colors).zfill(num_holes)]
+        if make_turns([guess for guess, _, _ in turns], code, num_colors) == turns:
+            count += 1
+    return count
+
+
+class TestCandidateIndex:
+    def test_counts_match_brute_force(self):
+        index = CandidateIndex()
+        turns = make_turns([[0, 0, 1, 1], [2, 3, 1, 0], [1, 1, 4, 5]], [1, 0, 4, 1])
+        assert index.remaining_possibilities(1, 4, 6, []) == 6**4
+        for i in range(1, len(turns) + 1):
+            assert index.remaining_possibilities(1, 4, 6, turns[:i]) == (
+                count_consistent(turns[:i], 4, 6)
+            )
+
+    def test_record_turn_prunes_incrementally(self):
+        index = CandidateIndex()
+        turns = make_turns([[0, 0, 1, 1], [2, 3, 1, 0]], [1, 0, 4, 1])
+        index.remaining_possibilities(1, 4, 6, turns[:1])
+        index.record_turn(1, *turns[1])
+        assert index.rounds[1].turns_applied == 2
+        assert index.rounds[1].count == count_consistent(turns, 4, 6)
+        assert index.remaining_possibilities(1, 4, 6, turns) == index.rounds[1].count
+
+    def test_rebuilds_when_history_differs(self):
+        index = CandidateIndex()
+        index.remaining_possibilities(1, 4, 6, make_turns([[0, 0, 1, 1]], [5, 5, 5, 5]))
+        turns = make_turns([[0, 1, 2, 3]], [0, 1, 2, 4])
+        assert index.remaining_possibilities(1, 4, 6, turns) == count_consistent(
+            turns, 4, 6
+        )
+
+    def test_lazy_scan(self, monkeypatch):
+        monkeypatch.setattr("util.candidate_index.MATERIALIZE_LIMIT", 100)
+        monkeypatch.setattr("util.candidate_index.SCAN_CHUNK_SIZE", 500)
+        index = CandidateIndex()
+        turns = make_turns([[0, 0, 1, 1], [0, 1, 2, 3]], [1, 0, 4, 1])
+        assert index.remaining_possibilities(1, 4, 6, []) == 6**4
+        assert index.rounds[1].codes is None
+        assert index.remaining_possibilities(1, 4, 6, turns[:1]) == (
+            count_consistent(turns[:1], 4, 6)
+        )
+        assert index.remaining_possibilities(1, 4, 6, turns) == (
+            count_consistent(turns, 4, 6)
+        )
+        assert index.rounds[1].codes is not None
+
+    def test_estimates_huge_code_space(self):
+        index = CandidateIndex()
+        assert index.remaining_possibilities(1, 10, 20, []) == 20**10
+        # 10 * 0.05 * 0.95**9 of the codes have exactly one 0
+        turns = [([0] * 10, 1, 0)]
+        candidate_set = index.lookup(1, 10, 20, turns)
+        assert candidate_set.estimated
+        assert candidate_set.count == pytest.approx(
+            10 * 0.05 * 0.95**9 * 20**10, rel=0.1
+        )
+        assert index.nbytes < 1024
+
+    def test_estimates_when_scan_is_over_budget(self, monkeypatch):
+        monkeypatch.setattr("util.candidate_index.MATERIALIZE_LIMIT", 100)
+        monkeypatch.setattr("util.candidate_index.SCAN_TIME_BUDGET", -1)
+        index = CandidateIndex()
+        turns = make_turns([[0, 0, 1, 1]], [1, 0, 4, 1])
+        candidate_set = index.lookup(1, 4, 6, turns)
+        assert candidate_set.estimated
+        assert candidate_set.count == pytest.approx(
+            count_consistent(turns, 4, 6), rel=0.1
+        )
+
+    def test_evicts_least_recently_used(self):
+        index = CandidateIndex(max_rounds=2)
+        for round_id in (1, 2):
+            index.remaining_possibilities(round_id, 4, 6, [])
+        index.remaining_possibilities(1, 4, 6, [])
+        index.remaining_possibilities(3, 4, 6, [])
+        assert list(index.rounds.keys()) == [1, 3]
+
+    def test_evicts_by_memory(self):
+        index = CandidateIndex(max_bytes=6**4 * 4 * 2)
+        for round_id in range(5):
+            index.remaining_possibilities(round_id, 4, 6, [])
+        assert len(index.rounds) < 5
+        assert index.nbytes <= index.max_bytes
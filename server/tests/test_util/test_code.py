@@ -0,0 +1,69 @@
+import pytest
+import random
+from util.code import (
+    Code,
+    CodeError,
+    CodeFormatError,
+    CodeLengthError,
+    CodeRangeError,
+)
+from util.scoring import enumerate_codes, score_matrix
+
+
+class TestCode:
+    def test_round_trip(self):
+        for pegs, num_colors in (([0, 0, 0, 0], 8), ([7, 0, 3, 1], 8), ([19] * 10, 20)):
+            code = Code.from_list(pegs, len(pegs), num_colors)
+            assert code.to_list() == pegs
+            assert Code.from_json(code.to_json(), len(pegs), num_colors) == code
+            assert Code(code.packed, len(pegs), num_colors).to_list() == pegs
+        assert Code.from_list([19] * 10, 10, 20).packed == 20**10 - 1
+        assert int(Code.from_list([19] * 10, 10, 20)) == 20**10 - 1
+
+    def test_packed_value_is_enumeration_index(self):
+        codes = enumerate_codes(3, 5)
+        for index in (0, 1, 17, 124):
+            assert Code.from_list(codes[index].tolist(), 3, 5).packed == index
+
+    def test_indexing(self):
+        code = Code.from_list([3, 1, 4, 1, 5], 5, 10)
+        assert [code[i] for i in range(5)] == [3, 1, 4, 1, 5]
+        assert code[-1] == 5
+        assert len(code) == 5
+        assert list(code) == [3, 1, 4, 1, 5]
+        with pytest.raises(IndexError):
+            code[5]
+
+    def test_equality_and_hashing(self):
+        code = Code.from_list([1, 2, 3, 4], 4, 8)
+        assert code == Code.from_list([1, 2, 3, 4], 4, 8)
+        assert code != Code.from_list([1, 2, 3, 5], 4, 8)
+        assert code != Code(code.packed, 4, 9)
+        assert len({code, Code.from_list([1, 2, 3, 4], 4, 8)}) == 1
+
+    def test_invalid_codes(self):
+        with pytest.raises(CodeFormatError):
+            Code.from_list(["a", 1, 2, 3], 4, 8)
+        with pytest.raises(CodeFormatError):
+            Code.from_json("a,b,c", 4, 8)
+        with pytest.raises(CodeLengthError):
+            Code.from_list([1, 2, 3], 4, 8)
+        with pytest.raises(CodeRangeError):
+            Code.from_list([1, 2, 3, 8], 4, 8)
+        with pytest.raises(CodeRangeError):
+            Code.from_list([1, 2, 3, -1], 4, 8)
+
+    def test_pegs_match_batch_scoring(self):
+        rng = random.Random(0)
+        for num_holes, num_colors in ((4, 8), (5, 10), (10, 20)):
+            for _ in range(50):
+                guess = [rng.randrange(num_colors) for _ in range(num_holes)]
+                secret_code = [rng.randrange(num_colors) for _ in range(num_holes)]
+                black_pegs, white_pegs = score_matrix([guess], [secret_code])
+                assert Code.from_list(guess, num_holes, num_colors).pegs(
+                    Code.from_list(secret_code, num_holes, num_colors)
+                ) == (black_pegs[0, 0], white_pegs[0, 0])
+
+    def test_pegs_different_difficulties(self):
+        with pytest.raises(CodeError):
+            Code.from_list([1, 2, 3, 4], 4, 8).pegs(Code.from_list([1, 2, 3, 4], 4, 9))
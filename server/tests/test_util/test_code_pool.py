@@ -0,0 +1,129 @@
+import json
+from flask import Flask
+from benchmarks.fake_random_org import FakeRandomOrgServer
+from util.code_pool import CircuitBreaker, SecretCodePool, init_entropy_provider
+from util.entropy import (
+    RandomOrgEntropyProvider,
+    get_entropy_provider,
+    set_entropy_provider,
+)
+from util.game_logic import get_random_secret_code
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    def test_opens_after_failures(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+
+    def test_half_open_after_reset_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow_request()
+        breaker.record_success(0.01)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker(failure_threshold=1, slow_call_threshold=0.5)
+        breaker.record_success(1.0)
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestSecretCodePool:
+    def test_served_from_pool_after_refill(self):
+        with FakeRandomOrgServer() as server:
+            pool = SecretCodePool(
+                RandomOrgEntropyProvider(server.url), pool_size=20, low_water_mark=5
+            )
+            code = pool.secret_code(4, 8)
+            assert len(code) == 4
+            pool.join()
+            assert server.requests == 1
+            for _ in range(14):
+                code = pool.secret_code(4, 8)
+                assert len(code) == 4 and all(0 <= peg < 8 for peg in code)
+            pool.join()
+            assert server.requests == 1
+
+        stats = pool.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 14
+        assert stats["refills"] == 1
+        assert stats["pooled_codes"] == {"4x8": 6}
+
+    def test_refills_below_low_water_mark(self):
+        with FakeRandomOrgServer() as server:
+            pool = SecretCodePool(
+                RandomOrgEntropyProvider(server.url), pool_size=10, low_water_mark=5
+            )
+            pool.refill(5, 10)
+            for _ in range(5):
+                pool.secret_code(5, 10)
+            pool.join()
+            assert server.requests == 2
+            assert pool.stats()["pooled_codes"] == {"5x10": 10}
+
+    def test_falls_back_when_remote_is_down(self):
+        with FakeRandomOrgServer(fail=True) as server:
+            pool = SecretCodePool(
+                RandomOrgEntropyProvider(server.url),
+                pool_size=10,
+                low_water_mark=5,
+                breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+            )
+            for _ in range(4):
+                code = pool.secret_code(4, 8)
+                assert len(code) == 4
+                pool.join()
+            assert server.requests == 2
+
+        stats = pool.stats()
+        assert stats["breaker_state"] == CircuitBreaker.OPEN
+        assert stats["refill_failures"] == 2
+        assert stats["rejected_refills"] == 2
+        assert stats["misses"] == 4
+
+    def test_falls_back_when_remote_is_slow(self):
+        with FakeRandomOrgServer(delay=0.3) as server:
+            pool = SecretCodePool(
+                RandomOrgEntropyProvider(server.url, timeout=0.1),
+                breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+            )
+            assert len(pool.secret_code(4, 8)) == 4
+            pool.join()
+        assert pool.stats()["breaker_state"] == CircuitBreaker.OPEN
+
+    def test_integrates_with_get_random_secret_code(self):
+        provider = get_entropy_provider()
+        with FakeRandomOrgServer() as server:
+            app = Flask(__name__)
+            app.config["SECRET_CODE_PROVIDER"] = "random_org"
+            app.config["RANDOM_ORG_URL"] = server.url
+            app.config["CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD"] = 0.5
+            init_entropy_provider(app)
+            pool = get_entropy_provider()
+            try:
+                assert isinstance(pool, SecretCodePool)
+                assert pool.breaker.slow_call_threshold == 0.5
+                get_random_secret_code(4, 8)
+                pool.join()
+                assert len(json.loads(get_random_secret_code(4, 8))) == 4
+                assert pool.stats()["hits"] == 1
+            finally:
+                set_entropy_provider(provider)
@@ -0,0 +1,22 @@
+import pytest
+from util.cursor import CursorError, decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not base64!",
+        encode_cursor(12345)[:-4],
+        "WyIxIl0=",  # ["1"]
+        "WzEsIDJd",  # [1, 2]
+        "W3RydWVd",  # [true]
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(CursorError):
+        decode_cursor(cursor)
@@ -0,0 +1,99 @@
+from models.models import db, Difficulty
+from sqlalchemy import event
+from util.difficulty_registry import DifficultyRegistry
+from util.enum import DifficultyEnum
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def seed_difficulties():
+    db.session.add_all(
+        [
+            Difficulty(
+                mode=DifficultyEnum.CUSTOM, max_turns=10, num_holes=4, num_colors=8
+            ),
+            Difficulty(
+                mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+            ),
+            Difficulty(
+                mode=DifficultyEnum.HARD, max_turns=12, num_holes=5, num_colors=10
+            ),
+        ]
+    )
+    db.session.commit()
+
+
+class TestDifficultyRegistry:
+    def test_lookups_do_not_query(self, create_app, create_db):
+        with create_app.app_context():
+            seed_difficulties()
+            registry = DifficultyRegistry()
+            registry.init_app(create_app)
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, "before_cursor_execute", listener)
+            try:
+                normal = registry.get("NORMAL", 10, 4, 8)
+                hard = registry.get(DifficultyEnum.HARD, 12, 5, 10)
+                default = registry.get_default(DifficultyEnum.NORMAL)
+                by_id = registry.get_by_id(hard.id)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+
+            assert statements == []
+            assert normal.mode == DifficultyEnum.NORMAL and normal.id == 2
+            assert default == normal
+            assert by_id == hard
+            assert registry.get("CUSTOM", 10, 4, 8).id == 1
+            assert registry.get("CUSTOM", 99, 4, 8) is None
+            assert registry.get("IMPOSSIBLE", 10, 4, 8) is None
+
+    def test_refresh(self, create_app, create_db):
+        with create_app.app_context():
+            registry = DifficultyRegistry()
+            registry.init_app(create_app)
+            assert registry.get("NORMAL", 10, 4, 8) is None
+            seed_difficulties()
+            assert registry.get("NORMAL", 10, 4, 8) is None
+            registry.refresh()
+            assert registry.get("NORMAL", 10, 4, 8).id == 2
+
+    def test_loads_lazily_when_table_is_missing(self, create_app, caplog):
+        registry = DifficultyRegistry()
+        registry.init_app(create_app)
+        assert not registry.loaded
+        assert not caplog.records
+        with create_app.app_context():
+            db.create_all()
+            seed_difficulties()
+            assert registry.get("HARD", 12, 5, 10).id == 3
+            db.drop_all()
+
+    def test_refreshes_on_miss_once_stale(self, create_app, create_db):
+        clock = FakeClock()
+        with create_app.app_context():
+            registry = DifficultyRegistry(refresh_interval=10, clock=clock)
+            registry.init_app(create_app)
+            assert not registry.loaded
+            seed_difficulties()
+            assert registry.get("NORMAL", 10, 4, 8) is None
+            clock.now = 10
+            assert registry.get("NORMAL", 10, 4, 8).id == 2
+            assert registry.loaded
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, "before_cursor_execute", listener)
+            try:
+                for _ in range(3):
+                    assert registry.get("CUSTOM", 99, 4, 8) is None
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+            assert statements == []
@@ -0,0 +1,65 @@
+import json
+import pytest
+import requests
+from flask import Flask
+from benchmarks.fake_random_org import FakeRandomOrgServer
+from util.entropy import (
+    FixedEntropyProvider,
+    LocalEntropyProvider,
+    RandomOrgEntropyProvider,
+    get_entropy_provider,
+    set_entropy_provider,
+)
+from util.code_pool import init_entropy_provider
+from util.game_logic import get_random_secret_code
+
+
+@pytest.fixture
+def restore_provider():
+    provider = get_entropy_provider()
+    yield
+    set_entropy_provider(provider)
+
+
+class TestEntropyProviders:
+    def test_local_provider(self):
+        code = LocalEntropyProvider().secret_code(10, 20)
+        assert len(code) == 10 and all(0 <= peg < 20 for peg in code)
+
+    def test_fixed_provider(self):
+        provider = FixedEntropyProvider([1, 2, 3])
+        assert provider.secret_code(4, 8) == [1, 2, 3, 1]
+        assert provider.secret_code(2, 3) == [2, 0]
+
+    def test_random_org_provider(self):
+        with FakeRandomOrgServer() as server:
+            code = RandomOrgEntropyProvider(server.url).secret_code(5, 10)
+        assert len(code) == 5 and all(0 <= peg < 10 for peg in code)
+
+    def test_random_org_provider_timeout(self):
+        with FakeRandomOrgServer(delay=0.5) as server:
+            provider = RandomOrgEntropyProvider(server.url, timeout=0.05)
+            with pytest.raises(requests.exceptions.RequestException):
+                provider.secret_code(4, 8)
+
+    def test_random_org_provider_unavailable(self):
+        with FakeRandomOrgServer(fail=True) as server:
+            with pytest.raises(requests.exceptions.RequestException):
+                RandomOrgEntropyProvider(server.url).secret_code(4, 8)
+
+    def test_get_random_secret_code(self, restore_provider):
+        set_entropy_provider(FixedEntropyProvider([7, 0, 7, 1]))
+        assert json.loads(get_random_secret_code(4, 8)) == [7, 0, 7, 1]
+
+    def test_init_entropy_provider(self, restore_provider):
+        app = Flask(__name__)
+        app.config["SECRET_CODE_PROVIDER"] = "random_org"
+        app.config["RANDOM_ORG_TIMEOUT"] = 0.5
+        app.config["SECRET_CODE_POOL_SIZE"] = 0
+        init_entropy_provider(app)
+        assert isinstance(get_entropy_provider(), RandomOrgEntropyProvider)
+        assert get_entropy_provider().timeout == 0.5
+
+        app.config["SECRET_CODE_PROVIDER"] = "dice"
+        with pytest.raises(ValueError, match="Unknown secret code provider"):
+            init_entropy_provider(app)
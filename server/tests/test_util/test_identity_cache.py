@@ -0,0 +1,124 @@
+from models.models import db, User
+from redis.exceptions import ConnectionError
+from util.identity_cache import (
+    Identity,
+    IdentityCache,
+    LocalIdentityStore,
+    RedisIdentityStore,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# Implements the subset of the redis client used by RedisIdentityStore
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value.encode()
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+class UnavailableRedis:
+    def get(self, key):
+        raise ConnectionError("redis is down")
+
+    def setex(self, key, ttl, value):
+        raise ConnectionError("redis is down")
+
+    def delete(self, key):
+        raise ConnectionError("redis is down")
+
+
+def add_user(username="john"):
+    user = User(username=username)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+class TestIdentityCache:
+    def test_hit_does_not_query(self, create_app, create_db, count_queries):
+        with create_app.app_context():
+            user_id = add_user()
+            cache = IdentityCache()
+            with count_queries() as queries:
+                identity = cache.get(user_id)
+                assert cache.get(user_id) == identity
+            assert len(queries) == 1
+            assert identity == Identity(user_id, "john", None)
+
+    def test_missing_user(self, create_app, create_db):
+        with create_app.app_context():
+            cache = IdentityCache()
+            assert cache.get(None) is None
+            assert cache.get("does-not-exist") is None
+
+    def test_invalidate(self, create_app, create_db):
+        with create_app.app_context():
+            user_id = add_user()
+            cache = IdentityCache()
+            assert cache.get(user_id).username == "john"
+            db.session.get(User, user_id).username = "jane"
+            db.session.commit()
+            assert cache.get(user_id).username == "john"
+            cache.invalidate(user_id)
+            assert cache.get(user_id).username == "jane"
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        store = LocalIdentityStore(clock)
+        identity = Identity("id", "john", None)
+        store.set(identity, 30)
+        clock.now = 29.9
+        assert store.get("id") == identity
+        clock.now = 30
+        assert store.get("id") is None
+
+    def test_redis_store(self, create_app, create_db, count_queries):
+        with create_app.app_context():
+            user_id = add_user()
+            cache = IdentityCache(RedisIdentityStore(FakeRedis()))
+            identity = cache.get(user_id)
+            with count_queries() as queries:
+                assert cache.get(user_id) == identity
+            assert not queries
+            cache.invalidate(user_id)
+            assert not cache.store.client.values
+
+    def test_redis_entries_with_old_fields(self):
+        client = FakeRedis()
+        client.setex(
+            "identity:id",
+            30,
+            '{"id": "id", "username": "john", "email": null, "is_host": true}',
+        )
+        assert RedisIdentityStore(client).get("id") == Identity("id", "john", None)
+
+    def test_redis_unavailable_falls_back_to_database(self, create_app, create_db):
+        with create_app.app_context():
+            user_id = add_user()
+            cache = IdentityCache(RedisIdentityStore(UnavailableRedis()))
+            assert cache.get(user_id).username == "john"
+            cache.invalidate(user_id)
+
+    def test_disabled(self, create_app, create_db, count_queries):
+        with create_app.app_context():
+            user_id = add_user()
+            cache = IdentityCache(ttl=0)
+            with count_queries() as queries:
+                cache.get(user_id)
+                cache.get(user_id)
+            assert len(queries) == 2
@@ -0,0 +1,132 @@
+from sqlalchemy import text
+from extensions import socketio
+from models.models import db, User
+import events  # registers the socket event handlers
+from util.code_pool import SecretCodePool
+from util.entropy import (
+    FixedEntropyProvider,
+    get_entropy_provider,
+    set_entropy_provider,
+)
+from util.metrics import Counter, Histogram, Metrics, metrics
+
+
+class TestMetrics:
+    def test_histogram_render(self):
+        histogram = Histogram("latency", "Latency.", ("endpoint",), (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(("a",), value)
+        assert histogram.render() == [
+            "# HELP latency Latency.",
+            "# TYPE latency histogram",
+            'latency_bucket{endpoint="a",le="0.1"} 2',
+            'latency_bucket{endpoint="a",le="1.0"} 3',
+            'latency_bucket{endpoint="a",le="+Inf"} 4',
+            'latency_sum{endpoint="a"} 3.65',
+            'latency_count{endpoint="a"} 4',
+        ]
+
+    def test_counter_escapes_labels(self):
+        counter = Counter("events", "Events.", ("event",))
+        counter.inc(('say "hi"\\',), 2)
+        assert counter.render()[-1] == 'events{event="say \\"hi\\"\\\\"} 2'
+
+    def test_request_and_query_metrics(self, create_app, create_db):
+        mock_app = create_app
+        app_metrics = Metrics()
+        app_metrics.init_app(mock_app)
+        client_mock = mock_app.test_client(use_cookies=True)
+
+        with mock_app.app_context():
+            user = User()
+            db.session.add(user)
+            db.session.commit()
+            with client_mock.session_transaction() as sess:
+                sess["user_id"] = user.id
+            db.session.expunge_all()
+
+            for _ in range(3):
+                assert client_mock.get("/users/me").status_code == 200
+            assert client_mock.get("/does-not-exist").status_code == 404
+
+            endpoint = "user_bp.get_user_details"
+            assert app_metrics.request_latency.get((endpoint, "GET"))[1] == 3
+            assert app_metrics.requests.get((endpoint, "GET", "200")) == 3
+            assert app_metrics.requests.get(("unmatched", "GET", "404")) == 1
+            # the identity is cached after the first request
+            assert app_metrics.db_queries.get((endpoint,)) == 1
+            assert app_metrics.db_query_time.get((endpoint,)) > 0
+
+            response = client_mock.get("/metrics")
+            assert response.status_code == 200
+            assert response.mimetype == "text/plain"
+            assert (
+                'http_requests_total{endpoint="user_bp.get_user_details",'
+                'method="GET",status="200"} 3'
+            ) in response.text
+            assert 'db_queries_total{endpoint="user_bp.get_user_details"} 1' in (
+                response.text
+            )
+            assert 'endpoint="metrics"' not in response.text
+
+    def test_unhandled_errors(self, create_app, create_db):
+        mock_app = create_app
+        mock_app.config["PROPAGATE_EXCEPTIONS"] = False
+
+        @mock_app.route("/broken")
+        def broken():
+            db.session.execute(text("SELECT * FROM missing_table"))
+
+        app_metrics = Metrics()
+        app_metrics.init_app(mock_app)
+        with mock_app.app_context():
+            assert mock_app.test_client().get("/broken").status_code == 500
+            assert app_metrics.requests.get(("broken", "GET", "500")) == 1
+            assert app_metrics.request_latency.get(("broken", "GET"))[1] == 1
+            # the failed statement leaves no start time behind
+            connection = db.session.connection()
+            assert "metrics_query_start_time" not in connection.info
+            db.session.execute(text("SELECT 1"))
+            assert "metrics_query_start_time" not in connection.info
+
+    def test_disabled(self, create_app, create_db):
+        mock_app = create_app
+        mock_app.config["METRICS_ENABLED"] = False
+        Metrics().init_app(mock_app)
+        assert mock_app.test_client().get("/metrics").status_code == 404
+
+    def test_socketio_events(self, create_app):
+        mock_app = create_app
+        socketio.init_app(mock_app)
+        connects = metrics.socketio_events.get(("connect",))
+        settings_changes = metrics.socketio_events.get(("change_game_settings",))
+
+        client = socketio.test_client(mock_app)
+        client.emit("change_game_settings", {"room": "ABCDEF", "settings": {}})
+        client.disconnect()
+
+        assert metrics.socketio_events.get(("connect",)) == connects + 1
+        assert (
+            metrics.socketio_events.get(("change_game_settings",))
+            == settings_changes + 1
+        )
+
+    def test_code_pool(self):
+        provider = get_entropy_provider()
+        pool = SecretCodePool(
+            FixedEntropyProvider([1, 2, 3]), pool_size=4, low_water_mark=0
+        )
+        try:
+            assert "secret_code_pool" not in Metrics().render()
+            set_entropy_provider(pool)
+            pool.secret_code(4, 8)
+            pool.join()
+            pool.secret_code(4, 8)
+            text = Metrics().render()
+        finally:
+            set_entropy_provider(provider)
+        assert 'secret_code_pool_requests_total{result="hit"} 1' in text
+        assert 'secret_code_pool_requests_total{result="miss"} 1' in text
+        assert 'secret_code_pool_refills_total{result="success"} 1' in text
+        assert 'secret_code_pool_codes{difficulty="4x8"} 3' in text
+        assert 'secret_code_pool_breaker_state{state="closed"} 1' in text
@@ -0,0 +1,137 @@
+import pytest
+from util.local_redis import LocalRedis
+from util.room_store import (
+    MAX_CODE_ATTEMPTS,
+    RoomCodeError,
+    RoomFullError,
+    RoomStore,
+    random_room_code,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def store_with_codes(*codes, ttl=60):
+    clock = FakeClock()
+    codes = iter(codes)
+    store = RoomStore(LocalRedis(clock), ttl, generate_code=lambda: next(codes))
+    return store, clock
+
+
+def test_random_room_code():
+    code = random_room_code()
+    assert len(code) == 6 and code.isalpha() and code.isupper()
+
+
+def test_create_and_get():
+    store, _ = store_with_codes("AAAAAA")
+    room = store.create("host", 3, 2)
+    assert store.get(room.id) == room
+    assert store.get_by_code("AAAAAA") == room
+    assert store.get_user_room_id("host") == room.id
+    assert store.get(room.id + 1) is None
+
+
+def test_taken_code_is_retried():
+    store, _ = store_with_codes("AAAAAA", "AAAAAA", "BBBBBB")
+    first = store.create("first", None, 2)
+    second = store.create("second", None, 2)
+    assert (first.code, second.code) == ("AAAAAA", "BBBBBB")
+    assert first.difficulty_id is None
+
+
+def test_code_space_exhausted():
+    store, _ = store_with_codes(*["AAAAAA"] * (MAX_CODE_ATTEMPTS + 1))
+    store.create("first", None, 2)
+    with pytest.raises(RoomCodeError):
+        store.create("second", None, 2)
+
+
+def test_room_expires_without_activity():
+    store, clock = store_with_codes("AAAAAA", "AAAAAA")
+    room = store.create("host", 1, 2)
+    clock.now = 50
+    store.join(room.id, "guest")  # activity restarts the TTL
+    clock.now = 100
+    assert store.get(room.id).player_ids == ["guest", "host"]
+    clock.now = 111
+    assert store.get(room.id) is None
+    assert store.get_user_room_id("guest") is None
+    # the expired room's code is free again
+    assert store.create("other", 1, 2).code == "AAAAAA"
+
+
+def test_close_frees_code():
+    store, _ = store_with_codes("AAAAAA", "AAAAAA")
+    room = store.create("host", 1, 2)
+    room = store.join(room.id, "guest")
+    store.close(room)
+    assert store.get(room.id) is None
+    assert store.get_user_room_id("host") is None
+    assert store.create("other", 1, 2).code == "AAAAAA"
+
+
+def test_room_is_full():
+    store, _ = store_with_codes("AAAAAA")
+    room = store.create("host", 1, 2)
+    store.join(room.id, "guest")
+    with pytest.raises(RoomFullError):
+        store.join(room.id, "third")
+
+
+def test_join_that_loses_the_last_seat_is_rejected():
+    store, _ = store_with_codes("AAAAAA")
+    room = store.create("host", 1, 2)
+    get = store.get
+    reads = []
+
+    # another join takes the last seat after this join read the room, which
+    # makes the transaction retry and see a full room
+    def get_then_race(room_id, client=None):
+        room = get(room_id, client)
+        reads.append(room)
+        if len(reads) == 1:
+            store.client.sadd(store.players_key(room_id), "racer")
+        return room
+
+    store.get = get_then_race
+    with pytest.raises(RoomFullError):
+        store.join(room.id, "guest")
+    store.get = get
+    assert len(reads) == 2
+    assert store.get(room.id).player_ids == ["host", "racer"]
+    assert store.get_user_room_id("guest") is None
+
+
+def test_keys_expire_from_the_start():
+    store, _ = store_with_codes("AAAAAA")
+    room = store.create("host", 1, 2)
+    store.join(room.id, "guest")
+    keys = [store.room_key(room.id), store.players_key(room.id)]
+    keys += [store.code_key(room.code), store.user_key("host")]
+    keys += [store.user_key("guest")]
+    assert [store.client.ttl(key) for key in keys] == [60] * len(keys)
+
+
+def test_joining_leaves_previous_room():
+    store, _ = store_with_codes("AAAAAA", "BBBBBB")
+    first = store.create("first host", 1, 2)
+    second = store.create("second host", 1, 2)
+    store.join(first.id, "guest")
+    store.join(second.id, "guest")
+    assert store.get(first.id).player_ids == ["first host"]
+    assert store.get(second.id).player_ids == ["guest", "second host"]
+    assert store.get_user_room_id("guest") == second.id
+
+
+def test_update_settings():
+    store, _ = store_with_codes("AAAAAA")
+    room = store.create("host", 1, 2)
+    assert store.update_settings(room, 5, 6) == store.get(room.id)
+    assert store.get(room.id)[4:] == (5, 6)
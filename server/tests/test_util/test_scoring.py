@@ -0,0 +1,91 @@
+import pytest
+import random
+from util.code import Code
+from util.game_logic import calculate_result, is_code_valid
+from util.scoring import score_matrix
+
+
+# Reference implementation that scores a single pair with plain loops
+def count_pegs(guess, secret_code):
+    black_pegs = sum(g == s for g, s in zip(guess, secret_code))
+    correct_numbers = sum(
+        min(guess.count(color), secret_code.count(color)) for color in set(guess)
+    )
+    return black_pegs, correct_numbers - black_pegs
+
+
+class TestScoreMatrix:
+    def test_matches_pairwise_scoring(self):
+        rng = random.Random(0)
+        num_holes, num_colors = 5, 10
+        guesses = [
+            [rng.randrange(num_colors) for _ in range(num_holes)] for _ in range(30)
+        ]
+        secret_codes = [
+            [rng.randrange(num_colors) for _ in range(num_holes)] for _ in range(40)
+        ]
+        black_pegs, white_pegs = score_matrix(guesses, secret_codes, num_colors)
+        assert black_pegs.shape == (30, 40)
+        for i, guess in enumerate(guesses):
+            for j, secret_code in enumerate(secret_codes):
+                assert (black_pegs[i, j], white_pegs[i, j]) == count_pegs(
+                    guess, secret_code
+                )
+
+    def test_chunked_scoring(self, monkeypatch):
+        monkeypatch.setattr("util.scoring.MAX_CHUNK_ELEMENTS", 1)
+        black_pegs, white_pegs = score_matrix(
+            [[0, 1, 2, 3], [3, 2, 1, 0], [0, 0, 0, 0]], [[0, 1, 2, 3]]
+        )
+        assert black_pegs[:, 0].tolist() == [4, 0, 1]
+        assert white_pegs[:, 0].tolist() == [0, 4, 0]
+
+    def test_mismatched_holes(self):
+        with pytest.raises(ValueError, match="same number of holes"):
+            score_matrix([[0, 1, 2, 3]], [[0, 1, 2]])
+
+    def test_negative_pegs(self):
+        with pytest.raises(ValueError, match="not possible"):
+            score_matrix([[0, 1, 2, -1]], [[0, 1, 2, 3]])
+
+
+class TestCalculateResult:
+    def test_all_incorrect(self):
+        assert calculate_result([0, 0, 0, 0], [1, 1, 1, 1], 8) == {
+            "won_round": False,
+            "black_pegs": 0,
+            "white_pegs": 0,
+            "message": "All incorrect.",
+        }
+
+    def test_partial_match(self):
+        assert calculate_result([1, 2, 3, 4], [1, 3, 2, 7], 8) == {
+            "won_round": False,
+            "black_pegs": 1,
+            "white_pegs": 2,
+            "message": "3 correct numbers and 1 correct location",
+        }
+
+    def test_won_round(self):
+        result = calculate_result([5, 5, 6, 7], [5, 5, 6, 7], 8)
+        assert result["won_round"] is True
+        assert result["black_pegs"] == 4
+        assert result["white_pegs"] == 0
+
+    def test_code_arguments(self):
+        result = calculate_result(
+            Code.from_list([1, 2, 3, 4], 4, 8), Code.from_list([1, 3, 2, 7], 4, 8), 8
+        )
+        assert result == calculate_result([1, 2, 3, 4], [1, 3, 2, 7], 8)
+
+
+class TestIsCodeValid:
+    def test_valid_code(self):
+        assert is_code_valid([0, 7, 3, 3], 4, 8)
+
+    def test_invalid_codes(self):
+        assert not is_code_valid([0, 7, 3], 4, 8)
+        assert not is_code_valid([0, 8, 3, 3], 4, 8)
+        assert not is_code_valid([0, -1, 3, 3], 4, 8)
+        assert not is_code_valid(["0", 1, 3, 3], 4, 8)
+        assert not is_code_valid("0133", 4, 8)
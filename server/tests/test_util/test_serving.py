@@ -0,0 +1,32 @@
+import pytest
+from util import serving
+
+
+class TestServing:
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            serving.patch_for("gevent")
+
+    def test_threading_runs_blocking_calls_directly(self):
+        serving.patch_for("threading")
+        assert serving.async_mode == "threading"
+        assert serving.run_blocking(pow, 2, 10) == 1024
+
+    def test_run_options(self):
+        assert serving.run_options(100) == {"max_size": 100}
+
+    def test_engine_options(self):
+        config = {
+            "SQLALCHEMY_DATABASE_URI": "postgresql://localhost/mastermind",
+            "DB_POOL_SIZE": 5,
+            "DB_MAX_OVERFLOW": 10,
+            "DB_POOL_TIMEOUT": 2.5,
+        }
+        assert serving.engine_options(config) == {
+            "pool_size": 5,
+            "max_overflow": 10,
+            "pool_timeout": 2.5,
+            "pool_pre_ping": True,
+        }
+        config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///mastermind.db"
+        assert serving.engine_options(config) == {}
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import time
+from types import SimpleNamespace
+from util.code import Code
+from util.game_logic import calculate_result
+from util.solver import history_from_turns, next_guess, opening_guess
+
+
+def play_game(secret_code, num_holes, num_colors, max_turns, **kwargs):
+    history = []
+    for turn_num in range(1, max_turns + 1):
+        guess = next_guess(history, num_holes, num_colors, **kwargs)
+        result = calculate_result(guess, secret_code, num_colors)
+        if result["won_round"]:
+            return turn_num
+        history.append((guess, result["black_pegs"], result["white_pegs"]))
+    return None
+
+
+class TestSolver:
+    def test_opening_guess(self):
+        assert opening_guess(4, 8) == [0, 0, 1, 1]
+        assert opening_guess(5, 2) == [0, 0, 1, 1, 1]
+
+    def test_invalid_strategy(self):
+        with pytest.raises(ValueError, match="Strategy has to be one of"):
+            next_guess([], 4, 8, strategy="random")
+
+    @pytest.mark.parametrize("strategy", ["minimax", "entropy"])
+    def test_solves_normal_difficulty(self, strategy):
+        rng = np.random.default_rng(0)
+        for secret_code in ([0, 1, 2, 3], [7, 7, 7, 7], [5, 2, 5, 0]):
+            turns = play_game(secret_code, 4, 8, 10, strategy=strategy, rng=rng)
+            assert turns is not None
+
+    def test_guess_is_consistent_with_history(self):
+        secret_code = [3, 1, 4, 1, 5, 9]
+        history = []
+        for guess in ([0, 0, 1, 1, 2, 2], [3, 3, 4, 4, 5, 5]):
+            result = calculate_result(guess, secret_code, 10)
+            history.append((guess, result["black_pegs"], result["white_pegs"]))
+        guess = next_guess(history, 6, 10, rng=np.random.default_rng(0))
+        for previous_guess, black_pegs, white_pegs in history:
+            result = calculate_result(previous_guess, guess, 10)
+            assert (result["black_pegs"], result["white_pegs"]) == (
+                black_pegs,
+                white_pegs,
+            )
+
+    def test_largest_custom_difficulty_within_budget(self):
+        secret_code = [19, 0, 3, 3, 7, 12, 18, 1, 5, 5]
+        guess = [0] * 10
+        result = calculate_result(guess, secret_code, 20)
+        history = [(guess, result["black_pegs"], result["white_pegs"])]
+        start = time.perf_counter()
+        guess = next_guess(history, 10, 20, time_budget=0.2)
+        assert time.perf_counter() - start < 1
+        assert len(guess) == 10 and all(0 <= peg < 20 for peg in guess)
+
+    def test_history_from_turns(self):
+        turns = [
+            SimpleNamespace(
+                turn_num=2,
+                guess_code=Code.from_list([1, 1, 2, 2], 4, 8).packed,
+                black_pegs=1,
+                white_pegs=1,
+            ),
+            SimpleNamespace(
+                turn_num=1,
+                guess_code=Code.from_list([0, 0, 1, 1], 4, 8).packed,
+                black_pegs=0,
+                white_pegs=1,
+            ),
+        ]
+        assert history_from_turns(turns, 4, 8) == [
+            ([0, 0, 1, 1], 0, 1),
+            ([1, 1, 2, 2], 1, 1),
+        ]
@@ -0,0 +1,122 @@
+from models.models import (
+    Difficulty,
+    Game,
+    Round,
+    User,
+    UserDifficultyStats,
+    UserStats,
+    db,
+)
+from sqlalchemy import select
+from util.enum import DifficultyEnum, StatusEnum
+from util.stats import rebuild_stats, record_game_completed, record_round_completed
+
+
+def all_stats():
+    return (
+        sorted(
+            (row.user_id, row.games_played, row.games_won, row.rounds_played)
+            + (row.rounds_solved, row.turns_to_solve)
+            for row in db.session.scalars(select(UserStats))
+        ),
+        sorted(
+            (row.user_id, row.difficulty_id, row.games_played, row.games_won)
+            + (row.rounds_played, row.rounds_solved, row.turns_to_solve)
+            for row in db.session.scalars(select(UserDifficultyStats))
+        ),
+    )
+
+
+# Completed games (and their rounds) recorded the way make_move records them
+def add_history(difficulties, users):
+    history = [
+        # (difficulty, players, winner, [(code breaker, points, turns)], status)
+        (0, [0, 1], 1, [(0, 15, 10), (1, 3, 3)], StatusEnum.COMPLETED),
+        (0, [0, 1], None, [(0, 4, 4), (1, 4, 4)], StatusEnum.COMPLETED),
+        (1, [2], 2, [(2, 6, 6)], StatusEnum.COMPLETED),
+        (1, [0, 2], None, [(2, 7, 7)], StatusEnum.IN_PROGRESS),
+    ]
+    for difficulty, players, winner, rounds, status in history:
+        difficulty_id = difficulties[difficulty].id
+        player_ids = [users[player].id for player in players]
+        winner_id = users[winner].id if winner is not None else None
+        game = Game(
+            is_multiplayer=len(players) > 1,
+            difficulty_id=difficulty_id,
+            status=status,
+            num_rounds=len(rounds) + (status != StatusEnum.COMPLETED),
+            winner_id=winner_id,
+            players=[users[player] for player in players],
+        )
+        db.session.add(game)
+        db.session.flush()
+        for round_num, (code_breaker, points, turns) in enumerate(rounds, start=1):
+            db.session.add(
+                Round(
+                    game_id=game.id,
+                    status=StatusEnum.COMPLETED,
+                    code_breaker_id=users[code_breaker].id,
+                    round_num=round_num,
+                    points=points,
+                    turns_used=turns,
+                )
+            )
+            record_round_completed(
+                users[code_breaker].id, difficulty_id, points == turns, turns
+            )
+        if status == StatusEnum.COMPLETED:
+            record_game_completed(difficulty_id, player_ids, winner_id)
+    db.session.commit()
+
+
+def test_rebuild_matches_incremental_stats(create_app, create_db):
+    with create_app.app_context():
+        difficulties = [
+            Difficulty(
+                mode=DifficultyEnum.NORMAL, max_turns=10, num_holes=4, num_colors=8
+            ),
+            Difficulty(
+                mode=DifficultyEnum.HARD, max_turns=12, num_holes=5, num_colors=10
+            ),
+        ]
+        users = [User() for _ in range(4)]
+        db.session.add_all(difficulties + users)
+        db.session.commit()
+        add_history(difficulties, users)
+
+        incremental = all_stats()
+        overall = {row[0]: row[1:] for row in incremental[0]}
+        assert overall[users[0].id] == (2, 0, 2, 1, 4)
+        assert overall[users[1].id] == (2, 1, 2, 2, 7)
+        assert overall[users[2].id] == (1, 1, 2, 2, 13)
+        assert users[3].id not in overall
+
+        # batches smaller than the number of users
+        assert rebuild_stats(batch_size=2) == 3
+        assert all_stats() == incremental
+
+
+def test_rebuild_replaces_existing_stats(create_app, create_db):
+    with create_app.app_context():
+        user = User()
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(UserStats(user_id=user.id, games_played=5))
+        db.session.commit()
+
+        assert rebuild_stats() == 0
+        assert all_stats() == ([], [])
+
+
+def test_increment_creates_then_adds(create_app, create_db):
+    with create_app.app_context():
+        user = User()
+        db.session.add(user)
+        db.session.commit()
+
+        UserStats.increment({"user_id": user.id}, games_played=1, games_won=1)
+        UserStats.increment({"user_id": user.id}, games_played=1)
+        db.session.commit()
+
+        stats = db.session.get(UserStats, user.id)
+        assert (stats.games_played, stats.games_won, stats.rounds_played) == (2, 1, 0)
@@ -0,0 +1,208 @@
+# Tracks, per round, which secret codes are still consistent with its turns
+# Each new turn prunes the previously remaining codes instead of rescanning the
+# whole code space, and rounds are evicted least recently used first so memory
+# stays bounded with thousands of active rounds
+# Counting never takes much longer than SCAN_TIME_BUDGET: code spaces too big
+# to scan in time get an estimate from a uniform sample of the code space
+from collections import OrderedDict
+import numpy as np
+import threading
+import time
+from util.scoring import code_space_size, decode_codes, score_matrix
+
+# Largest number of remaining codes kept as a packed integer array
+MATERIALIZE_LIMIT = 1 << 20
+# Largest code space that is scanned in chunks while too big to materialize,
+# above this the number of remaining codes is estimated
+LAZY_SCAN_LIMIT = 1 << 22
+# Codes scored per chunk while scanning the code space
+SCAN_CHUNK_SIZE = 1 << 16
+# Seconds a scan may take before the count is estimated instead
+SCAN_TIME_BUDGET = 0.05
+# Codes scored to estimate the count, the same sample for every estimate
+SAMPLE_SIZE = 1 << 14
+SAMPLE_SEED = 0
+
+MAX_ROUNDS = 5000
+MAX_BYTES = 64 * 1024 * 1024
+
+
+# Remaining codes of one round, stored as sorted code indices (the code written
+# in base num_colors) or, when there are too many, only as the turn history
+# estimated is True while count comes from a sample rather than a full scan
+class CandidateSet:
+    __slots__ = ("num_holes", "num_colors", "history", "codes", "count", "estimated")
+
+    def __init__(self, num_holes, num_colors):
+        self.num_holes = num_holes
+        self.num_colors = num_colors
+        self.history = []
+        space_size = code_space_size(num_holes, num_colors)
+        self.count = space_size
+        self.estimated = False
+        self.codes = (
+            np.arange(space_size, dtype=index_dtype(space_size))
+            if space_size <= MATERIALIZE_LIMIT
+            else None
+        )
+
+    @property
+    def turns_applied(self):
+        return len(self.history)
+
+    @property
+    def nbytes(self):
+        return 64 + (self.codes.nbytes if self.codes is not None else 0)
+
+    def copy(self):
+        candidate_set = CandidateSet.__new__(CandidateSet)
+        candidate_set.num_holes = self.num_holes
+        candidate_set.num_colors = self.num_colors
+        candidate_set.history = list(self.history)
+        candidate_set.codes = self.codes
+        candidate_set.count = self.count
+        candidate_set.estimated = self.estimated
+        return candidate_set
+
+    # Prunes the remaining codes with the turns that were not applied yet
+    def apply(self, turns):
+        new_turns = turns[self.turns_applied :]
+        if not new_turns:
+            return
+        self.history.extend(new_turns)
+        if self.codes is not None:
+            self.codes = self.codes[self.consistent(self.codes, new_turns)]
+            self.count = len(self.codes)
+        elif not (
+            code_space_size(self.num_holes, self.num_colors) <= LAZY_SCAN_LIMIT
+            and self.scan(time.monotonic() + SCAN_TIME_BUDGET)
+        ):
+            self.estimate()
+
+    # Lazily enumerates the code space in chunks against the full history,
+    # materializing the remaining codes once they fit
+    # Returns False, leaving the count as it was, if the deadline passes first
+    def scan(self, deadline):
+        space_size = code_space_size(self.num_holes, self.num_colors)
+        remaining, count = [], 0
+        for start in range(0, space_size, SCAN_CHUNK_SIZE):
+            if time.monotonic() > deadline:
+                return False
+            indices = np.arange(
+                start,
+                min(start + SCAN_CHUNK_SIZE, space_size),
+                dtype=index_dtype(space_size),
+            )
+            indices = indices[self.consistent(indices, self.history)]
+            count += len(indices)
+            if count <= MATERIALIZE_LIMIT:
+                remaining.append(indices)
+        self.count = count
+        self.estimated = False
+        if count <= MATERIALIZE_LIMIT:
+            self.codes = np.concatenate(remaining)
+        return True
+
+    # Scales the share of a uniform sample that is consistent with the history
+    # up to the code space, at least 1 since the secret code is always left
+    def estimate(self):
+        space_size = code_space_size(self.num_holes, self.num_colors)
+        indices = np.random.default_rng(SAMPLE_SEED).integers(
+            0, space_size, SAMPLE_SIZE, dtype=np.int64
+        )
+        share = self.consistent(indices, self.history).mean()
+        self.count = max(1, round(share * space_size))
+        self.estimated = True
+
+    def consistent(self, indices, turns):
+        codes = decode_codes(indices, self.num_holes, self.num_colors)
+        guesses = [guess for guess, _, _ in turns]
+        black_pegs, white_pegs = score_matrix(guesses, codes, self.num_colors)
+        expected_black = np.array([black for _, black, _ in turns])[:, None]
+        expected_white = np.array([white for _, _, white in turns])[:, None]
+        return ((black_pegs == expected_black) & (white_pegs == expected_white)).all(
+            axis=0
+        )
+
+
+def index_dtype(space_size):
+    return np.uint32 if space_size <= np.iinfo(np.uint32).max else np.int64
+
+
+# Least recently used cache of candidate sets keyed by round id
+class CandidateIndex:
+    def __init__(self, max_rounds=MAX_ROUNDS, max_bytes=MAX_BYTES):
+        self.max_rounds = max_rounds
+        self.max_bytes = max_bytes
+        self.rounds = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    # Number of codes still possible after the given turns, see lookup
+    def remaining_possibilities(self, round_id, num_holes, num_colors, turns):
+        return self.lookup(round_id, num_holes, num_colors, turns).count
+
+    # Candidate set of the round after the given turns (read only)
+    # turns is the round's history as [(guess, black_pegs, white_pegs)]
+    def lookup(self, round_id, num_holes, num_colors, turns):
+        turns = [(list(guess), black, white) for guess, black, white in turns]
+        with self.lock:
+            candidate_set = self.rounds.get(round_id)
+            if candidate_set:
+                self.rounds.move_to_end(round_id)
+
+        if (
+            not candidate_set
+            or (candidate_set.num_holes, candidate_set.num_colors)
+            != (num_holes, num_colors)
+            or candidate_set.history != turns[: candidate_set.turns_applied]
+        ):
+            candidate_set = CandidateSet(num_holes, num_colors)
+        elif candidate_set.turns_applied == len(turns):
+            return candidate_set
+        else:
+            # Pruned on a copy so concurrent readers never see a partial update
+            candidate_set = candidate_set.copy()
+
+        candidate_set.apply(turns)
+        self.store(round_id, candidate_set)
+        return candidate_set
+
+    # Applies one new turn to a round that is already indexed
+    def record_turn(self, round_id, guess, black_pegs, white_pegs):
+        with self.lock:
+            candidate_set = self.rounds.get(round_id)
+        if not candidate_set:
+            return
+        candidate_set = candidate_set.copy()
+        candidate_set.apply(
+            candidate_set.history + [(list(guess), black_pegs, white_pegs)]
+        )
+        self.store(round_id, candidate_set)
+
+    def discard(self, round_id):
+        with self.lock:
+            candidate_set = self.rounds.pop(round_id, None)
+            if candidate_set:
+                self.nbytes -= candidate_set.nbytes
+
+    def clear(self):
+        with self.lock:
+            self.rounds.clear()
+            self.nbytes = 0
+
+    def store(self, round_id, candidate_set):
+        with self.lock:
+            previous = self.rounds.pop(round_id, None)
+            if previous:
+                self.nbytes -= previous.nbytes
+            self.rounds[round_id] = candidate_set
+            self.nbytes += candidate_set.nbytes
+            while len(self.rounds) > 1 and (
+                len(self.rounds) > self.max_rounds or self.nbytes > self.max_bytes
+            ):
+                _, evicted = self.rounds.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+
+candidate_index = CandidateIndex()
@@ -0,0 +1,122 @@
+# Canonical representation of secret codes and guesses
+# A code is packed into one integer written in base num_colors (the first hole
+# is the most significant digit), which is also its index in
+# util.scoring.enumerate_codes, so codes are hashable, cheap to compare and
+# can be stored in integer columns
+import json
+
+
+class CodeError(ValueError):
+    pass
+
+
+# Not a list of integers
+class CodeFormatError(CodeError):
+    pass
+
+
+# Does not have num_holes pegs
+class CodeLengthError(CodeError):
+    pass
+
+
+# Has a peg outside of 0..num_colors - 1
+class CodeRangeError(CodeError):
+    pass
+
+
+class Code:
+    __slots__ = ("packed", "num_holes", "num_colors")
+
+    def __init__(self, packed, num_holes, num_colors):
+        self.packed = packed
+        self.num_holes = num_holes
+        self.num_colors = num_colors
+
+    @classmethod
+    def from_list(cls, pegs, num_holes, num_colors):
+        if not isinstance(pegs, (list, tuple)) or not all(
+            isinstance(peg, int) for peg in pegs
+        ):
+            raise CodeFormatError("Code should be a list of integers.")
+        if len(pegs) != num_holes:
+            raise CodeLengthError("Code does not match the number of holes.")
+        packed = 0
+        for peg in pegs:
+            if peg < 0 or peg >= num_colors:
+                raise CodeRangeError("Code has a number that is not possible.")
+            packed = packed * num_colors + peg
+        return cls(packed, num_holes, num_colors)
+
+    @classmethod
+    def from_json(cls, value, num_holes, num_colors):
+        try:
+            pegs = json.loads(value)
+        except (TypeError, ValueError):
+            raise CodeFormatError("Code should be a json encoded list of integers.")
+        return cls.from_list(pegs, num_holes, num_colors)
+
+    def to_list(self):
+        pegs = [0] * self.num_holes
+        packed = self.packed
+        for hole in range(self.num_holes - 1, -1, -1):
+            packed, pegs[hole] = divmod(packed, self.num_colors)
+        return pegs
+
+    def to_json(self):
+        return json.dumps(self.to_list())
+
+    # Returns (black_pegs, white_pegs) of this guess against a secret code,
+    # counted digit by digit on the packed integers
+    def pegs(self, secret_code):
+        if (self.num_holes, self.num_colors) != (
+            secret_code.num_holes,
+            secret_code.num_colors,
+        ):
+            raise CodeError("Codes do not have the same number of holes and colors.")
+        black_pegs = 0
+        guess_counts = [0] * self.num_colors
+        secret_code_counts = [0] * self.num_colors
+        guess, secret = self.packed, secret_code.packed
+        for _ in range(self.num_holes):
+            guess, guess_peg = divmod(guess, self.num_colors)
+            secret, secret_peg = divmod(secret, self.num_colors)
+            if guess_peg == secret_peg:
+                black_pegs += 1
+            else:
+                guess_counts[guess_peg] += 1
+                secret_code_counts[secret_peg] += 1
+        white_pegs = sum(map(min, guess_counts, secret_code_counts))
+        return black_pegs, white_pegs
+
+    def __getitem__(self, hole):
+        if hole < 0:
+            hole += self.num_holes
+        if not 0 <= hole < self.num_holes:
+            raise IndexError("Code index out of range.")
+        place_value = self.num_colors ** (self.num_holes - 1 - hole)
+        return self.packed // place_value % self.num_colors
+
+    def __len__(self):
+        return self.num_holes
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __int__(self):
+        return self.packed
+
+    def __eq__(self, other):
+        if not isinstance(other, Code):
+            return NotImplemented
+        return (self.packed, self.num_holes, self.num_colors) == (
+            other.packed,
+            other.num_holes,
+            other.num_colors,
+        )
+
+    def __hash__(self):
+        return hash((self.packed, self.num_holes, self.num_colors))
+
+    def __repr__(self):
+        return f"Code({self.to_list()}, num_colors={self.num_colors})"
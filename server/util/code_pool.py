@@ -0,0 +1,201 @@
+# Serves secret codes from in-memory pools that are refilled in the background
+# with batched requests to a remote entropy provider (e.g. random.org)
+# A circuit breaker stops calling the remote provider while it is slow or down,
+# codes are then generated locally until it recovers
+# init_entropy_provider lives here rather than in util.entropy since it builds
+# the pool around the providers defined there
+from collections import deque
+import logging
+import queue
+import threading
+import time
+from util.entropy import (
+    EntropyProvider,
+    LocalEntropyProvider,
+    RandomOrgEntropyProvider,
+    set_entropy_provider,
+)
+
+# random.org returns at most 10,000 integers per request
+MAX_INTEGERS_PER_REQUEST = 10000
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    # Opens after failure_threshold consecutive failures (calls slower than
+    # slow_call_threshold seconds count as failures) and lets a single trial
+    # call through once reset_timeout seconds have passed
+    def __init__(
+        self,
+        failure_threshold=3,
+        reset_timeout=30.0,
+        slow_call_threshold=2.0,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        with self.lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self, duration):
+        if duration > self.slow_call_threshold:
+            self.record_failure()
+            return
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+class SecretCodePool(EntropyProvider):
+    def __init__(
+        self,
+        provider,
+        pool_size=100,
+        low_water_mark=25,
+        breaker=None,
+        fallback=None,
+    ):
+        self.provider = provider
+        self.pool_size = pool_size
+        self.low_water_mark = low_water_mark
+        self.breaker = breaker if breaker else CircuitBreaker()
+        self.fallback = fallback if fallback else LocalEntropyProvider()
+        self.pools = {}  # (num_holes, num_colors) => deque of codes
+        self.pending = set()  # keys waiting for a refill
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "refills": 0,
+            "refill_failures": 0,
+            "rejected_refills": 0,
+        }
+        self.lock = threading.Lock()
+        self.refill_queue = queue.Queue()
+        self.worker = threading.Thread(target=self.refill_worker, daemon=True)
+        self.worker.start()
+
+    def random_integers(self, count, num_colors):
+        return self.fallback.random_integers(count, num_colors)
+
+    # Pops a pregenerated code, generating one locally if the pool is empty
+    def secret_code(self, num_holes, num_colors):
+        key = (num_holes, num_colors)
+        with self.lock:
+            codes = self.pools.setdefault(key, deque())
+            code = codes.popleft() if codes else None
+            self.metrics["hits" if code else "misses"] += 1
+            if len(codes) <= self.low_water_mark and key not in self.pending:
+                self.pending.add(key)
+                self.refill_queue.put(key)
+        if code:
+            return code
+        return self.fallback.secret_code(num_holes, num_colors)
+
+    def refill_worker(self):
+        while True:
+            key = self.refill_queue.get()
+            try:
+                self.refill(*key)
+            except Exception as e:
+                logging.error(f"Error refilling secret code pool {key}: {str(e)}")
+            finally:
+                with self.lock:
+                    self.pending.discard(key)
+                self.refill_queue.task_done()
+
+    # Tops up the pool of (num_holes, num_colors) with one batched request
+    def refill(self, num_holes, num_colors):
+        key = (num_holes, num_colors)
+        with self.lock:
+            missing = self.pool_size - len(self.pools.setdefault(key, deque()))
+        num_codes = min(missing, MAX_INTEGERS_PER_REQUEST // num_holes)
+        if num_codes <= 0:
+            return
+        if not self.breaker.allow_request():
+            with self.lock:
+                self.metrics["rejected_refills"] += 1
+            return
+
+        start = time.perf_counter()
+        try:
+            integers = self.provider.random_integers(num_codes * num_holes, num_colors)
+        except Exception:
+            self.breaker.record_failure()
+            with self.lock:
+                self.metrics["refill_failures"] += 1
+            raise
+        self.breaker.record_success(time.perf_counter() - start)
+
+        codes = [
+            integers[i : i + num_holes] for i in range(0, len(integers), num_holes)
+        ]
+        with self.lock:
+            self.pools[key].extend(codes)
+            self.metrics["refills"] += 1
+
+    # Blocks until every scheduled refill has finished
+    def join(self):
+        self.refill_queue.join()
+
+    def stats(self):
+        with self.lock:
+            return {
+                **self.metrics,
+                "breaker_state": self.breaker.state,
+                "pooled_codes": {
+                    f"{num_holes}x{num_colors}": len(codes)
+                    for (num_holes, num_colors), codes in self.pools.items()
+                },
+            }
+
+
+# Configures the provider from SECRET_CODE_PROVIDER ("local" or "random_org")
+# random.org codes are served from a prefetched pool unless
+# SECRET_CODE_POOL_SIZE is 0
+def init_entropy_provider(app):
+    provider_name = app.config.get("SECRET_CODE_PROVIDER", "local")
+    if provider_name == "local":
+        set_entropy_provider(LocalEntropyProvider())
+    elif provider_name == "random_org":
+        provider = RandomOrgEntropyProvider(
+            app.config.get("RANDOM_ORG_URL", "https://www.random.org/integers"),
+            app.config.get("RANDOM_ORG_TIMEOUT", 2.0),
+        )
+        pool_size = app.config.get("SECRET_CODE_POOL_SIZE", 100)
+        if pool_size:
+            provider = SecretCodePool(
+                provider,
+                pool_size=pool_size,
+                low_water_mark=app.config.get("SECRET_CODE_POOL_LOW_WATER", 25),
+                breaker=CircuitBreaker(
+                    failure_threshold=app.config.get("CIRCUIT_BREAKER_FAILURES", 3),
+                    reset_timeout=app.config.get("CIRCUIT_BREAKER_RESET_TIMEOUT", 30),
+                    slow_call_threshold=app.config.get(
+                        "CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD", 1.0
+                    ),
+                ),
+            )
+        set_entropy_provider(provider)
+    else:
+        raise ValueError(f"Unknown secret code provider {provider_name}.")
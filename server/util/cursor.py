@@ -0,0 +1,26 @@
+# Opaque cursors for keyset pagination, a cursor holds the id of the last row
+# of a page and the next page starts after it
+import base64
+import binascii
+import json
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(row_id):
+    value = json.dumps([row_id])
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+# Returns the id, raises CursorError if the cursor was not made by
+# encode_cursor
+def decode_cursor(cursor):
+    try:
+        (row_id,) = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise CursorError("Cursor is invalid.") from e
+    if not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise CursorError("Cursor is invalid.")
+    return row_id
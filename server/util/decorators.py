@@ -1,19 +1,84 @@
+from collections import namedtuple
 from functools import wraps
-from models.models import User, Game, Round, WaitingRoom
+from models.models import (
+    db,
+    User,
+    Difficulty,
+    Game,
+    Round,
+    user_games,
+)
 from flask import session, jsonify, request
 from util.json_errors import ErrorResponse
+from util.identity_cache import identity_cache
+from util.room_store import room_store
+from redis.exceptions import RedisError
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 import logging
 
+# user is None when the session user does not exist, round is None when the
+# round does not exist
+RoundContext = namedtuple("RoundContext", ["user", "round", "player_ids"])
+
+
+# Fetches the session user, the round with its game and difficulty and the ids
+# of the players in the game with one joined query (one row per player)
+def load_round_context(user_id, round_id):
+    columns = (Round, user_games.c.user_id)
+    if user_id is None:
+        query = select(*columns).select_from(Round).where(Round.id == round_id)
+    else:
+        # the user is the driving table so a missing round still returns it
+        query = (
+            select(User, *columns)
+            .select_from(User)
+            .outerjoin(Round, Round.id == round_id)
+            .where(User.id == user_id)
+        )
+    query = (
+        query.outerjoin(Game, Game.id == Round.game_id)
+        .outerjoin(Difficulty, Difficulty.id == Game.difficulty_id)
+        .outerjoin(user_games, user_games.c.game_id == Game.id)
+        .options(contains_eager(Round.game).contains_eager(Game.difficulty))
+    )
+
+    rows = db.session.execute(query).all()
+    if not rows:
+        return RoundContext(None, None, [])
+    user = rows[0][0] if user_id is not None else None
+    round = rows[0][-2]
+    player_ids = [row[-1] for row in rows if row[-1] is not None]
+    return RoundContext(user, round, player_ids)
+
+
+# Round context of the current request, loaded by session_required for routes
+# with a round_id or on first use
+def get_round_context(round_id):
+    context = getattr(request, "round_context", None)
+    if context is None:
+        context = load_round_context(None, round_id)
+        request.round_context = context
+    return context
+
 
 # Checks if session is valid and passes the user down as a request
 # If invalid, returns 401 unauthorized error
+# request.user is the cached Identity of the user, except for routes with a
+# round_id which get the User row and their round context from the same query
 def session_required(fn):
     @wraps(fn)
     def decorator(*args, **kwargs):
         user_id = session.get("user_id")
+        round_id = kwargs.get("round_id")
         try:
-            user = User.query.get(user_id)
+            if round_id is not None and user_id is not None:
+                context = load_round_context(user_id, round_id)
+                request.round_context = context
+                user = context.user
+            else:
+                user = identity_cache.get(user_id)
         except SQLAlchemyError as e:
             logging.error(f"Error fetching user: {str(e)}")
             return ErrorResponse.handle_error("User was not able to be fetched.", 503)
@@ -26,21 +91,38 @@ def session_required(fn):
     return decorator
 
 
+# Returns the User row of the session user, for routes that modify the user or
+# add it to a relationship (request.user may only be its cached Identity)
 # !👇 Depends on session_required decorator being called before
+def load_request_user():
+    user = request.user
+    if not isinstance(user, User):
+        user = db.session.get(User, user.id)
+        request.user = user
+    return user
+
+
+# !👇 Depends on session_required decorator being called before
+# Loads the game with its difficulty, players and rounds up front so the game
+# routes run a fixed number of queries however many rounds the game has
 def check_user_in_game(fn):
     @wraps(fn)
     def decorator(*args, **kwargs):
         user = request.user
         game_id = kwargs.get("game_id")
         try:
-            game = Game.query.get(game_id)
+            game = Game.query.options(
+                joinedload(Game.difficulty),
+                selectinload(Game.players),
+                selectinload(Game.rounds),
+            ).get(game_id)
         except SQLAlchemyError as e:
             logging.error(f"Error fetching game: {str(e)}")
             return ErrorResponse.handle_error("Game was not able to be fetched.", 503)
 
         if not game:
             return ErrorResponse.handle_error("Game id is not valid.", 400)
-        if user not in game.players:
+        if user.id not in [player.id for player in game.players]:
             return ErrorResponse.handle_error("User is not a player in the game.", 401)
         request.game = game
         return fn(*args, **kwargs)
@@ -55,7 +137,7 @@ def check_user_is_codebreaker(fn):
         user = request.user
         round_id = kwargs.get("round_id")
         try:
-            round = Round.query.get(round_id)
+            round = get_round_context(round_id).round
         except SQLAlchemyError as e:
             logging.error(f"Error fetching Round: {str(e)}")
             return ErrorResponse.handle_error("Round was not able to be fetched.", 503)
@@ -76,15 +158,15 @@ def check_user_in_round(fn):
         user = request.user
         round_id = kwargs.get("round_id")
         try:
-            round = Round.query.get(round_id)
+            context = get_round_context(round_id)
         except SQLAlchemyError as e:
             logging.error(f"Error fetching Round: {str(e)}")
             return ErrorResponse.handle_error("Round was not able to be fetched.", 503)
 
+        round = context.round
         if not round:
             return ErrorResponse.handle_error("Round id is not valid.", 404)
-        player_ids_in_game = [player.id for player in round.game.players]
-        if not user.id in player_ids_in_game:
+        if not user.id in context.player_ids:
             return ErrorResponse.handle_error("User is not a player in the game.", 401)
         request.round = round
         return fn(*args, **kwargs)
@@ -98,7 +180,7 @@ def check_round_is_valid(fn):
     def decorator(*args, **kwargs):
         round_id = kwargs.get("round_id")
         try:
-            round = Round.query.get(round_id)
+            round = get_round_context(round_id).round
         except SQLAlchemyError as e:
             logging.error(f"Error fetching Round: {str(e)}")
             return ErrorResponse.handle_error("Round was not able to be fetched.", 503)
@@ -116,15 +198,18 @@ def check_user_in_waiting_room(fn):
         user = request.user
         room_id = kwargs.get("room_id")
         try:
-            waiting_room = WaitingRoom.query.get(room_id)
-        except SQLAlchemyError as e:
-            logging.error(f"Error fetching Round: {str(e)}")
-            return ErrorResponse.handle_error("Round was not able to be fetched.", 503)
+            waiting_room = room_store.get(int(room_id))
+        except ValueError:
+            waiting_room = None
+        except RedisError as e:
+            logging.error(f"Error fetching waiting room: {str(e)}")
+            return ErrorResponse.handle_error(
+                "Waiting room was not able to be fetched.", 503
+            )
         if not waiting_room:
             return ErrorResponse.handle_error("Waiting room does not exist", 404)
 
-        player_ids = [player.id for player in waiting_room.players]
-        if user.id not in player_ids:
+        if user.id not in waiting_room.player_ids:
             return ErrorResponse.handle_error("User is not a part of waiting room", 401)
         request.waiting_room = waiting_room
         return fn(*args, **kwargs)
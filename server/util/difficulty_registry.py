@@ -0,0 +1,105 @@
+# Process-wide copy of the Difficulty table, which is reference data seeded by
+# init_db, so routes can resolve difficulties without a query
+# Call difficulty_registry.refresh() after the table changes, lookups that find
+# nothing also refresh it at most every REFRESH_INTERVAL seconds so rows seeded
+# while the server runs (e.g. by init_db) show up without a restart
+from collections import namedtuple
+import logging
+import threading
+import time
+from models.models import Difficulty, db
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
+from util.enum import DifficultyEnum
+
+DifficultyInfo = namedtuple(
+    "DifficultyInfo", ["id", "mode", "max_turns", "num_holes", "num_colors"]
+)
+
+REFRESH_INTERVAL = 10
+
+
+class DifficultyRegistry:
+    def __init__(self, refresh_interval=REFRESH_INTERVAL, clock=time.monotonic):
+        self.by_key = {}  # (mode, max_turns, num_holes, num_colors) => DifficultyInfo
+        self.by_id = {}
+        self.defaults = {}  # mode => first seeded difficulty of that mode
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.loaded = False  # True once a refresh found difficulties
+        self.refreshed_at = None
+        self.lock = threading.Lock()
+
+    # Loads the registry at startup, the table may not exist yet before the
+    # first migration (or before create_all in tests and benchmarks) so that
+    # load is skipped silently and, like failures, retried on the first lookup
+    def init_app(self, app):
+        with app.app_context():
+            try:
+                if inspect(db.engine).has_table(Difficulty.__tablename__):
+                    self.refresh()
+            except SQLAlchemyError as e:
+                logging.warning(f"Difficulties could not be loaded: {str(e)}")
+                db.session.rollback()
+
+    def refresh(self):
+        difficulties = [
+            DifficultyInfo(
+                difficulty.id,
+                difficulty.mode,
+                difficulty.max_turns,
+                difficulty.num_holes,
+                difficulty.num_colors,
+            )
+            for difficulty in Difficulty.query.order_by(Difficulty.id).all()
+        ]
+        by_key, by_id, defaults = {}, {}, {}
+        for difficulty in difficulties:
+            by_key.setdefault(difficulty[1:], difficulty)
+            by_id[difficulty.id] = difficulty
+            defaults.setdefault(difficulty.mode, difficulty)
+        with self.lock:
+            self.by_key, self.by_id, self.defaults = by_key, by_id, defaults
+            self.loaded = bool(difficulties)
+            self.refreshed_at = self.clock()
+
+    # Refreshes unless the last refresh was less than refresh_interval ago,
+    # returns whether it did
+    def refresh_if_stale(self):
+        if (
+            self.refreshed_at is not None
+            and self.clock() - self.refreshed_at < self.refresh_interval
+        ):
+            return False
+        self.refresh()
+        return True
+
+    # Runs find against the loaded difficulties, retrying it after a refresh
+    # when it finds nothing
+    def lookup(self, find):
+        if not self.loaded:
+            self.refresh_if_stale()
+        found = find()
+        if found is None and self.refresh_if_stale():
+            found = find()
+        return found
+
+    # mode can be a DifficultyEnum or its name, returns None if it does not exist
+    def get(self, mode, max_turns, num_holes, num_colors):
+        if isinstance(mode, str):
+            if mode not in DifficultyEnum.__members__:
+                return None
+            mode = DifficultyEnum[mode]
+        return self.lookup(
+            lambda: self.by_key.get((mode, max_turns, num_holes, num_colors))
+        )
+
+    def get_by_id(self, difficulty_id):
+        return self.lookup(lambda: self.by_id.get(difficulty_id))
+
+    # First seeded difficulty of a mode (e.g. the default NORMAL difficulty)
+    def get_default(self, mode):
+        return self.lookup(lambda: self.defaults.get(mode))
+
+
+difficulty_registry = DifficultyRegistry()
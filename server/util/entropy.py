@@ -0,0 +1,75 @@
+# Sources of randomness used to generate the computer's secret codes
+# The default is a local CSPRNG, random.org can be configured as an optional
+# remote backend and FixedEntropyProvider is a deterministic stand-in for tests
+import requests
+import secrets
+
+
+class EntropyProvider:
+    # Returns a list of count random integers between 0 and num_colors - 1
+    def random_integers(self, count, num_colors):
+        raise NotImplementedError
+
+    def secret_code(self, num_holes, num_colors):
+        return self.random_integers(num_holes, num_colors)
+
+
+class LocalEntropyProvider(EntropyProvider):
+    def random_integers(self, count, num_colors):
+        return [secrets.randbelow(num_colors) for _ in range(count)]
+
+
+class RandomOrgEntropyProvider(EntropyProvider):
+    def __init__(self, url="https://www.random.org/integers", timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+        self.http = requests.Session()
+
+    def random_integers(self, count, num_colors):
+        params = {
+            "num": count,
+            "min": 0,
+            "max": num_colors - 1,
+            "col": 1,
+            "base": 10,
+            "format": "plain",
+        }
+        response = self.http.get(self.url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        try:
+            integers = list(map(int, response.text.split()))
+        except ValueError:
+            raise requests.exceptions.RequestException(
+                "random.org returned a malformed response."
+            )
+        if len(integers) != count or not all(0 <= k < num_colors for k in integers):
+            raise requests.exceptions.RequestException(
+                "random.org returned a malformed response."
+            )
+        return integers
+
+
+# Replays the given integers in order (wrapping around), for tests
+class FixedEntropyProvider(EntropyProvider):
+    def __init__(self, integers):
+        self.integers = list(integers)
+        self.position = 0
+
+    def random_integers(self, count, num_colors):
+        integers = []
+        for _ in range(count):
+            integers.append(self.integers[self.position] % num_colors)
+            self.position = (self.position + 1) % len(self.integers)
+        return integers
+
+
+entropy_provider = LocalEntropyProvider()
+
+
+def get_entropy_provider():
+    return entropy_provider
+
+
+def set_entropy_provider(provider):
+    global entropy_provider
+    entropy_provider = provider
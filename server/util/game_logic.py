@@ -1,67 +1,51 @@
 import json
 import requests
+from util.code import Code, CodeError
+from util.entropy import get_entropy_provider
+from util.scoring import score_matrix
 
 
 def is_code_valid(secret_code, num_holes, num_colors):
-    if len(secret_code) != num_holes:
-        return False
-    if not all([isinstance(g, int) for g in secret_code]):
-        return False
-    if max(secret_code) >= num_colors or min(secret_code) < 0:
+    try:
+        Code.from_list(secret_code, num_holes, num_colors)
+    except CodeError:
         return False
     return True
 
 
-def calculate_result(guess, secret_code):
-    black_pegs = 0
-    white_pegs = 0
-    remaining_pegs_guess = {}
-    remaining_pegs_secret_code = {}
-    for i in range(len(guess)):
-        if guess[i] == secret_code[i]:
-            black_pegs += 1
-        else:
-            remaining_pegs_guess[guess[i]] = remaining_pegs_guess.get(guess[i], 0) + 1
-            remaining_pegs_secret_code[secret_code[i]] = (
-                remaining_pegs_secret_code.get(secret_code[i], 0) + 1
-            )
-
-    for key in remaining_pegs_guess.keys():
-        if key in remaining_pegs_secret_code:
-            white_pegs += min(
-                remaining_pegs_guess[key], remaining_pegs_secret_code[key]
-            )
-    won_round = black_pegs == len(guess)
-    correct_numbers = white_pegs + black_pegs
-    is_plural = correct_numbers > 1
-    if not white_pegs and not black_pegs:
-        message = "All incorrect."
+# guess and secret_code can be Codes or lists of integers. Codes are scored
+# on their packed form, lists by the batch scorer (tests/test_util/test_code.py
+# checks that both agree)
+def calculate_result(guess, secret_code, num_colors):
+    if isinstance(guess, Code) and isinstance(secret_code, Code):
+        black_pegs, white_pegs = guess.pegs(secret_code)
     else:
-        message = f"{correct_numbers} correct number{'s' if is_plural else ''} and {black_pegs} correct location"
+        guess, secret_code = list(guess), list(secret_code)
+        black_pegs, white_pegs = score_matrix([guess], [secret_code], num_colors)
+        black_pegs, white_pegs = int(black_pegs[0, 0]), int(white_pegs[0, 0])
     return {
-        "won_round": won_round,
+        "won_round": black_pegs == len(guess),
         "black_pegs": black_pegs,
         "white_pegs": white_pegs,
-        "message": message,
+        "message": get_result_message(black_pegs, white_pegs),
     }
 
 
+def get_result_message(black_pegs, white_pegs):
+    correct_numbers = white_pegs + black_pegs
+    is_plural = correct_numbers > 1
+    if not white_pegs and not black_pegs:
+        return "All incorrect."
+    return f"{correct_numbers} correct number{'s' if is_plural else ''} and {black_pegs} correct location"
+
+
+# Secret code of the computer as a json encoded list, raises a RequestException
+# if a remote entropy provider fails
 def get_random_secret_code(num_holes, num_colors):
     try:
-        params = {
-            "num": num_holes,
-            "min": 0,
-            "max": num_colors - 1,
-            "col": 1,
-            "base": 10,
-            "format": "plain",
-        }
-        random_code = requests.get(
-            "https://www.random.org/integers", params=params
-        ).text.split("\n")[:-1]
-        random_code = json.dumps(list(map(int, random_code)))
-        return random_code
+        random_code = get_entropy_provider().secret_code(num_holes, num_colors)
+        return json.dumps(random_code)
     except requests.exceptions.RequestException as e:
         raise requests.exceptions.RequestException(
             "Failed to generate computer's secret code."
-        )
+        ) from e
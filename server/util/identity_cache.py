@@ -0,0 +1,116 @@
+# Short-lived cache of the session user's identity so session_required does
+# not query Postgres on every authenticated request
+# Entries are kept in Redis next to the sessions when SESSION_TYPE is "redis"
+# (shared by every worker) and in process memory otherwise
+# Call identity_cache.invalidate(user_id) after changing any cached field
+from collections import namedtuple
+import json
+import logging
+import threading
+import time
+from models.models import User, db
+from redis.exceptions import RedisError
+
+# Fields of the user that routes read, routes that modify the user load the
+# row with util.decorators.load_request_user
+Identity = namedtuple("Identity", ["id", "username", "email"])
+
+# Seconds an identity is served from the cache
+DEFAULT_TTL = 30
+
+
+def identity_from_user(user):
+    return Identity(user.id, user.username, user.email)
+
+
+class LocalIdentityStore:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.entries = {}  # user_id => (expires_at, identity)
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry and entry[0] <= self.clock():
+                del self.entries[user_id]
+                entry = None
+        return entry[1] if entry else None
+
+    def set(self, identity, ttl):
+        with self.lock:
+            self.entries[identity.id] = (self.clock() + ttl, identity)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+
+class RedisIdentityStore:
+    KEY_PREFIX = "identity:"
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, user_id):
+        value = self.client.get(f"{self.KEY_PREFIX}{user_id}")
+        if not value:
+            return None
+        # entries written by older servers can have other fields
+        fields = json.loads(value)
+        return Identity(*(fields.get(field) for field in Identity._fields))
+
+    def set(self, identity, ttl):
+        self.client.setex(
+            f"{self.KEY_PREFIX}{identity.id}", ttl, json.dumps(identity._asdict())
+        )
+
+    def delete(self, user_id):
+        self.client.delete(f"{self.KEY_PREFIX}{user_id}")
+
+
+class IdentityCache:
+    def __init__(self, store=None, ttl=DEFAULT_TTL):
+        self.store = store if store else LocalIdentityStore()
+        self.ttl = ttl
+
+    def init_app(self, app):
+        self.ttl = app.config.get("IDENTITY_CACHE_TTL", DEFAULT_TTL)
+        redis_client = app.config.get("SESSION_REDIS")
+        if app.config.get("SESSION_TYPE") == "redis" and redis_client:
+            self.store = RedisIdentityStore(redis_client)
+        else:
+            self.store = LocalIdentityStore()
+
+    # Returns the Identity of user_id (None if the user does not exist),
+    # falling back to the database on a miss or if the cache is unavailable
+    def get(self, user_id):
+        if user_id is None:
+            return None
+        if self.ttl > 0:
+            try:
+                identity = self.store.get(user_id)
+                if identity:
+                    return identity
+            except RedisError as e:
+                logging.warning(f"Error reading identity cache: {str(e)}")
+
+        user = db.session.get(User, user_id)
+        if not user:
+            return None
+        identity = identity_from_user(user)
+        if self.ttl > 0:
+            try:
+                self.store.set(identity, self.ttl)
+            except RedisError as e:
+                logging.warning(f"Error writing identity cache: {str(e)}")
+        return identity
+
+    def invalidate(self, user_id):
+        try:
+            self.store.delete(user_id)
+        except RedisError as e:
+            logging.error(f"Error invalidating identity of user {user_id}: {str(e)}")
+
+
+identity_cache = IdentityCache()
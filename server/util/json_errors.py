@@ -4,7 +4,7 @@ from flask import jsonify
 class ErrorResponse:
     # TODO: Handle other common error codes in the future
     @staticmethod
-    def handle_error(message, status_code):
+    def error_json(message, status_code):
         error_codes = {
             400: "badRequest",
             401: "unauthorized",
@@ -15,14 +15,14 @@ class ErrorResponse:
             503: "serviceUnavailable",  # Generally for failed query operations
         }
         error_code = error_codes.get(status_code, "notHandled")
-        return (
-            jsonify(
-                {
-                    "error": {
-                        "code": error_code,
-                        "message": message,
-                    }
-                }
-            ),
-            status_code,
-        )
+        return {
+            "error": {
+                "code": error_code,
+                "message": message,
+            }
+        }
+
+    # Socket.IO handlers return error_json as the acknowledgement instead
+    @staticmethod
+    def handle_error(message, status_code):
+        return jsonify(ErrorResponse.error_json(message, status_code)), status_code
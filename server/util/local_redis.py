@@ -0,0 +1,214 @@
+# In-process stand-in for the subset of the redis client used by the room
+# store, for single process servers without Redis (e.g. SESSION_TYPE other
+# than "redis") and for tests. Values are returned as bytes like redis-py
+# Keys expire lazily when they are read after their TTL
+# pipeline() and transaction() follow redis-py: queued commands run atomically
+# and a transaction fails with WatchError if a watched key changed meanwhile
+from redis.exceptions import WatchError
+import threading
+import time
+
+
+def to_bytes(value):
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class LocalRedis:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.values = {}  # key => bytes, set of bytes or dict of bytes => bytes
+        self.expires_at = {}  # key => clock time
+        self.watchers = {}  # key => pipelines watching it
+        self.lock = threading.RLock()
+
+    # Marks the pipelines watching the key as failed
+    def touch(self, key):
+        for pipeline in self.watchers.pop(key, ()):
+            pipeline.watched_key_changed = True
+
+    def lookup(self, key):
+        expires_at = self.expires_at.get(key)
+        if expires_at is not None and expires_at <= self.clock():
+            self.values.pop(key, None)
+            del self.expires_at[key]
+            self.touch(key)
+        return self.values.get(key)
+
+    def store(self, key, value, ex=None):
+        self.touch(key)
+        self.values[key] = value
+        if ex is None:
+            self.expires_at.pop(key, None)
+        else:
+            self.expires_at[key] = self.clock() + ex
+
+    def get(self, key):
+        with self.lock:
+            return self.lookup(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        with self.lock:
+            if nx and self.lookup(key) is not None:
+                return None
+            self.store(key, to_bytes(value), ex)
+            return True
+
+    def delete(self, *keys):
+        with self.lock:
+            num_deleted = 0
+            for key in keys:
+                if self.lookup(key) is not None:
+                    self.touch(key)
+                    del self.values[key]
+                    self.expires_at.pop(key, None)
+                    num_deleted += 1
+            return num_deleted
+
+    def expire(self, key, seconds):
+        with self.lock:
+            if self.lookup(key) is None:
+                return False
+            self.touch(key)
+            self.expires_at[key] = self.clock() + seconds
+            return True
+
+    def ttl(self, key):
+        with self.lock:
+            if self.lookup(key) is None:
+                return -2
+            expires_at = self.expires_at.get(key)
+            return -1 if expires_at is None else int(expires_at - self.clock())
+
+    def incr(self, key):
+        with self.lock:
+            value = int(self.lookup(key) or 0) + 1
+            self.touch(key)
+            self.values[key] = to_bytes(value)
+            return value
+
+    def hset(self, key, mapping):
+        with self.lock:
+            values = self.lookup(key)
+            if values is None:
+                values = {}
+                self.store(key, values)
+            self.touch(key)
+            num_added = sum(to_bytes(field) not in values for field in mapping)
+            values.update(
+                {to_bytes(field): to_bytes(value) for field, value in mapping.items()}
+            )
+            return num_added
+
+    def hgetall(self, key):
+        with self.lock:
+            return dict(self.lookup(key) or {})
+
+    def sadd(self, key, *members):
+        with self.lock:
+            values = self.lookup(key)
+            if values is None:
+                values = set()
+                self.store(key, values)
+            self.touch(key)
+            members = {to_bytes(member) for member in members}
+            num_added = len(members - values)
+            values.update(members)
+            return num_added
+
+    def srem(self, key, *members):
+        with self.lock:
+            values = self.lookup(key)
+            if values is None:
+                return 0
+            self.touch(key)
+            members = {to_bytes(member) for member in members}
+            num_removed = len(members & values)
+            values.difference_update(members)
+            if not values:
+                del self.values[key]
+                self.expires_at.pop(key, None)
+            return num_removed
+
+    def smembers(self, key):
+        with self.lock:
+            return set(self.lookup(key) or ())
+
+    def scard(self, key):
+        with self.lock:
+            return len(self.lookup(key) or ())
+
+    def pipeline(self, transaction=True):
+        return LocalPipeline(self)
+
+    # Calls func(pipeline) with the keys watched and runs the commands it
+    # queued after pipeline.multi(), retrying when a watched key changed
+    def transaction(self, func, *watches, value_from_callable=False):
+        while True:
+            with self.pipeline() as pipeline:
+                try:
+                    pipeline.watch(*watches)
+                    value = func(pipeline)
+                    results = pipeline.execute()
+                    return value if value_from_callable else results
+                except WatchError:
+                    continue
+
+
+# Commands are queued until execute(), except between watch() and multi()
+# where they run immediately like in redis-py
+class LocalPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.watched_keys = []
+        self.reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.reset()
+
+    def reset(self):
+        with self.redis.lock:
+            for key in self.watched_keys:
+                watchers = self.redis.watchers.get(key)
+                if watchers:
+                    watchers.discard(self)
+                    if not watchers:
+                        del self.redis.watchers[key]
+        self.commands = []
+        self.watched_keys = []
+        self.watched_key_changed = False
+        self.immediate = False
+
+    def watch(self, *keys):
+        with self.redis.lock:
+            for key in keys:
+                self.redis.watchers.setdefault(key, set()).add(self)
+        self.watched_keys.extend(keys)
+        self.immediate = True
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        if self.immediate:
+            return command
+
+        def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        try:
+            with self.redis.lock:
+                if self.watched_key_changed:
+                    raise WatchError("Watched variable changed.")
+                return [
+                    command(*args, **kwargs) for command, args, kwargs in self.commands
+                ]
+        finally:
+            self.reset()
@@ -0,0 +1,277 @@
+# In-process request, SQL and Socket.IO metrics exposed at /metrics in the
+# Prometheus text format
+# Requests are timed with Flask request hooks and queries with SQLAlchemy
+# engine events, queries are attributed to the endpoint (or socket event)
+# that ran them. Values are per process, so scrape every worker
+# The secret code pool's counters are exported too when random.org is used
+from bisect import bisect_left
+from functools import wraps
+import threading
+import time
+import weakref
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from models.models import db
+from util.code_pool import CircuitBreaker, SecretCodePool
+from util.entropy import get_entropy_provider
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(label_names, label_values):
+    pairs = [
+        f'{name}="{escape_label_value(value)}"'
+        for name, value in zip(label_names, label_values)
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# Lines of a metric whose values are given as {label values: value}
+def render_values(name, description, metric_type, label_names, values):
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+    for label_values, value in sorted(values.items()):
+        lines.append(f"{name}{format_labels(label_names, label_values)} {value}")
+    return lines
+
+
+class Counter:
+    def __init__(self, name, description, label_names):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.values = {}  # label values => total
+        self.lock = threading.Lock()
+
+    def inc(self, label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, label_values):
+        return self.values.get(label_values, 0)
+
+    def render(self):
+        with self.lock:
+            values = dict(self.values)
+        return render_values(
+            self.name, self.description, "counter", self.label_names, values
+        )
+
+
+class Histogram:
+    def __init__(self, name, description, label_names, buckets):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self.values = {}  # label values => [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        bucket = bisect_left(self.buckets, value)
+        with self.lock:
+            values = self.values.get(label_values)
+            if values is None:
+                values = self.values[label_values] = [0] * (len(self.buckets) + 2)
+            if bucket < len(self.buckets):
+                values[bucket] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    # Returns (sum, count) of the observations
+    def get(self, label_values):
+        values = self.values.get(label_values)
+        return (values[-2], values[-1]) if values else (0, 0)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        label_names = self.label_names + ("le",)
+        with self.lock:
+            for label_values, values in sorted(self.values.items()):
+                cumulative = 0
+                for upper_bound, bucket_count in zip(self.buckets, values):
+                    cumulative += bucket_count
+                    labels = format_labels(label_names, label_values + (upper_bound,))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = format_labels(label_names, label_values + ("+Inf",))
+                lines.append(f"{self.name}_bucket{labels} {values[-1]}")
+                labels = format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {values[-2]}")
+                lines.append(f"{self.name}_count{labels} {values[-1]}")
+        return lines
+
+
+# Name of what is running the current query or request
+def current_endpoint():
+    if not has_request_context():
+        return "none"
+    socket_event = getattr(request, "event", None)
+    if socket_event:
+        return f"socketio:{socket_event['message']}"
+    return request.endpoint or "unmatched"
+
+
+class Metrics:
+    def __init__(self):
+        self.request_latency = Histogram(
+            "http_request_duration_seconds",
+            "Time spent handling HTTP requests.",
+            ("endpoint", "method"),
+            LATENCY_BUCKETS,
+        )
+        self.requests = Counter(
+            "http_requests_total",
+            "HTTP requests handled.",
+            ("endpoint", "method", "status"),
+        )
+        self.db_queries = Counter(
+            "db_queries_total", "SQL statements executed.", ("endpoint",)
+        )
+        self.db_query_time = Counter(
+            "db_query_seconds_total", "Time spent executing SQL.", ("endpoint",)
+        )
+        self.socketio_events = Counter(
+            "socketio_events_total", "Socket.IO events received.", ("event",)
+        )
+        self.all_metrics = (
+            self.request_latency,
+            self.requests,
+            self.db_queries,
+            self.db_query_time,
+            self.socketio_events,
+        )
+        self.instrumented_engines = weakref.WeakSet()
+
+    def init_app(self, app):
+        if not app.config.get("METRICS_ENABLED", True):
+            return
+        app.before_request(self.start_request)
+        app.after_request(self.record_status)
+        app.teardown_request(self.end_request)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view, methods=["GET"])
+        with app.app_context():
+            self.instrument_engine(db.engine)
+
+    def instrument_engine(self, engine):
+        if engine in self.instrumented_engines:
+            return
+        self.instrumented_engines.add(engine)
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+        event.listen(engine, "handle_error", self.handle_error)
+
+    def start_request(self):
+        g.metrics_start_time = time.perf_counter()
+
+    def record_status(self, response):
+        g.metrics_status_code = response.status_code
+        return response
+
+    # Runs after every request, including the ones that raised, which are
+    # counted as 500s
+    def end_request(self, error):
+        start_time = g.pop("metrics_start_time", None)
+        status_code = g.pop("metrics_status_code", 500)
+        if start_time is None or request.endpoint == "metrics":
+            return
+        endpoint = request.endpoint or "unmatched"
+        self.request_latency.observe(
+            (endpoint, request.method), time.perf_counter() - start_time
+        )
+        self.requests.inc((endpoint, request.method, str(status_code)))
+
+    # A connection runs one statement at a time, so one start time is enough
+    def before_cursor_execute(self, conn, cursor, statement, *args):
+        conn.info["metrics_query_start_time"] = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, *args):
+        start_time = conn.info.pop("metrics_query_start_time", None)
+        if start_time is None:
+            return
+        endpoint = current_endpoint()
+        self.db_queries.inc((endpoint,))
+        self.db_query_time.inc((endpoint,), time.perf_counter() - start_time)
+
+    # Statements that raised are not timed
+    def handle_error(self, context):
+        if context.connection is not None:
+            context.connection.info.pop("metrics_query_start_time", None)
+
+    def render(self):
+        lines = []
+        for metric in self.all_metrics:
+            lines.extend(metric.render())
+        lines.extend(self.render_code_pool())
+        return "\n".join(lines) + "\n"
+
+    # Counters of the secret code pool, nothing without one
+    def render_code_pool(self):
+        pool = get_entropy_provider()
+        if not isinstance(pool, SecretCodePool):
+            return []
+        stats = pool.stats()
+        return [
+            *render_values(
+                "secret_code_pool_requests_total",
+                "Secret codes requested from the pool.",
+                "counter",
+                ("result",),
+                {("hit",): stats["hits"], ("miss",): stats["misses"]},
+            ),
+            *render_values(
+                "secret_code_pool_refills_total",
+                "Refills of the pool from random.org.",
+                "counter",
+                ("result",),
+                {
+                    ("success",): stats["refills"],
+                    ("failure",): stats["refill_failures"],
+                    ("rejected",): stats["rejected_refills"],
+                },
+            ),
+            *render_values(
+                "secret_code_pool_codes",
+                "Codes in the pool per difficulty (holes x colors).",
+                "gauge",
+                ("difficulty",),
+                {(key,): count for key, count in stats["pooled_codes"].items()},
+            ),
+            *render_values(
+                "secret_code_pool_breaker_state",
+                "1 for the current state of the random.org circuit breaker.",
+                "gauge",
+                ("state",),
+                {
+                    (state,): int(state == stats["breaker_state"])
+                    for state in (
+                        CircuitBreaker.CLOSED,
+                        CircuitBreaker.OPEN,
+                        CircuitBreaker.HALF_OPEN,
+                    )
+                },
+            ),
+        ]
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+
+metrics = Metrics()
+
+
+# Counts the Socket.IO events handled by the decorated handler
+# Place it under @socketio.on(...)
+def count_socket_event(fn):
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        metrics.socketio_events.inc((request.event["message"],))
+        return fn(*args, **kwargs)
+
+    return decorator
@@ -0,0 +1,139 @@
+# Validates and saves a move of the code breaker, shared by
+# POST /rounds/<id>/turns and the submit_move socket event
+from collections import namedtuple
+import json
+import logging
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+from models.models import GameScore, Round, Turn, db
+from util.candidate_index import candidate_index
+from util.code import Code
+from util.enum import StatusEnum
+from util.game_logic import is_code_valid, calculate_result
+from util.stats import record_game_completed, record_round_completed
+
+# turn is the JSON of the new turn, secret_code is set once the round is over
+Move = namedtuple(
+    "Move", ["turn", "round_status", "turns_used", "turns_remaining", "secret_code"]
+)
+
+
+# message and status_code are passed to ErrorResponse
+class MoveError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+# Socket.IO room of a multiplayer round, the same name the client joins
+def round_room(game_id, round_id):
+    return f"game_{game_id}_round_{round_id}"
+
+
+# round is loaded with its game and difficulty, user is the code breaker and
+# player_ids are the players of the game
+def save_move(round, user, player_ids, guess):
+    game = round.game
+    curr_turn_num = round.turns_used + 1
+    max_turns, num_colors, num_holes = (
+        game.difficulty.max_turns,
+        game.difficulty.num_colors,
+        game.difficulty.num_holes,
+    )
+    # read before the commit expires the round
+    round_id, round_num, raw_secret_code = round.id, round.round_num, round.secret_code
+    round_status = round.status
+
+    if not guess:
+        raise MoveError("Guess was not provided in payload.", 400)
+    elif not is_code_valid(guess, num_holes, num_colors):
+        raise MoveError("Guess was not provided in correct format.", 400)
+    elif round_status == StatusEnum.COMPLETED or round_status == StatusEnum.TERMINATED:
+        raise MoveError("Move cannot be made in completed/terminated round.", 400)
+    elif curr_turn_num > max_turns:
+        raise MoveError("Cannot make move (exceeds number of turns possible).", 400)
+    secret_code = Code.from_json(raw_secret_code, num_holes, num_colors)
+
+    # Claims the next turn number in the same transaction as the new turn, the
+    # guard stops concurrent moves from going past max_turns and the unique
+    # (round_id, turn_num) constraint rejects duplicate turn numbers
+    try:
+        curr_turn_num = db.session.execute(
+            update(Round)
+            .where(
+                Round.id == round_id,
+                Round.turns_used < max_turns,
+                Round.status.notin_([StatusEnum.COMPLETED, StatusEnum.TERMINATED]),
+            )
+            .values(turns_used=Round.turns_used + 1)
+            .returning(Round.turns_used)
+        ).scalar()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logging.error(f"Error claiming turn number: {str(e)}")
+        raise MoveError("Round was not able to be updated.", 503)
+    if curr_turn_num is None:
+        db.session.rollback()
+        raise MoveError("Cannot make move (exceeds number of turns possible).", 400)
+
+    guess_code = Code.from_list(guess, num_holes, num_colors)
+    result = calculate_result(guess_code, secret_code, num_colors)
+    won_round = result.get("won_round", False)
+    round_over = won_round or curr_turn_num == max_turns
+    if round_over:
+        round_status = StatusEnum.COMPLETED
+    # guess was validated by is_code_valid and result comes from calculate_result
+    new_turn = Turn.from_trusted(round_id, curr_turn_num, guess_code, result)
+
+    try:
+        if round_over:
+            is_last_round = round_num == game.num_rounds
+            round.status = StatusEnum.COMPLETED
+            if is_last_round:
+                game.status = StatusEnum.COMPLETED
+            # Point calculation is based on amt of turns taken, and the winner of the game has the LEAST amt of points
+            # If the winner could not guess the code in turns allocated, they get a penalty of 5 points added
+            if won_round:
+                round.points = curr_turn_num
+            else:
+                round.points = curr_turn_num + 5
+            GameScore.add_round_points(game.id, round.code_breaker_id, round.points)
+            record_round_completed(
+                round.code_breaker_id, game.difficulty_id, won_round, curr_turn_num
+            )
+            winner_id = None
+            if game.is_multiplayer == False and won_round:
+                game.winner = user
+                winner_id = user.id
+            elif game.is_multiplayer and is_last_round:
+                winner_id = game.winner_id = GameScore.winner_id(game.id)
+            if is_last_round:
+                record_game_completed(game.difficulty_id, player_ids, winner_id)
+
+        db.session.add(new_turn)
+        db.session.flush()
+        new_turn_id = new_turn.id  # read before the commit expires it
+        db.session.commit()
+    except (SQLAlchemyError, ValueError) as e:
+        db.session.rollback()
+        logging.error(f"Error creating new turn: {str(e)}")
+        raise MoveError(
+            "Creating new turn failed. Please check the provided data.", 500
+        )
+    candidate_index.record_turn(
+        round_id, guess, result["black_pegs"], result["white_pegs"]
+    )
+
+    return Move(
+        {
+            "id": new_turn_id,
+            "turn_num": curr_turn_num,
+            "guess": guess,
+            "result": result,
+        },
+        round_status.name,
+        curr_turn_num,
+        max_turns - curr_turn_num,
+        json.loads(raw_secret_code) if round_over else None,
+    )
@@ -0,0 +1,203 @@
+# Waiting rooms are kept in Redis next to the sessions instead of Postgres,
+# only creating a game from a room writes to the database
+# Every key of a room expires WAITING_ROOM_TTL seconds after the room's last
+# activity (create, join, settings change or poll). Expiry and closing the
+# room (its game starts) free the room's code
+# Each change is one MULTI transaction that also sets the TTLs, so a worker
+# failing halfway never leaves keys that do not expire. Joins WATCH the room
+# so two joins cannot both take (or both lose) the last seat
+# Keys: room:<id> (hash of code, host_id, difficulty_id, num_rounds),
+# room:<id>:players (set of user ids), room_code:<code> => room id and
+# user_room:<user_id> => id of the user's current room
+from collections import namedtuple
+import secrets
+from string import ascii_uppercase
+from util.local_redis import LocalRedis
+
+Room = namedtuple(
+    "Room", ["id", "code", "host_id", "player_ids", "difficulty_id", "num_rounds"]
+)
+
+CODE_LENGTH = 6
+MAX_PLAYERS = 2
+# Seconds without activity after which a room expires
+DEFAULT_TTL = 60 * 60
+# With 26^6 codes a collision needs a large share of them to be in use, so
+# running out of attempts means the code space is nearly exhausted
+MAX_CODE_ATTEMPTS = 10
+
+
+class RoomCodeError(Exception):
+    pass
+
+
+class RoomFullError(Exception):
+    pass
+
+
+def random_room_code(length=CODE_LENGTH):
+    return "".join(secrets.choice(ascii_uppercase) for _ in range(length))
+
+
+def decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RoomStore:
+    def __init__(self, client=None, ttl=DEFAULT_TTL, generate_code=random_room_code):
+        self.client = client if client else LocalRedis()
+        self.ttl = ttl
+        self.generate_code = generate_code
+
+    # Rooms live in the session Redis when SESSION_TYPE is "redis" (shared by
+    # every worker) and in process memory otherwise
+    def init_app(self, app):
+        self.ttl = app.config.get("WAITING_ROOM_TTL", DEFAULT_TTL)
+        redis_client = app.config.get("SESSION_REDIS")
+        if app.config.get("SESSION_TYPE") == "redis" and redis_client:
+            self.client = redis_client
+        else:
+            self.client = LocalRedis()
+
+    def room_key(self, room_id):
+        return f"room:{room_id}"
+
+    def players_key(self, room_id):
+        return f"room:{room_id}:players"
+
+    def code_key(self, code):
+        return f"room_code:{code}"
+
+    def user_key(self, user_id):
+        return f"user_room:{user_id}"
+
+    # Claims a free code with SET NX, a taken code is retried with a new one
+    def reserve_code(self, room_id):
+        for _ in range(MAX_CODE_ATTEMPTS):
+            code = self.generate_code()
+            if self.client.set(self.code_key(code), room_id, ex=self.ttl, nx=True):
+                return code
+        raise RoomCodeError("No room code is available.")
+
+    def create(self, host_id, difficulty_id, num_rounds):
+        room_id = self.client.incr("room:next_id")
+        code = self.reserve_code(room_id)
+        previous_room_id = self.get_user_room_id(host_id)
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self.room_key(room_id),
+                mapping={
+                    "code": code,
+                    "host_id": host_id,
+                    "difficulty_id": (
+                        difficulty_id if difficulty_id is not None else ""
+                    ),
+                    "num_rounds": num_rounds,
+                },
+            )
+            pipe.sadd(self.players_key(room_id), host_id)
+            self.move_user(pipe, host_id, room_id, previous_room_id)
+            self.expire_room(pipe, room_id, code, [host_id])
+            pipe.execute()
+        return Room(room_id, code, host_id, [host_id], difficulty_id, num_rounds)
+
+    # Returns the Room, None if it does not exist or has expired
+    # client can be a pipeline that is watching the room
+    def get(self, room_id, client=None):
+        client = client if client else self.client
+        values = client.hgetall(self.room_key(room_id))
+        if not values:
+            return None
+        values = {decode(field): decode(value) for field, value in values.items()}
+        player_ids = sorted(
+            decode(player_id)
+            for player_id in client.smembers(self.players_key(room_id))
+        )
+        return Room(
+            int(room_id),
+            values["code"],
+            values["host_id"],
+            player_ids,
+            int(values["difficulty_id"]) if values["difficulty_id"] else None,
+            int(values["num_rounds"]),
+        )
+
+    def get_by_code(self, code):
+        room_id = self.client.get(self.code_key(code))
+        return self.get(decode(room_id)) if room_id else None
+
+    # Id of the room the user is currently in, None if they are not in one
+    def get_user_room_id(self, user_id):
+        room_id = self.client.get(self.user_key(user_id))
+        return int(decode(room_id)) if room_id else None
+
+    # Adds the user to the room, raises RoomFullError if the room is full
+    # The room is read and joined in one transaction that is retried when
+    # another change to the room commits first
+    def join(self, room_id, user_id):
+        previous_room_id = self.get_user_room_id(user_id)
+
+        def add_player(pipe):
+            room = self.get(room_id, pipe)
+            if not room or user_id in room.player_ids:
+                return room
+            if len(room.player_ids) >= MAX_PLAYERS:
+                raise RoomFullError("Room is full.")
+            room = room._replace(player_ids=sorted(room.player_ids + [user_id]))
+            pipe.multi()
+            pipe.sadd(self.players_key(room.id), user_id)
+            self.move_user(pipe, user_id, room.id, previous_room_id)
+            self.expire_room(pipe, room.id, room.code, room.player_ids)
+            return room
+
+        return self.client.transaction(
+            add_player,
+            self.room_key(room_id),
+            self.players_key(room_id),
+            value_from_callable=True,
+        )
+
+    # A user is in one room at a time, joining a room leaves the previous one
+    def move_user(self, pipe, user_id, room_id, previous_room_id):
+        if previous_room_id is not None and previous_room_id != room_id:
+            pipe.srem(self.players_key(previous_room_id), user_id)
+        pipe.set(self.user_key(user_id), room_id, ex=self.ttl)
+
+    def update_settings(self, room, difficulty_id, num_rounds):
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self.room_key(room.id),
+                mapping={"difficulty_id": difficulty_id, "num_rounds": num_rounds},
+            )
+            self.expire_room(pipe, room.id, room.code, room.player_ids)
+            pipe.execute()
+        return room._replace(difficulty_id=difficulty_id, num_rounds=num_rounds)
+
+    # Restarts the TTL of every key of the room
+    def refresh(self, room_id, code, player_ids):
+        with self.client.pipeline(transaction=True) as pipe:
+            self.expire_room(pipe, room_id, code, player_ids)
+            pipe.execute()
+
+    def expire_room(self, pipe, room_id, code, player_ids):
+        keys = [self.room_key(room_id), self.players_key(room_id), self.code_key(code)]
+        keys += [self.user_key(player_id) for player_id in player_ids]
+        for key in keys:
+            pipe.expire(key, self.ttl)
+
+    # Deletes the room once its game is created, which frees its code
+    def close(self, room):
+        user_keys = [
+            self.user_key(player_id)
+            for player_id in room.player_ids
+            if self.get_user_room_id(player_id) == room.id
+        ]
+        self.client.delete(
+            self.room_key(room.id),
+            self.players_key(room.id),
+            self.code_key(room.code),
+            *user_keys,
+        )
+
+
+room_store = RoomStore()
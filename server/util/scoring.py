@@ -0,0 +1,90 @@
+import numpy as np
+
+# Upper bound on the number of elements held in one intermediate
+# (guesses x secret codes x max(holes, colors)) array while scoring
+MAX_CHUNK_ELEMENTS = 1 << 23
+
+
+# Converts a list of codes (or a single code) into a 2d array of pegs
+def as_code_array(codes):
+    codes = np.asarray(codes)
+    if codes.ndim == 1:
+        codes = codes.reshape(1, -1)
+    if codes.ndim != 2:
+        raise ValueError("Codes should be a list of equal length lists of integers.")
+    if codes.size and (codes.min() < 0 or codes.max() > np.iinfo(np.int16).max):
+        raise ValueError("Codes contain a number that is not possible.")
+    dtype = (
+        np.int8 if not codes.size or codes.max() <= np.iinfo(np.int8).max else np.int16
+    )
+    return codes.astype(dtype, copy=False)
+
+
+# Number of times each color appears in each code, shape (num_codes, num_colors)
+def color_counts(codes, num_colors):
+    colors = np.arange(num_colors, dtype=codes.dtype)
+    return (codes[:, :, None] == colors).sum(axis=1, dtype=np.int8)
+
+
+# Scores every guess against every secret code in one call
+# Returns (black_pegs, white_pegs), each of shape (num_guesses, num_secret_codes)
+def score_matrix(guesses, secret_codes, num_colors=None):
+    guesses, secret_codes = as_code_array(guesses), as_code_array(secret_codes)
+    num_guesses, num_holes = guesses.shape
+    num_secret_codes = secret_codes.shape[0]
+    if secret_codes.shape[1] != num_holes:
+        raise ValueError(
+            "Guesses and secret codes do not have the same number of holes."
+        )
+
+    black_pegs = np.zeros((num_guesses, num_secret_codes), dtype=np.int8)
+    white_pegs = np.zeros((num_guesses, num_secret_codes), dtype=np.int8)
+    if not num_guesses or not num_secret_codes:
+        return black_pegs, white_pegs
+
+    if num_colors is None:
+        num_colors = int(max(guesses.max(), secret_codes.max())) + 1
+    guess_counts = color_counts(guesses, num_colors)
+    secret_code_counts = color_counts(secret_codes, num_colors)
+
+    # Chunk over guesses so memory stays bounded for very large batches
+    width = max(num_holes, num_colors)
+    chunk_size = max(1, MAX_CHUNK_ELEMENTS // (num_secret_codes * width))
+    for start in range(0, num_guesses, chunk_size):
+        end = min(start + chunk_size, num_guesses)
+        black = (guesses[start:end, None, :] == secret_codes[None, :, :]).sum(
+            axis=2, dtype=np.int8
+        )
+        # Pegs of the right color regardless of position (black + white)
+        correct_numbers = np.minimum(
+            guess_counts[start:end, None, :], secret_code_counts[None, :, :]
+        ).sum(axis=2, dtype=np.int8)
+        black_pegs[start:end] = black
+        white_pegs[start:end] = correct_numbers - black
+    return black_pegs, white_pegs
+
+
+def code_space_size(num_holes, num_colors):
+    return num_colors**num_holes
+
+
+# Codes numbered start..stop-1 in lexicographic order (code index written in
+# base num_colors, first hole being the most significant digit)
+def enumerate_codes(num_holes, num_colors, start=0, stop=None):
+    if stop is None:
+        stop = code_space_size(num_holes, num_colors)
+    return decode_codes(np.arange(start, stop, dtype=np.int64), num_holes, num_colors)
+
+
+# Inverse of the lexicographic numbering used by enumerate_codes
+def decode_codes(indices, num_holes, num_colors):
+    indices = np.asarray(indices, dtype=np.int64)
+    codes = np.empty((len(indices), num_holes), dtype=np.int8)
+    for hole in range(num_holes - 1, -1, -1):
+        indices, codes[:, hole] = np.divmod(indices, num_colors)
+    return codes
+
+
+# Single integer id for every (black_pegs, white_pegs) feedback
+def feedback_ids(black_pegs, white_pegs, num_holes):
+    return black_pegs.astype(np.int16) * (num_holes + 1) + white_pegs
@@ -0,0 +1,60 @@
+# How the server runs its requests and Socket.IO connections, see serve.py
+# "threading" gives every request and connection its own OS thread (the mode of
+# python app.py), "eventlet" runs them as green threads that switch whenever
+# one waits on a socket, so an idle WebSocket costs a few KB instead of a thread
+# The mode is chosen once per process by patch_for, before the app is imported
+ASYNC_MODES = ("threading", "eventlet")
+
+async_mode = "threading"
+
+
+# Swaps the blocking parts of the standard library (socket, select, threading,
+# time, ...) for cooperative ones, which makes requests (random.org), redis and
+# SQLAlchemy's pool yield to other green threads instead of blocking them, and
+# makes psycopg2 wait for Postgres through the eventlet hub
+# Has to run before anything else imports those modules
+def patch_for(mode):
+    global async_mode
+    if mode not in ASYNC_MODES:
+        raise ValueError(f"ASYNC_MODE should be one of {', '.join(ASYNC_MODES)}.")
+    if mode == "eventlet":
+        import eventlet
+        from eventlet.support import psycopg2_patcher
+
+        eventlet.monkey_patch()
+        psycopg2_patcher.make_psycopg_green()
+    async_mode = mode
+
+
+# Runs a CPU bound call (e.g. bcrypt) on eventlet's pool of OS threads so the
+# other green threads keep running meanwhile, calls it directly otherwise
+def run_blocking(fn, *args, **kwargs):
+    if async_mode == "eventlet":
+        from eventlet import tpool
+
+        return tpool.execute(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+# Keyword arguments of socketio.run in the eventlet mode, eventlet.wsgi.server
+# serves at most max_size connections at once
+# (the threading mode runs Werkzeug's development server, which only the debug
+# server and the benchmark worker use)
+def run_options(max_connections):
+    return {"max_size": max_connections}
+
+
+# Connection pool of the app's engine. Green threads share the pool like
+# threads do (its locks are patched) and Flask-SQLAlchemy scopes sessions by
+# app context, which is per green thread, so only the size needs tuning: a
+# green thread waiting for a connection waits at most DB_POOL_TIMEOUT seconds
+# SQLite keeps the pool Flask-SQLAlchemy picks for it
+def engine_options(config):
+    if config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_pre_ping": True,
+    }
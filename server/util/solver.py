@@ -0,0 +1,189 @@
+# Computer codebreaker that picks the next guess from a round's turn history
+# Small code spaces (e.g. NORMAL is 8^4 codes) are enumerated and solved with
+# minimax/entropy partitioning, large CUSTOM spaces (up to 20^10 codes) use a
+# sampled search for consistent candidates that stops at a wall-clock deadline
+import numpy as np
+import time
+from util.code import Code
+from util.scoring import (
+    code_space_size,
+    enumerate_codes,
+    feedback_ids,
+    score_matrix,
+)
+
+# Largest code space that is fully enumerated (HARD is 10^5 codes)
+ENUMERATION_LIMIT = 1 << 18
+# Max number of (guess, candidate) pairs scored when partitioning
+MAX_PARTITION_PAIRS = 1 << 22
+# Max number of remaining candidates used to estimate partition sizes
+MAX_PARTITION_CANDIDATES = 2000
+# Seconds the sampled search may spend looking for consistent candidates
+DEFAULT_TIME_BUDGET = 0.5
+# Population size of the sampled search
+SAMPLE_POPULATION = 256
+# Consistent candidates collected by the sampled search before it stops early
+SAMPLE_CANDIDATES = 32
+
+STRATEGIES = ("minimax", "entropy")
+
+
+# Converts the turns of a round into [(guess, black_pegs, white_pegs)]
+def history_from_turns(turns, num_holes, num_colors):
+    return [
+        (
+            Code(turn.guess_code, num_holes, num_colors).to_list(),
+            turn.black_pegs,
+            turn.white_pegs,
+        )
+        for turn in sorted(turns, key=lambda turn: turn.turn_num)
+    ]
+
+
+# Knuth style opening guess of repeated colors (e.g. [0, 0, 1, 1])
+def opening_guess(num_holes, num_colors):
+    return [min(hole // 2, num_colors - 1) for hole in range(num_holes)]
+
+
+# Returns the next guess (list of integers) for the given turn history
+def next_guess(
+    history,
+    num_holes,
+    num_colors,
+    strategy="minimax",
+    time_budget=DEFAULT_TIME_BUDGET,
+    rng=None,
+):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Strategy has to be one of {', '.join(STRATEGIES)}.")
+    if not history:
+        return opening_guess(num_holes, num_colors)
+
+    deadline = time.perf_counter() + time_budget
+    rng = rng if rng is not None else np.random.default_rng()
+    if code_space_size(num_holes, num_colors) <= ENUMERATION_LIMIT:
+        candidates = consistent_codes(
+            enumerate_codes(num_holes, num_colors), history, num_colors
+        )
+        guess_pool = None
+    else:
+        candidates = sample_consistent_codes(
+            history, num_holes, num_colors, deadline, rng
+        )
+        guess_pool = candidates
+
+    if len(candidates) == 0:
+        # Feedback was contradictory, any valid code is as good as another
+        return rng.integers(0, num_colors, num_holes).tolist()
+    if len(candidates) <= 2:
+        return candidates[0].tolist()
+    return best_partition_guess(
+        candidates, guess_pool, num_holes, num_colors, strategy, rng
+    ).tolist()
+
+
+# Number of feedback mismatches of each code against the history
+def inconsistency(codes, history, num_colors):
+    guesses = [guess for guess, _, _ in history]
+    black_pegs, white_pegs = score_matrix(guesses, codes, num_colors)
+    expected_black = np.array([black for _, black, _ in history])[:, None]
+    expected_white = np.array([white for _, _, white in history])[:, None]
+    return (
+        np.abs(black_pegs - expected_black) + np.abs(white_pegs - expected_white)
+    ).sum(axis=0)
+
+
+def consistent_codes(codes, history, num_colors):
+    return codes[inconsistency(codes, history, num_colors) == 0]
+
+
+# Local search over a population of random codes, keeping mutations that do not
+# increase inconsistency, until enough consistent codes are found or time is up
+def sample_consistent_codes(history, num_holes, num_colors, deadline, rng):
+    population = rng.integers(0, num_colors, (SAMPLE_POPULATION, num_holes)).astype(
+        np.int8
+    )
+    # Seed half of the population with the previous guesses
+    for i, (guess, _, _) in enumerate(history[-SAMPLE_POPULATION // 2 :]):
+        population[i] = guess
+    fitness = inconsistency(population, history, num_colors)
+    found = {}
+    rows = np.arange(SAMPLE_POPULATION)
+
+    while True:
+        # Consistent codes are recorded and restarted so the search keeps exploring
+        restart = fitness == 0
+        for code in population[restart]:
+            found.setdefault(code.tobytes(), code.copy())
+        if len(found) >= SAMPLE_CANDIDATES or time.perf_counter() >= deadline:
+            break
+        population[restart] = rng.integers(0, num_colors, (restart.sum(), num_holes))
+        fitness[restart] = inconsistency(population[restart], history, num_colors)
+
+        mutated = population.copy()
+        # Recolor one hole of every code and swap two holes of half of them
+        holes = rng.integers(0, num_holes, SAMPLE_POPULATION)
+        mutated[rows, holes] = rng.integers(0, num_colors, SAMPLE_POPULATION)
+        swap = rng.random(SAMPLE_POPULATION) < 0.5
+        other_holes = rng.integers(0, num_holes, SAMPLE_POPULATION)
+        swapped = mutated[rows, holes]
+        mutated[rows[swap], holes[swap]] = mutated[rows[swap], other_holes[swap]]
+        mutated[rows[swap], other_holes[swap]] = swapped[swap]
+
+        mutated_fitness = inconsistency(mutated, history, num_colors)
+        improved = mutated_fitness <= fitness
+        population[improved] = mutated[improved]
+        fitness[improved] = mutated_fitness[improved]
+
+    if found:
+        return np.array(list(found.values()), dtype=np.int8)
+    # Out of time without a consistent code, fall back to the closest one
+    return population[[np.argmin(fitness)]]
+
+
+# Guess whose feedback splits the remaining candidates into the smallest
+# worst-case partition (minimax) or with the highest entropy
+def best_partition_guess(candidates, guess_pool, num_holes, num_colors, strategy, rng):
+    if len(candidates) > MAX_PARTITION_CANDIDATES:
+        sample = rng.choice(len(candidates), MAX_PARTITION_CANDIDATES, replace=False)
+        scored_candidates = candidates[np.sort(sample)]
+    else:
+        scored_candidates = candidates
+
+    # Use every code as a possible guess when affordable, otherwise candidates
+    max_guesses = max(1, MAX_PARTITION_PAIRS // len(scored_candidates))
+    if guess_pool is None and code_space_size(num_holes, num_colors) <= max_guesses:
+        guess_pool = enumerate_codes(num_holes, num_colors)
+        is_candidate = candidate_mask(guess_pool, candidates, num_colors)
+    else:
+        guess_pool = candidates if guess_pool is None else guess_pool
+        if len(guess_pool) > max_guesses:
+            guess_pool = guess_pool[
+                rng.choice(len(guess_pool), max_guesses, replace=False)
+            ]
+        is_candidate = np.ones(len(guess_pool), dtype=bool)
+
+    black_pegs, white_pegs = score_matrix(guess_pool, scored_candidates, num_colors)
+    num_feedbacks = (num_holes + 1) ** 2
+    ids = feedback_ids(black_pegs, white_pegs, num_holes).astype(np.int64)
+    ids += np.arange(len(guess_pool))[:, None] * num_feedbacks
+    partition_sizes = np.bincount(
+        ids.ravel(), minlength=len(guess_pool) * num_feedbacks
+    ).reshape(len(guess_pool), num_feedbacks)
+
+    if strategy == "minimax":
+        score = partition_sizes.max(axis=1).astype(np.float64)
+    else:
+        probabilities = partition_sizes / len(scored_candidates)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = -np.nansum(probabilities * np.log2(probabilities), axis=1)
+        score = -entropy
+    # Prefer guesses that could still be the secret code when scores tie
+    best = np.lexsort((~is_candidate, score))[0]
+    return guess_pool[best]
+
+
+# Marks which codes of the pool are among the candidates
+def candidate_mask(codes, candidates, num_colors):
+    powers = num_colors ** np.arange(codes.shape[1] - 1, -1, -1, dtype=np.int64)
+    return np.isin(codes @ powers, candidates.astype(np.int64) @ powers)
@@ -0,0 +1,163 @@
+# Per player statistics (overall and per difficulty) kept in the UserStats and
+# UserDifficultyStats aggregates so stats and leaderboards never scan the
+# game, round or turn tables
+# make_move records rounds and games as they complete, in the same
+# transaction as the move. rebuild_stats recomputes every row from history
+from collections import defaultdict
+from models.models import (
+    Game,
+    Round,
+    User,
+    UserDifficultyStats,
+    UserStats,
+    db,
+    user_games,
+)
+from sqlalchemy import case, delete, func, insert, select
+from util.enum import StatusEnum
+
+# Users whose history is aggregated per rebuild query
+REBUILD_BATCH_SIZE = 1000
+
+COUNTERS = (
+    "games_played",
+    "games_won",
+    "rounds_played",
+    "rounds_solved",
+    "turns_to_solve",
+)
+
+
+def add_to_stats(user_id, difficulty_id, **amounts):
+    UserStats.increment({"user_id": user_id}, **amounts)
+    UserDifficultyStats.increment(
+        {"user_id": user_id, "difficulty_id": difficulty_id}, **amounts
+    )
+
+
+# Called when the code breaker completes a round, solved rounds add the
+# number of turns it took
+def record_round_completed(user_id, difficulty_id, solved, num_turns):
+    add_to_stats(
+        user_id,
+        difficulty_id,
+        rounds_played=1,
+        rounds_solved=1 if solved else 0,
+        turns_to_solve=num_turns if solved else 0,
+    )
+
+
+# Called when the last round of a game completes, winner_id is None for a
+# lost single player game or a tied multiplayer game
+def record_game_completed(difficulty_id, player_ids, winner_id):
+    # same row order in every transaction so concurrent games cannot deadlock
+    for player_id in sorted(player_ids):
+        add_to_stats(
+            player_id,
+            difficulty_id,
+            games_played=1,
+            games_won=1 if player_id == winner_id else 0,
+        )
+
+
+def stats_to_json(stats):
+    return {
+        "games_played": stats.games_played,
+        "games_won": stats.games_won,
+        "win_rate": stats.win_rate,
+        "rounds_played": stats.rounds_played,
+        "rounds_solved": stats.rounds_solved,
+        "average_turns_to_solve": stats.average_turns_to_solve,
+    }
+
+
+# Counters of every (user_id, difficulty_id) played by user_ids, aggregated
+# by the database
+def aggregate_history(user_ids):
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    # a round's points equal its turns only when the code was solved
+    solved = Round.points == Round.turns_used
+    rounds = db.session.execute(
+        select(
+            Round.code_breaker_id,
+            Game.difficulty_id,
+            func.count(Round.id),
+            func.sum(case((solved, 1), else_=0)),
+            func.sum(case((solved, Round.turns_used), else_=0)),
+        )
+        .join(Game, Round.game_id == Game.id)
+        .where(
+            Round.code_breaker_id.in_(user_ids),
+            Round.status == StatusEnum.COMPLETED,
+            Round.points.isnot(None),
+        )
+        .group_by(Round.code_breaker_id, Game.difficulty_id)
+    )
+    for user_id, difficulty_id, played, num_solved, turns in rounds:
+        counters = totals[(user_id, difficulty_id)]
+        counters["rounds_played"] = played
+        counters["rounds_solved"] = num_solved
+        counters["turns_to_solve"] = turns
+
+    games = db.session.execute(
+        select(
+            user_games.c.user_id,
+            Game.difficulty_id,
+            func.count(Game.id),
+            func.sum(case((Game.winner_id == user_games.c.user_id, 1), else_=0)),
+        )
+        .join(Game, user_games.c.game_id == Game.id)
+        .where(
+            user_games.c.user_id.in_(user_ids),
+            Game.status == StatusEnum.COMPLETED,
+        )
+        .group_by(user_games.c.user_id, Game.difficulty_id)
+    )
+    for user_id, difficulty_id, played, won in games:
+        counters = totals[(user_id, difficulty_id)]
+        counters["games_played"] = played
+        counters["games_won"] = won
+    return totals
+
+
+# Replaces the statistics with ones recomputed from the completed rounds and
+# games, batch_size users at a time so every batch is a bounded aggregate
+# The rebuild is one transaction, so readers see the old rows until it commits
+def rebuild_stats(batch_size=REBUILD_BATCH_SIZE):
+    db.session.execute(delete(UserDifficultyStats))
+    db.session.execute(delete(UserStats))
+    last_user_id = None
+    num_users = 0
+    while True:
+        query = select(User.id).order_by(User.id).limit(batch_size)
+        if last_user_id is not None:
+            query = query.where(User.id > last_user_id)
+        user_ids = db.session.execute(query).scalars().all()
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+
+        totals = aggregate_history(user_ids)
+        if totals:
+            overall = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+            for (user_id, _), counters in totals.items():
+                for name, value in counters.items():
+                    overall[user_id][name] += value
+            db.session.execute(
+                insert(UserDifficultyStats),
+                [
+                    {"user_id": user_id, "difficulty_id": difficulty_id, **counters}
+                    for (user_id, difficulty_id), counters in totals.items()
+                ],
+            )
+            db.session.execute(
+                insert(UserStats),
+                [
+                    {"user_id": user_id, **counters}
+                    for user_id, counters in overall.items()
+                ],
+            )
+            num_users += len(overall)
+    db.session.commit()
+    return num_users